@@ -0,0 +1,261 @@
+"""
+Benchmark every stage of the draft recommendation pipeline on synthetic leagues.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline                  # compare to the baseline
+    python -m benchmarks.bench_pipeline --save-baseline  # record a new baseline
+    python -m benchmarks.bench_pipeline --full           # every league configuration
+
+Each stage reports its best wall time over --repeat runs and its peak traced
+memory. The run exits with status 1 if any stage is slower than the baseline
+by more than --tolerance.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import main  # noqa: E402
+from benchmarks.synthetic import LINEUPS, synthetic_league  # noqa: E402
+from pages.utils.position_combinations import count_arrangements  # noqa: E402
+
+BASELINE_FILE = REPO_ROOT / "benchmarks" / "baseline.json"
+
+# Enumerating more combinations than this is skipped, the DP path doesn't need them
+MAX_COMBINATIONS = 5_000_000
+
+# Representative leagues, (n_teams, n_rounds, flex_type, n_players)
+DEFAULT_LEAGUES = [
+    (8, 7, "Standard", 200),
+    (10, 8, "RB/WR", 200),
+    (12, 7, "Standard", 1000),
+    (12, 15, "Super Flex", 1000),
+    (12, 16, "Standard", 3000),
+    (14, 20, "Super Flex", 3000),
+    (24, 12, "RB/WR", 3000),
+    (24, 20, "Standard", 3000),
+]
+
+FULL_GRID = {
+    "n_teams": [8, 12, 16, 24],
+    "n_rounds": [7, 10, 15, 20],
+    "flex_type": ["Standard", "Super Flex", "RB/WR"],
+    "n_players": [200, 1000, 3000],
+}
+
+
+def full_grid_leagues():
+    """
+    Returns
+    -------
+    leagues : List of every (n_teams, n_rounds, flex_type, n_players) in
+    FULL_GRID with enough rounds for the flex types starting lineup
+    """
+
+    return [
+        (n_teams, n_rounds, flex_type, n_players)
+        for n_teams, n_rounds, flex_type, n_players in itertools.product(*FULL_GRID.values())
+        if n_rounds >= sum(LINEUPS[flex_type].values())
+    ]
+
+
+def league_name(n_teams, n_rounds, flex_type, n_players):
+    return "{n_teams}T-{n_rounds}R-{flex}-{n_players}P".format(
+        n_teams=n_teams,
+        n_rounds=n_rounds,
+        flex=flex_type.replace(" ", "").replace("/", ""),
+        n_players=n_players,
+    )
+
+
+def measure(function, repeat):
+    """
+    Returns
+    -------
+    result : Return value of the last call
+    seconds : Best wall time over repeat calls
+    peak_bytes : Peak memory traced by tracemalloc during the first call
+
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        result = function()
+        seconds = min(seconds, time.perf_counter() - start)
+    return result, seconds, peak_bytes
+
+
+def benchmark_league(n_teams, n_rounds, flex_type, n_players, repeat):
+    """
+    Returns
+    -------
+    stages : Dictionary of stage name to {"seconds", "peak_bytes"} or
+    {"skipped": reason}
+
+    """
+
+    stages = {}
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        settings = synthetic_league(directory, n_teams, n_rounds, flex_type, n_players)
+        os.chdir(directory)
+        try:
+            Draft = main.Draft_Setup(**settings)
+            draft_picks = settings["draft_picks"]
+            position_counts = Draft.position_counts()
+
+            size = count_arrangements(position_counts)
+            if size > MAX_COMBINATIONS:
+                stages["position_combinations"] = {
+                    "skipped": "{size} combinations".format(size=size)
+                }
+            else:
+                _, seconds, peak_bytes = measure(
+                    lambda: main.generate_position_combinations(*Draft.starters()),
+                    repeat,
+                )
+                stages["position_combinations"] = {
+                    "seconds": seconds,
+                    "peak_bytes": peak_bytes,
+                }
+
+            # The first load scores the projections, later loads hit the artifact cache
+            all_players, seconds, peak_bytes = measure(Draft.initialize_player_data, 1)
+            stages["initialize_player_data_cold"] = {
+                "seconds": seconds,
+                "peak_bytes": peak_bytes,
+            }
+            _, seconds, peak_bytes = measure(Draft.initialize_player_data, repeat)
+            stages["initialize_player_data_warm"] = {
+                "seconds": seconds,
+                "peak_bytes": peak_bytes,
+            }
+
+            active_pick = draft_picks[0]
+            position_value_by_round, seconds, peak_bytes = measure(
+                lambda: main.positional_value_by_round(
+                    active_pick, draft_picks, all_players
+                ),
+                repeat,
+            )
+            stages["positional_value_by_round"] = {
+                "seconds": seconds,
+                "peak_bytes": peak_bytes,
+            }
+
+            _, seconds, peak_bytes = measure(
+                lambda: main.remaining_draft_value(
+                    active_pick, draft_picks, position_value_by_round, position_counts, []
+                ),
+                repeat,
+            )
+            stages["remaining_draft_value"] = {
+                "seconds": seconds,
+                "peak_bytes": peak_bytes,
+            }
+
+            if max(draft_picks) > n_players:
+                stages["start_draft"] = {"skipped": "not enough players"}
+            else:
+                _, seconds, peak_bytes = measure(
+                    lambda: main.start_draft(
+                        Draft, choose_player=lambda recommendations: recommendations.index[0]
+                    ),
+                    repeat,
+                )
+                stages["start_draft"] = {"seconds": seconds, "peak_bytes": peak_bytes}
+        finally:
+            os.chdir(working_directory)
+
+    return stages
+
+
+def find_regressions(results, baseline, tolerance, noise_floor):
+    regressions = []
+    for league, stages in results.items():
+        for stage, result in stages.items():
+            previous = baseline.get(league, {}).get(stage, {})
+            if "seconds" not in result or "seconds" not in previous:
+                continue
+            if (
+                result["seconds"] > previous["seconds"] * (1 + tolerance)
+                and result["seconds"] - previous["seconds"] > noise_floor
+            ):
+                regressions.append((league, stage, previous["seconds"], result["seconds"]))
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--full", action="store_true", help="run every league configuration")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--noise-floor", type=float, default=0.002, help="ignore slowdowns under this many seconds"
+    )
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    leagues = DEFAULT_LEAGUES
+    if args.full:
+        leagues = full_grid_leagues()
+
+    results = {}
+    for league in leagues:
+        n_teams, n_rounds, flex_type, n_players = league
+        name = league_name(*league)
+        results[name] = benchmark_league(n_teams, n_rounds, flex_type, n_players, args.repeat)
+        for stage, result in results[name].items():
+            if "skipped" in result:
+                print("{name:<28} {stage:<30} skipped ({reason})".format(
+                    name=name, stage=stage, reason=result["skipped"]))
+            else:
+                print("{name:<28} {stage:<30} {ms:>10.2f} ms {mb:>9.2f} MB".format(
+                    name=name,
+                    stage=stage,
+                    ms=result["seconds"] * 1000,
+                    mb=result["peak_bytes"] / 1024 ** 2,
+                ))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print("Saved baseline to {path}".format(path=args.baseline))
+        return 0
+
+    if not args.baseline.exists():
+        print("No baseline at {path}, run with --save-baseline".format(path=args.baseline))
+        return 0
+
+    regressions = find_regressions(
+        results, json.loads(args.baseline.read_text()), args.tolerance, args.noise_floor
+    )
+    for league, stage, before, after in regressions:
+        print("REGRESSION {league} {stage}: {before:.2f} ms -> {after:.2f} ms".format(
+            league=league, stage=stage, before=before * 1000, after=after * 1000))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
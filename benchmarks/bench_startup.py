@@ -0,0 +1,141 @@
+"""
+Measure the cold start of the entry points and core modules.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup                  # compare to the baseline
+    python -m benchmarks.bench_startup --save-baseline  # record a new baseline
+
+Every module is imported in a fresh interpreter and reports its best wall
+time over --repeat runs. The run exits with status 1 if any import is slower
+than the baseline by more than --tolerance, or if importing it loads one of
+the HEAVY_MODULES that are only needed once the app is doing work.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+BASELINE_FILE = REPO_ROOT / "benchmarks" / "startup_baseline.json"
+
+# Entry points, followed by every module under pages/utils
+ENTRY_POINTS = ["main", "server", "replay"]
+
+# Modules that must not be loaded just by importing the app
+HEAVY_MODULES = ["seaborn", "matplotlib", "sklearn", "scipy", "streamlit"]
+
+# Imported in the fresh interpreter, prints the heavy modules that got loaded
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(seconds, ",".join(heavy))
+"""
+
+
+def startup_modules():
+    modules = list(ENTRY_POINTS)
+    for path in sorted((REPO_ROOT / "pages" / "utils").glob("*.py")):
+        modules.append("pages.utils.{name}".format(name=path.stem))
+    return modules
+
+
+def measure_import(module, repeat):
+    """
+    Returns
+    -------
+    seconds : Best time to import the module in a fresh interpreter
+    process_seconds : Best wall time of the whole interpreter, including its
+    own startup
+    heavy : List of the HEAVY_MODULES the import loaded
+
+    """
+
+    seconds = process_seconds = float("inf")
+    heavy = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        process_seconds = min(process_seconds, time.perf_counter() - start)
+        seconds = min(seconds, float(output[0]))
+        heavy = output[1].split(",") if len(output) > 1 else []
+    return seconds, process_seconds, heavy
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--noise-floor", type=float, default=0.02, help="ignore slowdowns under this many seconds"
+    )
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # Compile once so every run measures a warm bytecode cache, like a built image
+    subprocess.run(
+        [sys.executable, "-m", "compileall", "-q", "main.py", "server.py", "replay.py", "pages"],
+        cwd=REPO_ROOT,
+        check=True,
+    )
+
+    results = {}
+    failures = []
+    for module in startup_modules():
+        seconds, process_seconds, heavy = measure_import(module, args.repeat)
+        results[module] = {"seconds": seconds, "process_seconds": process_seconds}
+        print("{module:<36} {ms:>9.1f} ms  (process {process_ms:.1f} ms){heavy}".format(
+            module=module,
+            ms=seconds * 1000,
+            process_ms=process_seconds * 1000,
+            heavy="  loads " + ", ".join(heavy) if heavy else "",
+        ))
+        if heavy:
+            failures.append("{module} loads {heavy}".format(module=module, heavy=", ".join(heavy)))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print("Saved baseline to {path}".format(path=args.baseline))
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        for module, result in results.items():
+            previous = baseline.get(module)
+            if previous is None:
+                continue
+            if (
+                result["seconds"] > previous["seconds"] * (1 + args.tolerance)
+                and result["seconds"] - previous["seconds"] > args.noise_floor
+            ):
+                failures.append("{module}: {before:.1f} ms -> {after:.1f} ms".format(
+                    module=module,
+                    before=previous["seconds"] * 1000,
+                    after=result["seconds"] * 1000,
+                ))
+    else:
+        print("No baseline at {path}, run with --save-baseline".format(path=args.baseline))
+
+    for failure in failures:
+        print("REGRESSION {failure}".format(failure=failure))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
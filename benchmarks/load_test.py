@@ -0,0 +1,179 @@
+"""
+Load test the draft recommendation server with many concurrent drafts.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test                    # 200 drafts on a local server
+    python -m benchmarks.load_test --drafts 500 --workers 8
+    python -m benchmarks.load_test --port 8765        # against a running server
+
+Each simulated draft opens its own connection. Opponents pick by ADP with
+noise and the manager takes the top recommendation at each of their picks.
+Reports the latency of the recommendations and the throughput of the server.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import server  # noqa: E402
+from benchmarks.synthetic import LINEUPS, synthetic_league  # noqa: E402
+
+
+def roster_for(settings):
+    return {
+        "QB": settings["n_QB"],
+        "RB": settings["n_RB"],
+        "WR": settings["n_WR"],
+        "TE": settings["n_TE"],
+        "Flex": settings["n_FLEX"],
+        "Bench": settings["n_BENCH"],
+    }
+
+
+async def simulate_draft(draft_id, host, port, players, roster, flex_type, n_teams, seed):
+    """
+    Returns
+    -------
+    latencies : List of the seconds each recommendation took
+    n_requests : Number of requests the draft made
+    """
+
+    rng = np.random.default_rng(seed)
+    # Opponents take players in order of a noisy draw around their ADP
+    adp_order = np.argsort(
+        players["ADP Avg"].to_numpy() + rng.normal(0, 1, len(players)) * players["ADP Std"].to_numpy()
+    )
+    names = players["Player"].to_numpy()[adp_order]
+    taken = set()
+    next_opponent = 0
+
+    client = await server.DraftClient.connect(host, port)
+    latencies = []
+    n_requests = 1
+    try:
+        response = await client.request(
+            "create",
+            draft_id=draft_id,
+            first_pick=int(rng.integers(1, n_teams + 1)),
+            n_teams=n_teams,
+            roster=roster,
+            flex_type=flex_type,
+        )
+        draft_picks = response["draft_picks"]
+        for pick in range(1, max(draft_picks) + 1):
+            if pick in draft_picks:
+                start = time.perf_counter()
+                response = await client.request("recommend", draft_id=draft_id, n=10)
+                latencies.append(time.perf_counter() - start)
+                n_requests += 1
+                player = response["recommendations"][0]["player"]
+            else:
+                while names[next_opponent] in taken:
+                    next_opponent += 1
+                player = names[next_opponent]
+            taken.add(player)
+            response = await client.request("pick", draft_id=draft_id, player=str(player))
+            n_requests += 1
+            if not response["ok"]:
+                raise RuntimeError(response["error"])
+        await client.request("close", draft_id=draft_id)
+        n_requests += 1
+    finally:
+        await client.close()
+    return latencies, n_requests
+
+
+async def run_load_test(args, players, roster, host, port):
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[
+            simulate_draft(
+                "draft-{i}".format(i=i),
+                host,
+                port,
+                players,
+                roster,
+                args.flex_type,
+                args.teams,
+                args.seed + i,
+            )
+            for i in range(args.drafts)
+        ]
+    )
+    seconds = time.perf_counter() - start
+
+    latencies = np.concatenate([latency for latency, _ in results]) * 1000
+    n_requests = sum(n for _, n in results)
+    print("{drafts} drafts, {requests} requests in {seconds:.2f} s ({rate:.0f} requests/s)".format(
+        drafts=args.drafts, requests=n_requests, seconds=seconds, rate=n_requests / seconds))
+    print("recommendations: {n}  p50 {p50:.1f} ms  p95 {p95:.1f} ms  p99 {p99:.1f} ms  max {max:.1f} ms".format(
+        n=len(latencies),
+        p50=np.percentile(latencies, 50),
+        p95=np.percentile(latencies, 95),
+        p99=np.percentile(latencies, 99),
+        max=latencies.max(),
+    ))
+
+
+async def run_local(args):
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        settings = synthetic_league(
+            directory, args.teams, args.rounds, args.flex_type, args.players, seed=args.seed
+        )
+        os.chdir(directory)
+        try:
+            players = server.load_players(settings["year"])
+        finally:
+            os.chdir(working_directory)
+
+    draft_server = server.DraftServer(players, args.workers)
+    try:
+        port = await draft_server.start(port=0)
+        print("Local server with {n} players ({mb:.2f} MB shared)".format(
+            n=len(players), mb=draft_server.players.nbytes / 1024 ** 2))
+        await run_load_test(args, players, roster_for(settings), "127.0.0.1", port)
+    finally:
+        await draft_server.close()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drafts", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--flex-type", default="Standard", choices=list(LINEUPS))
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--port", type=int, help="load test a running server instead of starting one"
+    )
+    args = parser.parse_args(argv)
+
+    if args.port is None:
+        asyncio.run(run_local(args))
+        return 0
+
+    # A running server has its own players, so the drafts use the repository's
+    # projections for the same year
+    players = server.load_players(2021)
+    lineup = LINEUPS[args.flex_type]
+    settings = dict(lineup, n_BENCH=args.rounds - sum(lineup.values()))
+    asyncio.run(run_load_test(args, players, roster_for(settings), args.host, args.port))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.draft_state import snake_draft_picks
+
+# Share of the player pool at each position, roughly matching season_projections.csv
+POSITION_SHARES = {"QB": 0.13, "RB": 0.34, "WR": 0.40, "TE": 0.13}
+
+# Synthetic WAR models, WAR = intercept + slope * FPTS
+WAR_COEFFICIENTS = {
+    "QB": (-4.0, 0.014),
+    "RB": (-2.0, 0.016),
+    "WR": (-2.0, 0.014),
+    "TE": (-1.5, 0.016),
+}
+
+# Starting lineups for each flex type, before bench spots are added
+LINEUPS = {
+    "Standard": {"n_QB": 1, "n_RB": 2, "n_WR": 2, "n_TE": 1, "n_FLEX": 1},
+    "Super Flex": {"n_QB": 1, "n_RB": 2, "n_WR": 2, "n_TE": 1, "n_FLEX": 2},
+    "RB/WR": {"n_QB": 1, "n_RB": 2, "n_WR": 3, "n_TE": 1, "n_FLEX": 1},
+}
+
+
+def synthetic_projections(n_players: int, seed: int = 0):
+    """
+    Returns
+    -------
+    season_projections : Dataframe in the same layout as
+    data/{year}/season_projections.csv with n_players made up players. Points
+    fall off with rank at each position and ADP follows overall value.
+
+    """
+
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(
+        list(POSITION_SHARES), size=n_players, p=list(POSITION_SHARES.values())
+    )
+    fpts = np.empty(n_players)
+    for position in POSITION_SHARES:
+        at_position = positions == position
+        rank = np.arange(at_position.sum())
+        fpts[at_position] = 380 * np.exp(-rank / (0.25 * at_position.sum() + 1)) + 20
+    fpts = np.round(fpts + rng.normal(0, 5, n_players), 1)
+
+    # Players are drafted roughly in order of points with noise
+    adp_avg = np.argsort(np.argsort(-fpts + rng.normal(0, 30, n_players))) + 1.0
+    adp_std = np.round(1 + 0.08 * adp_avg + rng.uniform(0, 2, n_players), 1)
+
+    return pd.DataFrame(
+        {
+            "Player": ["Player {i}".format(i=i) for i in range(n_players)],
+            "Team": rng.choice(["ARI", "BUF", "DAL", "GB", "KC", "SF"], n_players),
+            "Pos": positions,
+            "FPTS": fpts,
+            "ADP Avg": adp_avg,
+            "ADP Std": adp_std,
+        }
+    )
+
+
+def synthetic_league(
+    directory: str,
+    n_teams: int,
+    n_rounds: int,
+    flex_type: str,
+    n_players: int,
+    first_pick: int = 1,
+    year: int = 2021,
+    seed: int = 0,
+):
+    """
+    Write a synthetic projection file and WAR coefficient table under
+    directory, laid out like the repository (data/{year}/season_projections.csv
+    and war_models/PPR.csv).
+
+    Returns
+    -------
+    settings : Dictionary of Draft_Setup arguments for the league. Rounds past
+    the starting lineup are bench spots.
+
+    """
+
+    os.makedirs(os.path.join(directory, "data", str(year)), exist_ok=True)
+    os.makedirs(os.path.join(directory, "war_models"), exist_ok=True)
+    synthetic_projections(n_players, seed).to_csv(
+        os.path.join(directory, "data", str(year), "season_projections.csv"),
+        index=False,
+    )
+    pd.DataFrame(
+        {
+            "Pos": list(WAR_COEFFICIENTS),
+            "intercept": [intercept for intercept, _ in WAR_COEFFICIENTS.values()],
+            "slope": [slope for _, slope in WAR_COEFFICIENTS.values()],
+        }
+    ).to_csv(os.path.join(directory, "war_models", "PPR.csv"), index=False)
+
+    lineup = LINEUPS[flex_type]
+    n_bench = n_rounds - sum(lineup.values())
+    if n_bench < 0:
+        raise ValueError(
+            "{flex_type} needs at least {n} rounds".format(
+                flex_type=flex_type, n=sum(lineup.values())
+            )
+        )
+
+    return dict(
+        lineup,
+        flex_type=flex_type,
+        draft_picks=snake_draft_picks(first_pick, n_teams, n_rounds),
+        year=year,
+        n_BENCH=n_bench,
+    )
@@ -1,35 +1,46 @@
 # %%
-import itertools
 import numpy as np
 import pandas as pd
-import pickle
-from scipy.stats import norm
-import seaborn as sns
-
-# ONLY SET UP FOR 1QB, 2RB, 2WR, 1TE, 1FLEX(RB,WR,TE) AS OF NOW
-# HAVE NOT ATTEMPTED TWO FLEX POSITIONS, NOT SURE IF ITERTOOLS.PRODUCT WILL WORK
+from pages.utils.artifact_cache import (
+    ArtifactCache, arrays_to_frame, artifact_key, file_hash, frame_to_arrays)
+from pages.utils.draft_history import DraftHistory
+from pages.utils.draft_state import DraftState
+from pages.utils.draft_value import optimal_draft_value
+from pages.utils.instrumentation import NULL_TIMER, timer_from_environment
+from pages.utils.position_combinations import (
+    FLEX_TYPES, POSITION_CODES, POSITIONS, drop_unsupported_positions, encode_positions,
+    generate_position_combinations, position_count_vectors)
+from pages.utils.positional_value import positional_values
+from pages.utils.war import (
+    apply_war_coefficients, load_war_coefficients, war_coefficients_path)
 
 
 class Draft_Setup:
 
-    def __init__(self, n_QB, n_RB, n_WR, n_TE, n_FLEX, flex_type, draft_picks, year):
+    def __init__(self, n_QB, n_RB, n_WR, n_TE, n_FLEX, flex_type, draft_picks, year, n_BENCH=0,
+                 scoring='PPR', n_teams=None):
         self.n_QB = n_QB
         self.n_RB = n_RB
         self.n_WR = n_WR
         self.n_TE = n_TE
         self.n_FLEX = n_FLEX
+        # Bench spots can be filled by any of QB, RB, WR or TE
+        self.n_BENCH = n_BENCH
         # Either: Standard (RB, WR, TE), Super Flex (RB, WR, TE, QB), RB/WR or None
         self.flex_type = flex_type
         self.draft_picks = draft_picks
         self.year = year
+        # Scoring format (PPR, Half-PPR, Standard) and league size pick the WAR model
+        self.scoring = scoring
+        self.n_teams = n_teams
 
-    def initialize_player_data(self):
+    def initialize_player_data(self, timer=NULL_TIMER):
         '''
 
         Parameters
         ----------
-        year : TYPE
-            DESCRIPTION.
+        timer : PickTimer to record the cache_load stage in, and the csv_load and
+        war_scoring stages when the projections aren't cached
 
         Returns
         -------
@@ -41,116 +52,91 @@ class Draft_Setup:
 
         '''
 
-        # Load the season projection data
-        season_projections = pd.read_csv(
-            './data/{year}/season_projections.csv'.format(year=self.year))
-
-        # Load the linear regression models that define the wins above replacement
-        # for each player based on their position
-        WAR_file = open('./war_linear_models/PPR.pickle', 'rb')
-        WAR_linear_models = pickle.load(WAR_file)
-
-        def apply_WAR_model(points, position):
-            '''
+        projection_file = './data/{year}/season_projections.csv'.format(year=self.year)
+        WAR_file = war_coefficients_path(self.scoring, n_teams=self.n_teams)
+
+        def score_projections():
+            # Load the season projection data
+            with timer.stage('csv_load'):
+                season_projections = drop_unsupported_positions(pd.read_csv(projection_file))
+
+            # Load the linear models that define the wins above replacement for each
+            # player based on their position. Fitted for the scoring format and league
+            # size by war_fitting, or converted from war_linear_models/PPR.pickle with
+            # convert_war_pickle so sklearn isn't needed at startup.
+            with timer.stage('war_scoring'):
+                WAR_coefficients = load_war_coefficients(self.scoring, n_teams=self.n_teams)
+
+                # Score every player in one grouped, vectorized operation
+                season_projections['WAR'] = apply_war_coefficients(
+                    season_projections, WAR_coefficients)
+
+            return frame_to_arrays(season_projections)
+
+        # The scored projections only change when the projection file or WAR models do
+        key = artifact_key(artifact='season_projections',
+                           projections=file_hash(projection_file),
+                           WAR_model=file_hash(WAR_file))
+        cache = ArtifactCache()
+        with timer.stage('cache_load'):
+            arrays = cache.load(key)
+            if arrays is not None:
+                return arrays_to_frame(arrays)
+        return arrays_to_frame(cache.get_or_compute(key, score_projections))
+
+    def starters(self):
+        '''
 
-            Parameters
-            ----------
-            points : Projected fantasy points for the season to be input 
-            into the linear regression model.
-            position : Players position that will be used to look up the 
-            linear regression model to calculate the WAR.
+        Returns
+        -------
+        n_starters : Dictionary of the number of starters per position (excluding K, and DST or IDP)
+        flex_positions : List of positions eligible for the FLEX "position"
 
-            Returns
-            -------
-            WAR : The players projected wins above replacement based on the 
-            projected season fantasy points. 
+        '''
 
-            '''
-            WAR = float(WAR_linear_models[position].predict([[points]]))
-            return WAR
+        n_starters = {
+            'QB': self.n_QB,
+            'RB': self.n_RB,
+            'WR': self.n_WR,
+            'TE': self.n_TE,
+            'Flex': self.n_FLEX,
+            'Bench': self.n_BENCH
+        }
 
-        # Apply the calculate_WAR function for each player to determine the predicted
-        # wins above replacement.
-        # Must be done iterating over rows (unless there's an easier options)
-        season_projections['WAR'] = season_projections[['FPTS', 'Pos']].apply(
-            lambda row: apply_WAR_model(*row), axis=1)
+        # Setup the list of flex positions based on the user input
+        flex_positions = FLEX_TYPES[self.flex_type]
 
-        return season_projections
+        return n_starters, flex_positions
 
-    def position_combinations(self):
+    def position_counts(self):
         '''
 
-
         Returns
         -------
-        all_position_combinations :
+        position_counts : int16 array of shape (n_rosters, len(POSITIONS))
+            Every distinct number of players per position that fills the starting roster.
 
         '''
 
-        # Setup the list of starting positions and the number of starters (excluding K, and DST or IDP)
-        positions = {
-            'QB': self.n_QB,
-            'RB': self.n_RB,
-            'WR': self.n_WR,
-            'TE': self.n_TE,
-            'FLEX': self.n_FLEX
-        }
+        return position_count_vectors(*self.starters())
 
-        combined_positions = []
-        for key, value in positions.items():
-            for i in range(value):
-                combined_positions.append(key)
+    def position_combinations(self):
+        '''
 
-        # Setup the list of flex positions based on the user input
-        if self.flex_type == 'Standard':
-            flex_positions = ['RB', 'WR', 'TE']
-        elif self.flex_type == 'Super Flex':
-            flex_positions = ['QB', 'RB', 'WR', 'TE']
-        elif self.flex_type == 'RB/WR':
-            flex_positions = ['RB', 'WR']
-        elif self.flex_type == 'None':
-            pass
-
-        # Initial list of of draft combinations with the FLEX "position"
-        initial_draft_combinations = (
-            set(itertools.permutations(combined_positions)))
-
-        # Skip all the extra steps if there are no FLEX "positions"
-        if self.flex_type != 'None':
-            '''
-            Map the flex_positions list to every location where the FLEX "position" occurs
-            Convert each non-Flex position to it's own list to properly use itertools.product in the next step
-            Use itertools.product to get all lists from list containing flex players list
-
-            EXAMPLE:
-            Intial list: ['QB','WR','TE','FLEX','RB','RB','WR'] 
-            List with flex replaced: ['QB','WR','TE',['RB','WR','TE'],'RB','RB','WR'] 
-            Lists after itertools.product:
-                    ['QB','WR','TE','RB','RB','RB','WR'] 
-                    ['QB','WR','TE','WR','RB','RB','WR'] 
-                    ['QB','WR','TE','TE','RB','RB','WR'] 
-            '''
-            modified_draft_combinations = [list(map(lambda x: [x] if x != 'FLEX' else flex_positions, i))
-                                           for i in initial_draft_combinations]
-
-            modified_draft_combinations = [list(itertools.product(*modified_draft_combinations[i]))
-                                           for i in range(len(modified_draft_combinations))]
-
-            # The modified_draft_combinations is a list of lists of lists
-            # Reappend the list so it is a list of lists instead
-            draft_combinations_combined = []
-            for outside_list in modified_draft_combinations:
-                for i in range(len(outside_list)):
-                    draft_combinations_combined.append(outside_list[i])
-
-            # Convert the list of lists into a dataframe
-            all_position_combinations = pd.DataFrame(
-                set(draft_combinations_combined))
-        else:
-            all_position_combinations = pd.DataFrame(
-                (initial_draft_combinations))
+        Returns
+        -------
+        all_position_combinations : int8 array of shape (rounds, combos)
+            Every distinct order the starting positions can be drafted in.
+            Positions are stored as the codes in POSITION_CODES.
+
+        '''
 
-        return all_position_combinations
+        n_starters, flex_positions = self.starters()
+        key = artifact_key(artifact='position_combinations',
+                           n_starters=n_starters, flex_positions=flex_positions)
+        return ArtifactCache().get_or_compute(key, lambda: {
+            'combinations': generate_position_combinations(n_starters, flex_positions)
+        })['combinations']
 
 
 def positional_value_by_round(active_pick, draft_picks, undrafted_players):
@@ -173,55 +159,33 @@ def positional_value_by_round(active_pick, draft_picks, undrafted_players):
 
     '''
 
-    def grouped_probability(df, i):
-
-        # Sort the WAR value descending in order to classify the order of "best" players
-        df.sort_values(by='WAR', ascending=False)
-
-        # Calculate the probability that each player is available at the specified draft pick
-        df['p_Available'] = 1-norm(df.loc[:,'ADP Avg'], df.loc[:,'ADP Std']).cdf(i)
-
-        # Calculate the probability that each player is NOT available at the specified draft pick
-        df['p_Not Available'] = norm(df['ADP Avg'], df['ADP Std']).cdf(i)
-
-        # Calculate the probability that this player is the best available player at their position
-        # First, take the cumulative product of the p_Not Available for all players better than
-        # the player in question. This is accomplished by shifting the values down 1 since
-        # cumprod() also includes the the row we are analyzing.
-        # Then multiply the player in questions p_Available by the cumulative product previously calculated.
-        df['p_Best Available'] = (
-            (df['p_Not Available'].cumprod()).shift(1))*df['p_Available']
-
-        # Since the dataframes were shifted, the top player in each dataframe will have an nan value.
-        # Replace the nan value with this players p_Available since they are the best available.
-        df['p_Best Available'].fillna(df['p_Available'], inplace=True)
+    # Only consider future rounds. Round numbers start at 1 like the draft_picks order.
+    future_rounds = [round_number for round_number, i in enumerate(draft_picks, start=1)
+                     if i > active_pick]
+    future_picks = [draft_picks[round_number-1] for round_number in future_rounds]
 
-        # Determine the adjusted player WAR based on the p_Best Available
-        # dWAR = dynamic Wins Above Replacement
-        df['dWAR'] = df['WAR']*df['p_Best Available']
+    # Players at positions without a code (e.g. IDP) have no positional value
+    undrafted_players = undrafted_players[undrafted_players['Pos'].isin(list(POSITION_CODES))]
 
-        return df
+    # Calculate the availability, best available probability and dWAR for every
+    # player at every future pick in a single pass. The players are sorted by WAR
+    # within each position inside positional_values.
+    position_values, positions_present = positional_values(
+        undrafted_players['WAR'].to_numpy(),
+        encode_positions(undrafted_players['Pos']),
+        undrafted_players['ADP Avg'].to_numpy(),
+        undrafted_players['ADP Std'].to_numpy(),
+        future_picks)
 
     position_value_by_round = {}
-    round_counter = 1
-    for i in draft_picks:
-
-        # Only consider future rounds.
-        if i > active_pick:
-
-            undrafted_players = undrafted_players.groupby(
-                by='Pos').apply(grouped_probability, i=i)
-            positional_value = undrafted_players.groupby('Pos').sum()['dWAR']
-            position_value_by_round[round_counter] = positional_value.to_dict()
-        else:
-            pass
-
-        round_counter = round_counter+1
+    for round_values, round_number in zip(position_values, future_rounds):
+        position_value_by_round[round_number] = {
+            POSITIONS[code]: round_values[code] for code in np.flatnonzero(positions_present)}
 
     return position_value_by_round
 
 
-def remaining_draft_value(active_pick, draft_picks, position_value_by_round, position_combinations):
+def remaining_draft_value(active_pick, draft_picks, position_value_by_round, position_counts, drafted_positions):
     '''
 
     Parameters
@@ -229,7 +193,8 @@ def remaining_draft_value(active_pick, draft_picks, position_value_by_round, pos
     active_pick : Integer of the active pick in the draft
     draft_picks : List of the managers draft picks
     position_value_by_round : Dictionary of dictionaries with values for each position in each remaining round
-    undrafted_players : Dataframe of all undrafted players 
+    position_counts : Array of every valid number of players per position for the roster
+    drafted_positions : List of the positions the manager has already drafted
 
     Returns
     -------
@@ -240,100 +205,140 @@ def remaining_draft_value(active_pick, draft_picks, position_value_by_round, pos
 
     '''
 
-    round_counter = 1
-    temp_df = pd.DataFrame()
-    for i in draft_picks:
-        # Only consider future rounds.
-        if i > active_pick:
-            temp_df[round_counter] = position_combinations.loc[:,
-                                                               round_counter-1].map(position_value_by_round[round_counter])
-        # If pick has already occured, drop that rounds column from the combinations
-        else:
-            pass
-        round_counter = 1+round_counter
+    # Convert the positional values of the future rounds into a (rounds x positions) array.
+    # Positions without a value add nothing to a combination.
+    future_rounds = sorted(position_value_by_round)
+    round_values = np.zeros((len(future_rounds), len(POSITIONS)))
+    for round_index, round_number in enumerate(future_rounds):
+        for position, value in position_value_by_round[round_number].items():
+            round_values[round_index, POSITION_CODES[position]] = value
 
-    position_combinations['Total'] = temp_df.sum(axis=1)
-    position_combinations.sort_values(
-        by='Total', ascending=False, inplace=True)
+    drafted_counts = np.zeros(len(POSITIONS), dtype=np.int16)
+    for position in drafted_positions:
+        drafted_counts[POSITION_CODES[position]] += 1
 
-    current_round = draft_picks.index(active_pick)
-    combined_position_value = position_combinations.groupby(
-        position_combinations.iloc[:, current_round])['Total'].max()
-    combined_position_value = combined_position_value.to_dict()
-    return combined_position_value
+    # Find the best remaining value for each position this round over the remaining
+    # positional counts instead of scoring every surviving draft combination
+    return optimal_draft_value(round_values, position_counts, drafted_counts)
 
 
-def start_draft():
-    draft_picks = [3, 22, 27, 46, 51, 70, 75]
-    Draft = Draft_Setup(1, 2, 2, 1, 1, 'Standard', draft_picks, 2021)
-    all_players = Draft.initialize_player_data()
-    all_position_combinations = Draft.position_combinations()
-
-    drafted_players = []
-    my_team = []
-    active_pick = 1
-    remaining_draft_combinations = all_position_combinations.copy()
-    for j in range(1, 76):
-        undrafted_players = all_players[~all_players['Player'].isin(
-            drafted_players)]
-
-        if j in draft_picks:
-
-            # Calculate the positional value by round
-            position_value_by_round = positional_value_by_round(
-                active_pick, draft_picks, undrafted_players)
-
-            # Calculate combined value of all future rounds by position
-            combined_position_value = remaining_draft_value(
-                active_pick, draft_picks, position_value_by_round, remaining_draft_combinations)
-
-            # Calculated the dynamic WAR for each player
-            undrafted_players.loc[:,'dWAR'] = undrafted_players['Pos'].map(
-                combined_position_value)+undrafted_players.loc[:,'WAR']
-            undrafted_players.sort_values(
-                by='dWAR', ascending=False, inplace=True)
-
-            # Get the managers selection
-            cols_to_display = ['Player', 'Team', 'Pos', 'FPTS']
-            print(undrafted_players[cols_to_display].head(10))
-            player_selected = int(input('Enter the player index : '))
-
-            # Add the selected player to the drafted_players list and the my_team list
-            drafted_players.append(
-                undrafted_players.loc[player_selected, 'Player'])
-            my_team.append(undrafted_players.loc[player_selected, 'Player'])
-
-            # Drop all rows without the players position in the selected round from
-            # the remaining_draft_combinations dataframe
-            drafted_position = undrafted_players.loc[player_selected, 'Pos']
-            column_lookup = draft_picks.index(j)
-
-            # Remove all draft combinations that didn't include the position selected this round
-            remaining_draft_combinations = remaining_draft_combinations[remaining_draft_combinations.iloc[:, column_lookup].isin([drafted_position])]
-            print(remaining_draft_combinations.head(10))
-
-            active_pick = active_pick+1
-        else:
-            undrafted_players.sort_values(
-                by='ADP Avg', ascending=True, inplace=True)
+# Returned by choose_player to take back the managers previous pick
+UNDO = 'undo'
 
-            # Add the selected player to the drafted_players list
-            # cols_to_display=['Player','Team','Pos','FPTS']
-            # print(undrafted_players[cols_to_display].head(10))
-            #player_selected=int(input('Enter the player index : '))
-            undrafted_players.sort_values(
-                by='ADP Avg', ascending=True, inplace=True)
-            player_selected = undrafted_players.iloc[0, undrafted_players.columns.get_loc(
-                'Player')]
 
-            # Add the selected player to the drafted_players list
-            # loc[player_selected,'Player'])
-            drafted_players.append(player_selected)
-            active_pick = active_pick+1
+def prompt_player_selection(recommendations):
+    '''
+
+    Parameters
+    ----------
+    recommendations : Dataframe of undrafted players sorted by dWAR
+
+    Returns
+    -------
+    player_selected : Index of the player the manager entered, or UNDO if they
+    entered u
+
+    '''
 
+    cols_to_display = ['Player', 'Team', 'Pos', 'FPTS', 'dWAR']
+    if 'Robustness' in recommendations:
+        cols_to_display.append('Robustness')
+    print(recommendations[cols_to_display].head(10))
+    selection = input('Enter the player index (or u to undo your last pick) : ')
+    if selection.strip().lower() == 'u':
+        return UNDO
+    return int(selection)
 
-start_draft()
 
+def start_draft(Draft, choose_player=prompt_player_selection, speculate=False, timer=None,
+                scenarios=None):
+    '''
+
+    Parameters
+    ----------
+    Draft : Draft_Setup with the league settings and the managers draft picks
+    choose_player : Function that takes the recommendations Dataframe at each of the
+    managers picks and returns the index of the player to draft, or UNDO to rewind
+    the draft to the managers previous pick. Defaults to asking the manager for
+    their selection.
+    speculate : Precompute the managers next recommendation in a background thread
+    while the opponents pick
+    timer : PickTimer to record per-pick timings and counters in. Defaults to the
+    FF_DRAFT_PROFILE environment variable, which turns profiling on when it is set
+    to a JSON-lines output path.
+    scenarios : ProjectionScenarios (e.g. from perturbed_scenarios) to add a Robustness
+    column to the recommendations, the share of scenarios each player is in the top 5 in
+
+    Returns
+    -------
+    state : DraftState after the managers last pick. state.my_team holds the
+    indices of the managers players in state.players.
+
+    '''
+
+    if timer is None:
+        timer = timer_from_environment()
+
+    timer.start('setup')
+    all_players = Draft.initialize_player_data(timer)
+    state = DraftState(all_players, Draft.draft_picks, Draft.position_counts(), timer)
+    # Checkpoints every pick so an undo only recomputes what the rewound picks changed
+    history = DraftHistory(state)
+    speculator = None
+    if speculate:
+        # Optional features are only imported when they are used to keep startup fast
+        from pages.utils.speculation import RecommendationSpeculator
+        speculator = RecommendationSpeculator(state)
+    if scenarios is not None:
+        from pages.utils.sensitivity import robustness
+    timer.finish()
+
+    while state.current_pick <= max(Draft.draft_picks):
+        j = state.current_pick
+        timer.start('pick', pick=j, mine=state.is_my_pick())
+        if state.is_my_pick():
+            # Rank the undrafted players by dynamic WAR. Only the positions that
+            # had a player drafted since the last pick have their values recomputed.
+            if speculator is not None:
+                recommendations = speculator.recommendations()
+            else:
+                recommendations = history.recommendations()
+            if scenarios is not None:
+                # Every scenario is valued in one batch with a scenario axis
+                with timer.stage('sensitivity'):
+                    recommendations = recommendations.join(
+                        robustness(state, scenarios)[['Robustness']])
+            # The managers own thinking time isn't part of the pick timings
+            timer.finish()
+            player_selected = choose_player(recommendations)
+            timer.start('selection', pick=j, mine=True)
+            if player_selected == UNDO:
+                # Back to the managers previous pick, the opponents picks since
+                # then are replayed from their ADP
+                previous_picks = [i for i in Draft.draft_picks if i < j]
+                if previous_picks:
+                    history.rewind(previous_picks[-1] - 1)
+            else:
+                history.pick(player_selected)
+
+            # Start valuing the likely boards at the next pick as the opponents pick
+            if speculator is not None:
+                speculator.start()
+        else:
+            # Opponents take the undrafted player with the lowest ADP
+            with timer.stage('opponent_pick'):
+                history.pick(state.next_adp_player())
+        timer.finish()
+
+    if speculator is not None:
+        speculator.close()
+
+    return state
+
+
+if __name__ == '__main__':
+    draft_picks = [3, 22, 27, 46, 51, 70, 75]
+    start_draft(Draft_Setup(1, 2, 2, 1, 1, 'Standard', draft_picks, 2021))
 
 
 #%%
@@ -1,11 +1,50 @@
-import itertools
-import pandas as pd
-import numpy as np
+import hashlib
+import os
+
 import streamlit as st
+from pages.utils.instrumentation import NULL_TIMER, timer_from_environment
+from pages.utils.position_combinations import (
+    count_arrangements,
+    drop_unsupported_positions,
+    position_count_vectors,
+)
+from pages.utils.projection_store import DEFAULT_SOURCE, ProjectionStore
+from pages.utils.scoring import ScoringEngine, has_stat_lines, scoring_format
+from pages.utils.war import (
+    apply_war_coefficients,
+    load_war_coefficients,
+    war_coefficients_path,
+)
 
 st.set_page_config(layout="wide")
 
 
+@st.cache_resource
+def projection_store():
+    # One store per server process so opened tables are shared between reruns
+    return ProjectionStore()
+
+
+def ingest_uploaded_projections(uploaded_file, year: int):
+    """
+    Returns
+    -------
+    projection_source : Name of the store source for the uploaded file. The
+    source is named by the file contents so uploading the same file again
+    doesn't ingest it twice.
+
+    """
+
+    contents = uploaded_file.getvalue()
+    projection_source = "custom-{digest}".format(
+        digest=hashlib.sha256(contents).hexdigest()[:16]
+    )
+    store = projection_store()
+    if not store.has_table(projection_source, year):
+        store.ingest(uploaded_file, projection_source, year)
+    return projection_source
+
+
 class DraftSettings:
     def __init__(
         self,
@@ -15,86 +54,105 @@ class DraftSettings:
         first_pick: int,
         n_teams: int,
         year: int,
+        projection_source: str = DEFAULT_SOURCE,
+        scoring_weights: dict = None,  # e.g. {"Pass TD": 4.0, "Rec": 1.0.....}
+        timer=NULL_TIMER,
     ):
         self.n_starters = n_starters
         self.flex_positions = flex_positions  # Standard (RB, WR, TE), Super Flex (RB, WR, TE, QB), RB/WR or None
-        self.scoring = scoring  # PPR, Half-PPR, Standard
+        self.scoring = scoring  # PPR, Half-PPR, Standard, selects the WAR model
         self.first_pick = first_pick
         self.n_teams = n_teams
         self.year = year
-        self.predictions = pd.read_csv(
-            "./data/{year}/season_projections.csv".format(year=self.year)
+        self.projection_source = projection_source
+        with timer.stage("csv_load"):
+            self.predictions = self.load_predictions()
+        with timer.stage("scoring"):
+            self.scoring_engine = self.build_scoring_engine(scoring_weights)
+        self.players = list(
+            projection_store().table(projection_source, year).player_index
         )
-        self.players = list(self.predictions.Player)
-        self.position_combinations = self.generate_position_combinations()
+        # Only the counts per position are needed to value the draft, the
+        # combinations themselves are counted without materializing them
+        with timer.stage("position_counts"):
+            self.position_counts = position_count_vectors(
+                self.drafted_starters(), self.flex_positions
+            )
+        timer.count("position_combinations", count_arrangements(self.position_counts))
 
-    def generate_position_combinations(self):
+    def load_predictions(self):
         """
         Returns
         -------
-        all_position_combinations :
+        predictions : Dataframe of the season projections for the projection
+        source and year, read from the columnar projection store. Players at
+        positions the draft doesn't value (e.g. IDP) are dropped.
 
         """
 
-        # Setup the list of starting positions and the number of starters (excluding K, and DST or IDP)
-        positions = {
-            "QB": self.n_starters["QB"],
-            "RB": self.n_starters["RB"],
-            "WR": self.n_starters["WR"],
-            "TE": self.n_starters["TE"],
-            "FLEX": self.n_starters["Flex"],
-        }
+        return drop_unsupported_positions(
+            projection_store().table(self.projection_source, self.year).to_frame()
+        )
 
-        combined_positions = []
-        for key, value in positions.items():
-            for i in range(value):
-                combined_positions.append(key)
-
-        # Initial list of of draft combinations with the FLEX "position"
-        initial_draft_combinations = set(itertools.permutations(combined_positions))
-
-        # Skip all the extra steps if there are no FLEX "positions"
-        if self.flex_positions != None:
-            """
-            Map the flex_positions list to every location where the FLEX "position" occurs
-            Convert each non-Flex position to it's own list to properly use itertools.product in the next step
-            Use itertools.product to get all lists from list containing flex players list
-
-            EXAMPLE:
-            Initial list: ['QB','WR','TE','FLEX','RB','RB','WR'] 
-            List with flex replaced: ['QB','WR','TE',['RB','WR','TE'],'RB','RB','WR'] 
-            Lists after itertools.product:
-                    ['QB','WR','TE','RB','RB','RB','WR'] 
-                    ['QB','WR','TE','WR','RB','RB','WR'] 
-                    ['QB','WR','TE','TE','RB','RB','WR'] 
-            """
-            modified_draft_combinations = [
-                list(map(lambda x: [x] if x != "FLEX" else self.flex_positions, i))
-                for i in initial_draft_combinations
-            ]
-
-            modified_draft_combinations = [
-                list(itertools.product(*modified_draft_combinations[i]))
-                for i in range(len(modified_draft_combinations))
-            ]
-
-            # The modified_draft_combinations is a list of lists of lists
-            # Reappend the list so it is a list of lists instead
-            draft_combinations_combined = []
-            for outside_list in modified_draft_combinations:
-                for i in range(len(outside_list)):
-                    draft_combinations_combined.append(outside_list[i])
-
-            # Convert the list of lists into a dataframe
-            all_position_combinations = pd.DataFrame(set(draft_combinations_combined))
-        else:
-            all_position_combinations = pd.DataFrame((initial_draft_combinations))
-
-        # Adjust the column names to match the round numbers
-        cols = np.arange(1, len(all_position_combinations.columns) + 1, 1)
-        all_position_combinations.set_axis(cols, axis=1, inplace=True)
-
-        return all_position_combinations
+    def build_scoring_engine(self, scoring_weights: dict):
+        """
+        Returns
+        -------
+        scoring_engine : ScoringEngine that recomputes FPTS (and WAR when a WAR
+        model is available) from the stat-line projections, or None if the
+        projections only have precomputed FPTS. Precomputed FPTS are still
+        scored by the WAR model when there is one.
+
+        """
+
+        WAR_coefficients = None
+        if os.path.exists(war_coefficients_path(self.scoring, n_teams=self.n_teams)):
+            WAR_coefficients = load_war_coefficients(self.scoring, n_teams=self.n_teams)
+
+        if not has_stat_lines(self.predictions):
+            if WAR_coefficients is not None:
+                self.predictions["WAR"] = apply_war_coefficients(
+                    self.predictions, WAR_coefficients
+                )
+            return None
+
+        scoring_engine = ScoringEngine(self.predictions, scoring_weights, WAR_coefficients)
+        self.apply_scoring(scoring_engine)
+        return scoring_engine
+
+    def apply_scoring(self, scoring_engine):
+        self.predictions["FPTS"] = scoring_engine.fpts
+        if scoring_engine.war is not None:
+            self.predictions["WAR"] = scoring_engine.war
+
+    def update_scoring(self, scoring_weights: dict):
+        """
+        Recompute the projections after a scoring setting changes. Only the
+        changed categories are recomputed, unless the change moves the league to
+        another scoring format's WAR model.
+        """
+
+        if scoring_format(scoring_weights) != self.scoring:
+            self.scoring = scoring_format(scoring_weights)
+            self.scoring_engine = self.build_scoring_engine(scoring_weights)
+        elif self.scoring_engine is not None and self.scoring_engine.set_weights(
+            scoring_weights
+        ):
+            self.apply_scoring(self.scoring_engine)
+
+    def drafted_starters(self):
+        """
+        Returns
+        -------
+        n_starters : Dictionary of the number of starters per position that are
+        drafted and valued (excluding K, and DST or IDP)
+
+        """
+
+        return {
+            position: self.n_starters[position]
+            for position in ["QB", "RB", "WR", "TE", "Flex"]
+        }
 
 
 def app():
@@ -127,55 +185,98 @@ def app():
         st.header("League Settings")
         n_teams = st.number_input("Number of Teams", 2, 24, 12)
         first_pick = st.number_input("Enter your First Pick", 1, 24)
-        scoring = st.selectbox("Scoring", ("Standard", "Custom"),)
+        scoring_type = st.selectbox("Scoring", ("Standard", "Custom"),)
         ppr = st.number_input(
             "Points per Reception (PPR)", 0.0, 1.0, value=1.0, step=0.5
         )
         projections = st.selectbox("Player Projections", ("Default", "Custom"),)
 
+        uploaded_projections = None
         if projections == "Custom":
-            st.file_uploader("Upload Custom Projections", type=["csv", "xlsx"])
+            uploaded_projections = st.file_uploader(
+                "Upload Custom Projections", type=["csv", "xlsx"]
+            )
+
+    # The scoring settings are only editable for custom scoring, and are only
+    # used when the projections include stat lines
+    fixed_scoring = scoring_type != "Custom"
 
     with col3:
         st.header("Scoring Settings")
         passing_yards = st.number_input(
-            "Points per Passing Yard", value=0.04, step=0.01, disabled=True,
+            "Points per Passing Yard", value=0.04, step=0.01, disabled=fixed_scoring,
         )
         passing_tds = st.number_input(
-            "Points per Passing TD", value=4.0, step=0.1, disabled=True
+            "Points per Passing TD", value=4.0, step=0.1, disabled=fixed_scoring
         )
         passing_int = st.number_input(
-            "Points per Passing INT", value=-2.0, step=0.1, disabled=True
+            "Points per Passing INT", value=-2.0, step=0.1, disabled=fixed_scoring
         )
         passing_completions = st.number_input(
-            "Points per Completion", value=0.0, step=0.1, disabled=True
+            "Points per Completion", value=0.0, step=0.1, disabled=fixed_scoring
         )
         rushing_yards = st.number_input(
-            "Points per Rushing Yard", value=0.10, step=0.01, disabled=True
+            "Points per Rushing Yard", value=0.10, step=0.01, disabled=fixed_scoring
         )
         rushing_tds = st.number_input(
-            "Points per Rushing TD", value=6.0, step=0.1, disabled=True
+            "Points per Rushing TD", value=6.0, step=0.1, disabled=fixed_scoring
         )
         rushing_carries = st.number_input(
-            "Points per Carry", value=0.0, step=0.1, disabled=True
+            "Points per Carry", value=0.0, step=0.1, disabled=fixed_scoring
+        )
+        receiving_yards = st.number_input(
+            "Points per Receiving Yard", value=0.10, step=0.01, disabled=fixed_scoring
         )
         receiving_tds = st.number_input(
-            "Points per Receiving TD", value=6.0, step=0.1, disabled=True
+            "Points per Receiving TD", value=6.0, step=0.1, disabled=fixed_scoring
         )
 
+    scoring_weights = {
+        "Pass Yds": passing_yards,
+        "Pass TD": passing_tds,
+        "Pass INT": passing_int,
+        "Pass Cmp": passing_completions,
+        "Rush Yds": rushing_yards,
+        "Rush TD": rushing_tds,
+        "Rush Att": rushing_carries,
+        "Rec": ppr,
+        "Rec Yds": receiving_yards,
+        "Rec TD": receiving_tds,
+    }
+
+    # Streamlit reruns on every widget change, so saved settings are rescored
+    # incrementally instead of rebuilt
+    if "settings" in st.session_state:
+        st.session_state.settings.update_scoring(scoring_weights)
+
     with st.form(key="Save Settings"):
         submit = st.form_submit_button("Save Settings")
 
     if submit:
+        # Timings are only recorded when FF_DRAFT_PROFILE is set, and are shown
+        # in a panel on the draft page
+        timer = timer_from_environment()
+        timer.start("save_settings")
+        projection_source = DEFAULT_SOURCE
+        if uploaded_projections is not None:
+            with timer.stage("ingest"):
+                projection_source = ingest_uploaded_projections(
+                    uploaded_projections, 2021
+                )
         settings = DraftSettings(
             n_starters=n_starters,
             flex_positions=flex_positions,
-            scoring=scoring,
+            scoring=scoring_format(scoring_weights),
             first_pick=first_pick,
             n_teams=n_teams,
             year=2021,
+            projection_source=projection_source,
+            scoring_weights=scoring_weights,
+            timer=timer,
         )
+        timer.finish()
         st.session_state.settings = settings
+        st.session_state.timer = timer
 
 
 app()
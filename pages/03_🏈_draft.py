@@ -1,30 +1,154 @@
+import pandas as pd
 import streamlit as st
+from pages.utils.draft_board import DEFAULT_PAGE_SIZE, DraftBoard
+from pages.utils.draft_state import DraftState, snake_draft_picks
+from pages.utils.instrumentation import NULL_TIMER
+from pages.utils.player_pool import PlayerPool
+from pages.utils.speculation import RecommendationSpeculator
 
 st.set_page_config(layout="wide")
 
 
-def highlight_rows(row):
-    value = row.loc["Pos"]
-    if value == "QB":
-        color = "#0077BB"  # Blue
-    elif value == "RB":
-        color = "#33BBEE"  # Cyan
-    elif value == "WR":
-        color = "#009988"  # Teal
-    elif value == "TE":
-        color = "#EE7733"  # Orange
-    elif value == "K":
-        color = "#CC3311"  # Red
-    elif value == "DST":
-        color = "#EE3377"  # Magenta
-    return ["background-color: {}".format(color) for r in row]
+def timings_panel(timer):
+    """
+    Show the most recent per-pick timings and counters when profiling is on
+    """
+
+    if not timer.enabled or not timer.records:
+        return
+    with st.expander("Timings"):
+        st.dataframe(pd.json_normalize(timer.records[::-1]))
+
+
+def board_key(settings):
+    # The board is re-sorted when the settings are saved again or rescored
+    scoring_engine = settings.scoring_engine
+    weights = None if scoring_engine is None else scoring_engine.weights.tobytes()
+    return (id(settings), weights)
+
+
+def draft_board(settings):
+    """
+    Returns
+    -------
+    board : DraftBoard kept in the session between reruns. The drafted players
+    carry over when the projections are rescored.
+
+    """
+
+    key = board_key(settings)
+    board = st.session_state.get("draft_board")
+    if board is None or st.session_state.get("draft_board_key") != key:
+        drafted = None
+        if board is not None and st.session_state.draft_board_key[0] == key[0]:
+            drafted = board.drafted
+        # The scoring engine re-sorts its rankings as the scoring settings change
+        order = None
+        if settings.scoring_engine is not None:
+            order = settings.scoring_engine.rankings()
+        board = DraftBoard(settings.predictions, drafted=drafted, order=order)
+        st.session_state.draft_board = board
+        st.session_state.draft_board_key = key
+    return board
+
+
+def recommendation_engine(settings, board):
+    """
+    Returns
+    -------
+    speculator : RecommendationSpeculator over a DraftState that mirrors the
+    board, kept in the session so its background work carries over between
+    reruns. None if the projections have no WAR to rank by.
+
+    """
+
+    if "WAR" not in board.players:
+        return None
+    if st.session_state.get("speculator_key") != st.session_state.draft_board_key:
+        previous = st.session_state.get("speculator")
+        if previous is not None:
+            previous.close()
+
+        # K and DST aren't in the player pool, so only the valued rounds count
+        n_starters = settings.drafted_starters()
+        state = DraftState(
+            PlayerPool.from_frame(board.players),
+            snake_draft_picks(
+                settings.first_pick, settings.n_teams, sum(n_starters.values())
+            ),
+            settings.position_counts,
+        )
+        for row in board.drafted:
+            state.pick(row)
+        st.session_state.speculator = RecommendationSpeculator(state)
+        st.session_state.speculator_key = st.session_state.draft_board_key
+        st.session_state.speculator.start()
+    return st.session_state.speculator
+
+
+def recommendations_panel(speculator, timer):
+    if speculator is None:
+        st.info("Recommendations need WAR projections for the scoring settings.")
+        return
+    state = speculator.state
+    if state.current_pick > max(state.draft_picks):
+        return
+    if not state.is_my_pick():
+        st.caption(
+            "Pick {pick}, your next pick is {next_pick}".format(
+                pick=state.current_pick, next_pick=speculator.next_pick()
+            )
+        )
+        return
+    st.subheader("Your pick")
+    with timer.stage("recommendations"):
+        recommendations = speculator.recommendations(10)
+    columns = ["Player", "Team", "Pos", "FPTS", "dWAR"]
+    st.dataframe(recommendations[[column for column in columns if column in recommendations]])
+
+
+def board_tab(board, position, top_n, page_size, timer):
+    n_pages = board.n_pages(position, top_n, page_size)
+    page = st.number_input(
+        "Page", 1, n_pages, 1, key="page-{position}".format(position=position)
+    )
+    with timer.stage("styling"):
+        styler = board.page(position, page - 1, page_size, top_n)
+    with timer.stage("rendering"):
+        st.dataframe(styler, 750, 750)
+    st.caption("Page {page} of {n_pages}".format(page=page, n_pages=n_pages))
 
 
 def app():
     st.header("Drafting!")
-    df = st.session_state.settings.predictions.sort_values(
-        "FPTS", ascending=False
-    ).style.apply(highlight_rows, axis=1)
+    timer = st.session_state.get("timer", NULL_TIMER)
+    timer.start("draft_page")
+
+    with timer.stage("ranking"):
+        board = draft_board(st.session_state.settings)
+        speculator = recommendation_engine(st.session_state.settings, board)
+    timer.count("undrafted_players", len(board.visible_rows()))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        top_n = st.number_input("Show the top", 0, len(board.players), 0, step=25)
+    with col2:
+        page_size = st.selectbox("Players per page", (25, DEFAULT_PAGE_SIZE, 100), index=1)
+    with col3:
+        with st.form(key="Draft Player", clear_on_submit=True):
+            player = st.selectbox(
+                "Drafted player", board.players["Player"].iloc[board.visible_rows()]
+            )
+            if st.form_submit_button("Draft") and player is not None:
+                board.pick(player)
+                if speculator is not None:
+                    speculator.state.pick(board.player_lookup[player])
+                    # Value the likely boards at the managers next pick while the
+                    # opponents picks are entered
+                    if not speculator.state.is_my_pick():
+                        speculator.start()
+
+    recommendations_panel(speculator, timer)
 
     # CSS to inject contained in a string
     hide_dataframe_row_index = """
@@ -37,8 +161,14 @@ def app():
     # Inject CSS with Markdown
     st.markdown(hide_dataframe_row_index, unsafe_allow_html=True)
 
-    # display table
-    st.dataframe(df, 750, 750)
+    # One tab per position, only the visible page of each is styled and sent
+    tabs = st.tabs(["All"] + board.positions)
+    for tab, position in zip(tabs, [None] + board.positions):
+        with tab:
+            board_tab(board, position, top_n or None, page_size, timer)
+    timer.finish()
+
+    timings_panel(timer)
 
 
 app()
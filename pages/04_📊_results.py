@@ -1,5 +1,81 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
+from pages.utils.player_pool import PlayerPool
+from pages.utils.season import simulate_season, team_rosters
 
 st.set_page_config(layout="wide", page_title="Results", page_icon="📈")
 st.markdown("# Draft Results")
 st.sidebar.header("Results")
+
+
+@st.cache_data(show_spinner="Simulating the season...")
+def season_results(
+    _players, board_key, rosters, n_starters, flex_positions, n_simulations, n_playoff_teams
+):
+    # The player pool isn't hashed, board_key identifies the projections
+    return simulate_season(
+        rosters,
+        _players,
+        n_starters,
+        flex_positions,
+        n_simulations=n_simulations,
+        n_playoff_teams=n_playoff_teams,
+    )
+
+
+def player_pool(board):
+    # Built once per board instead of on every rerun of the page. The season is
+    # simulated from FPTS, so unscored projections without WAR are fine.
+    if st.session_state.get("player_pool_key") != st.session_state.draft_board_key:
+        st.session_state.player_pool = PlayerPool.from_frame(board.players)
+        st.session_state.player_pool_key = st.session_state.draft_board_key
+    return st.session_state.player_pool
+
+
+def app():
+    settings = st.session_state.get("settings")
+    board = st.session_state.get("draft_board")
+    if settings is None or board is None or not board.drafted:
+        st.info("Save your settings and draft some players to see the results.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        n_simulations = st.selectbox("Simulated seasons", (1000, 10000, 50000), index=1)
+    with col2:
+        n_playoff_teams = st.number_input(
+            "Playoff teams", 1, settings.n_teams, min(6, settings.n_teams)
+        )
+
+    summary, points = season_results(
+        player_pool(board),
+        st.session_state.draft_board_key,
+        team_rosters(board.drafted, settings.n_teams),
+        settings.n_starters,
+        settings.flex_positions,
+        n_simulations,
+        n_playoff_teams,
+    )
+    summary["Team"] = np.where(
+        summary["Team"] == settings.first_pick, "You", "Team " + summary["Team"].astype(str)
+    )
+
+    st.header("Playoff Odds")
+    st.bar_chart(summary.set_index("Team")["Playoff Odds"])
+    st.dataframe(summary.style.format({"Playoff Odds": "{:.1%}", "Wins": "{:.1f}"}))
+
+    st.header("Season Points")
+    bins = np.linspace(points.min(), points.max(), 40)
+    st.line_chart(
+        pd.DataFrame(
+            {
+                team: np.histogram(points[:, i], bins)[0] / len(points)
+                for i, team in enumerate(summary["Team"])
+            },
+            index=np.round((bins[1:] + bins[:-1]) / 2),
+        )
+    )
+
+
+app()
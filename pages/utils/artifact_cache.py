@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRECTORY = "./.cache/artifacts"
+MAX_CACHE_BYTES = 512 * 1024 ** 2
+
+
+def file_hash(path: str):
+    """
+    Returns
+    -------
+    Hex sha256 of the contents of the file at path
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 ** 2), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_key(**parts):
+    """
+    Returns
+    -------
+    Content-addressed key for an artifact built from the given parts, e.g.
+    artifact_key(artifact="projections", projections=file_hash(path), scoring="PPR")
+    """
+
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def frame_to_arrays(df):
+    """
+    Convert a Dataframe into a dictionary of arrays that can be memory-mapped.
+    Text columns are stored as fixed-width unicode instead of Python objects.
+    """
+
+    arrays = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype.kind not in "biuf":
+            values = values.astype(str)
+        arrays[column] = values
+    return arrays
+
+
+def arrays_to_frame(arrays):
+    """
+    Inverse of frame_to_arrays, keeping the original column order. Numeric
+    columns aren't copied, so the columns of a memory-mapped artifact stay
+    read-only views of its pages. Text columns are converted to Python strings
+    held by each process.
+    """
+
+    return pd.DataFrame(
+        {
+            column: values.astype(object) if values.dtype.kind == "U" else values
+            for column, values in arrays.items()
+        },
+        copy=False,
+    )
+
+
+class ArtifactCache:
+    """
+    On-disk cache of numpy arrays addressed by a content key.
+
+    Every artifact is a directory of .npy files that are loaded with
+    mmap_mode="r", so processes that load the same artifact share the pages of
+    its numeric arrays. Artifacts are written to a temporary directory and renamed into
+    place so a reader never sees a partial write. When the cache grows past
+    max_bytes, the least recently used artifacts are evicted.
+
+    """
+
+    def __init__(self, directory: str = CACHE_DIRECTORY, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str):
+        return os.path.join(self.directory, key)
+
+    def load(self, key: str):
+        """
+        Returns
+        -------
+        arrays : Dictionary of read-only memory-mapped arrays, or None if the
+        artifact isn't cached
+        """
+
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, "manifest.json")) as manifest_file:
+                names = json.load(manifest_file)
+            arrays = {
+                name: np.load(os.path.join(path, "{index}.npy".format(index=index)), mmap_mode="r")
+                for index, name in enumerate(names)
+            }
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        # Mark the artifact as recently used for eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return arrays
+
+    def store(self, key: str, arrays: dict):
+        """
+        Write the arrays for key and evict old artifacts if the cache is too big.
+        """
+
+        staging = tempfile.mkdtemp(dir=self.directory, prefix=".staging-")
+        try:
+            for index, values in enumerate(arrays.values()):
+                np.save(
+                    os.path.join(staging, "{index}.npy".format(index=index)),
+                    np.asarray(values),
+                    allow_pickle=False,
+                )
+            with open(os.path.join(staging, "manifest.json"), "w") as manifest_file:
+                json.dump(list(arrays), manifest_file)
+            os.rename(staging, self._path(key))
+        except OSError:
+            # Another process stored the same artifact first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(self._path(key)):
+                raise
+
+        self.evict()
+
+    def get_or_compute(self, key: str, compute):
+        """
+        Returns
+        -------
+        arrays : Cached arrays for key. On a miss compute() is called to build
+        the dictionary of arrays, which is stored and then loaded memory-mapped.
+        """
+
+        arrays = self.load(key)
+        if arrays is None:
+            arrays = compute()
+            self.store(key, arrays)
+            # The artifact may have been evicted straight away if it's bigger
+            # than the whole cache
+            loaded = self.load(key)
+            if loaded is not None:
+                arrays = loaded
+        return arrays
+
+    def size(self):
+        return sum(size for _, _, size in self._artifacts())
+
+    def _artifacts(self):
+        artifacts = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                size = sum(file.stat().st_size for file in os.scandir(entry.path))
+                artifacts.append((entry.stat().st_mtime, entry.path, size))
+            except FileNotFoundError:
+                # Evicted by another process while scanning
+                continue
+        return artifacts
+
+    def evict(self):
+        """
+        Remove the least recently used artifacts until the cache fits in max_bytes.
+        """
+
+        artifacts = sorted(self._artifacts())
+        total = sum(size for _, _, size in artifacts)
+        for _, path, size in artifacts:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total = total - size
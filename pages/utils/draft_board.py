@@ -0,0 +1,137 @@
+import numpy as np
+
+from pages.utils.position_combinations import POSITIONS
+
+# Background colour of each position on the draft board
+POSITION_COLORS = {
+    "QB": "#0077BB",  # Blue
+    "RB": "#33BBEE",  # Cyan
+    "WR": "#009988",  # Teal
+    "TE": "#EE7733",  # Orange
+    "K": "#CC3311",  # Red
+    "DST": "#EE3377",  # Magenta
+}
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class DraftBoard:
+    """
+    Sorted, pre-coloured view of the players for the draft page.
+
+    The players are sorted and their row colours worked out once. Each
+    position keeps its players in board order, so a tab only walks its own
+    players. A pick flips one entry of the availability mask and only drops the
+    cached rows of the "All" tab and the drafted player's position. Pages are
+    sliced from the cached rows and only the visible slice is ever styled.
+
+    """
+
+    def __init__(self, players, sort_column: str = "FPTS", drafted=None, order=None):
+        """
+        Parameters
+        ----------
+        players : Dataframe of the players to show, with Player and Pos columns
+        sort_column : Column to order the board by, descending
+        drafted : Optional list of the rows already drafted in pick order, e.g.
+        from a previous board of the same players
+        order : Optional array of the rows in board order to use instead of
+        sorting by sort_column, e.g. ScoringEngine.rankings()
+
+        """
+
+        self.players = players.reset_index(drop=True)
+        self.sort_column = sort_column
+        if order is None:
+            order = np.argsort(-self.players[sort_column].to_numpy(), kind="stable")
+        self.order = np.asarray(order)
+        self.player_lookup = {
+            name: row for row, name in enumerate(self.players["Player"])
+        }
+        self.drafted = [] if drafted is None else list(drafted)
+        self.available = np.ones(len(self.players), dtype=bool)
+        self.available[self.drafted] = False
+
+        positions = self.players["Pos"].to_numpy()
+        self.colors = np.array(
+            [
+                "background-color: {color}".format(color=POSITION_COLORS[position])
+                if position in POSITION_COLORS
+                else ""
+                for position in positions
+            ],
+            dtype=object,
+        )
+        self.position_orders = {
+            position: self.order[positions[self.order] == position]
+            for position in POSITIONS
+            if (positions == position).any()
+        }
+        self._visible = {}
+
+    @property
+    def positions(self):
+        return list(self.position_orders)
+
+    def pick(self, player: str):
+        """
+        Mark a player as drafted at the next pick
+        """
+
+        row = self.player_lookup[player]
+        if not self.available[row]:
+            raise ValueError("{player} has already been drafted".format(player=player))
+        self.available[row] = False
+        self.drafted.append(row)
+        self._visible.pop(None, None)
+        self._visible.pop(self.players["Pos"].iat[row], None)
+
+    def visible_rows(self, position: str = None, top_n: int = None):
+        """
+        Parameters
+        ----------
+        position : Position tab to show, defaults to every position
+        top_n : Only show the best top_n undrafted players
+
+        Returns
+        -------
+        rows : Array of the undrafted players rows in board order
+        """
+
+        if position not in self._visible:
+            if position is None:
+                order = self.order
+            else:
+                order = self.position_orders.get(position, self.order[:0])
+            self._visible[position] = order[self.available[order]]
+        rows = self._visible[position]
+        return rows if top_n is None else rows[:top_n]
+
+    def n_pages(
+        self, position: str = None, top_n: int = None, page_size: int = DEFAULT_PAGE_SIZE
+    ):
+        n_rows = len(self.visible_rows(position, top_n))
+        return max((n_rows + page_size - 1) // page_size, 1)
+
+    def page(
+        self,
+        position: str = None,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        top_n: int = None,
+        columns=None,
+    ):
+        """
+        Returns
+        -------
+        styler : pandas Styler of the rows on the page, coloured by position
+        """
+
+        rows = self.visible_rows(position, top_n)[page * page_size : (page + 1) * page_size]
+        frame = self.players.iloc[rows]
+        if columns is not None:
+            frame = frame[columns]
+
+        # One precomputed colour per row, repeated across the columns
+        colors = np.repeat(self.colors[rows, np.newaxis], frame.shape[1], axis=1)
+        return frame.style.apply(lambda _: colors, axis=None)
@@ -0,0 +1,193 @@
+import numpy as np
+
+
+class PickSnapshot:
+    """
+    Immutable record of the board after a pick.
+
+    Snapshots form a linked list back to the start of the draft, so the
+    drafted players are shared with every earlier snapshot instead of copied.
+    The cached position values are shared too: a position's values are only
+    stored again when they differ from the previous snapshot's.
+
+    """
+
+    __slots__ = ("parent", "player", "position_values", "combined_position_value")
+
+    def __init__(self, parent, player, position_values, combined_position_value=None):
+        self.parent = parent
+        self.player = player
+        self.position_values = position_values
+        self.combined_position_value = combined_position_value
+
+    def drafted_players(self):
+        """
+        Returns
+        -------
+        drafted_players : List of the players drafted up to this snapshot, in
+        pick order
+        """
+
+        players = []
+        snapshot = self
+        while snapshot.parent is not None:
+            players.append(snapshot.player)
+            snapshot = snapshot.parent
+        return players[::-1]
+
+    def with_values(self, position_values, combined_position_value):
+        """
+        Returns
+        -------
+        snapshot : Copy of the snapshot with the values computed for its board
+        """
+
+        return PickSnapshot(
+            self.parent, self.player, position_values, combined_position_value
+        )
+
+
+def _share_values(position_values, previous):
+    # Reuse the previous arrays for every position whose values didn't change
+    shared = {}
+    for code, (position_value, position_present) in position_values.items():
+        if (
+            code in previous
+            and previous[code][1] == position_present
+            and np.array_equal(previous[code][0], position_value)
+        ):
+            shared[code] = previous[code]
+        else:
+            shared[code] = (position_value, position_present)
+    return shared
+
+
+class DraftHistory:
+    """
+    Pick history of a DraftState that can undo, rewind or edit earlier picks.
+
+    A snapshot is kept for every pick. Each one caches the position values and
+    the draft value DP result for its board once they are computed, so going
+    back to a pick only recomputes the positions that differ from the cached
+    board. The history of one line of picks holds at most one snapshot per
+    pick, and each snapshot only adds the values that changed, so a 20 round,
+    14 team draft stays within a few hundred small arrays.
+
+    """
+
+    def __init__(self, state):
+        """
+        Parameters
+        ----------
+        state : DraftState at the start of the draft
+
+        """
+
+        self.state = state
+        self.snapshots = [PickSnapshot(None, None, {})]
+        for player_index in state.drafted_players:
+            self.snapshots.append(PickSnapshot(self.snapshots[-1], player_index, {}))
+
+    @property
+    def head(self):
+        return self.snapshots[-1]
+
+    def _cache_head(self, combined_position_value=None):
+        head = self.head
+        previous = head.parent.position_values if head.parent is not None else {}
+        position_values = _share_values(
+            {**head.position_values, **self.state.fresh_position_values()}, previous
+        )
+        if combined_position_value is None:
+            combined_position_value = head.combined_position_value
+        self.snapshots[-1] = head.with_values(position_values, combined_position_value)
+
+    def pick(self, player_index: int):
+        """
+        Draft a player at the current pick and record a new snapshot
+        """
+
+        # Keep whatever was computed for the board before it changes
+        self._cache_head()
+        self.state.pick(player_index)
+        self.snapshots.append(PickSnapshot(self.head, player_index, {}))
+
+    def combined_position_value(self):
+        """
+        Returns
+        -------
+        combined_position_value : DraftState.combined_position_value for the
+        current board, cached in its snapshot
+        """
+
+        if self.head.combined_position_value is None:
+            self._cache_head(self.state.combined_position_value())
+        return self.head.combined_position_value
+
+    def recommendations(self, n_players: int = None, combined_position_value=None):
+        """
+        Returns
+        -------
+        recommendations : DraftState.recommendations for the current board.
+        A precomputed combined_position_value (e.g. from a
+        RecommendationSpeculator) is cached in the snapshot as well.
+        """
+
+        if combined_position_value is not None:
+            self._cache_head(combined_position_value)
+        return self.state.recommendations(n_players, self.combined_position_value())
+
+    def rewind(self, n_picks: int):
+        """
+        Return the board to the moment after the first n_picks picks. The later
+        snapshots are dropped.
+        """
+
+        if not 0 <= n_picks < len(self.snapshots):
+            raise ValueError(
+                "Can't rewind to {n_picks} picks, {n_made} have been made".format(
+                    n_picks=n_picks, n_made=len(self.snapshots) - 1
+                )
+            )
+
+        del self.snapshots[n_picks + 1 :]
+        head = self.head
+        # Positions cached at an earlier board are still valid if none of their
+        # players were drafted since then
+        position_values = dict(head.position_values)
+        changed = set()
+        snapshot = head
+        while snapshot.parent is not None:
+            changed.add(self.state.position_codes[snapshot.player])
+            snapshot = snapshot.parent
+            for code, values in snapshot.position_values.items():
+                if code not in position_values and code not in changed:
+                    position_values[code] = values
+        self.state.restore(head.drafted_players(), position_values)
+
+    def undo(self):
+        """
+        Take back the last pick
+        """
+
+        self.rewind(len(self.snapshots) - 2)
+
+    def edit(self, pick: int, player_index: int):
+        """
+        Replace the player taken at an earlier pick and replay the picks after
+        it.
+
+        Returns
+        -------
+        dropped : List of the later picks that couldn't be replayed because
+        their player was taken by the edit. Replaying stops at the first one.
+        """
+
+        later_players = self.head.drafted_players()[pick:]
+        self.rewind(pick - 1)
+        self.pick(player_index)
+        for index, later_player in enumerate(later_players):
+            if not self.state.available[later_player]:
+                return later_players[index:]
+            self.pick(later_player)
+        return []
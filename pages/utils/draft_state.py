@@ -0,0 +1,436 @@
+import numpy as np
+
+from pages.utils.draft_value import optimal_draft_value
+from pages.utils.instrumentation import NULL_TIMER
+from pages.utils.player_pool import PlayerPool
+from pages.utils.position_combinations import (
+    POSITION_CODES,
+    POSITIONS,
+    count_arrangements,
+)
+from pages.utils.positional_value import availability_matrix, best_available_matrix
+
+
+def snake_draft_picks(first_pick: int, n_teams: int, n_rounds: int):
+    """
+    Returns
+    -------
+    draft_picks : List of the overall pick numbers for a manager in a snake
+    draft, e.g. first_pick=3, n_teams=12 gives [3, 22, 27, 46, ...]
+
+    """
+
+    draft_picks = []
+    for round_index in range(n_rounds):
+        if round_index % 2 == 0:
+            draft_picks.append(round_index * n_teams + first_pick)
+        else:
+            draft_picks.append((round_index + 1) * n_teams - first_pick + 1)
+    return draft_picks
+
+
+def future_draft_value(position_values, positions_present, position_counts, drafted_counts):
+    """
+    Parameters
+    ----------
+    position_values : Array of shape (future rounds, len(POSITIONS)) of the dWAR
+    for each position at each of the managers future picks
+    positions_present : Boolean array of the positions with undrafted players
+    position_counts : Array of every valid number of players per position
+    drafted_counts : Array of the number of players per position the manager
+    has drafted
+
+    Returns
+    -------
+    combined_position_value : Dictionary of the best value of the managers
+    future rounds for each position that can be drafted at the current pick.
+
+    """
+
+    # Positions without any undrafted players add nothing to future rounds
+    round_values = position_values * positions_present
+
+    # The DP keeps only the rosters that include every player already drafted,
+    # and the same position counts at every pick let it reuse their CountStates
+    return optimal_draft_value(round_values, position_counts, drafted_counts)
+
+
+def rank_by_dwar(war, position_codes, undrafted, combined_position_value):
+    """
+    Parameters
+    ----------
+    war, position_codes : Arrays of every players WAR and position code
+    undrafted : Array of the undrafted players indices
+    combined_position_value : Result of future_draft_value
+
+    Returns
+    -------
+    order : The undrafted players indices sorted by dWAR, the players WAR plus
+    the best value of the managers future rounds if they are drafted now
+    dwar : Array of their dWAR, NaN at positions that no longer fit the roster
+
+    """
+
+    value_by_code = np.full(len(POSITIONS), np.nan)
+    for position, value in combined_position_value.items():
+        value_by_code[POSITION_CODES[position]] = value
+
+    dwar = war[undrafted] + value_by_code[position_codes[undrafted]]
+    order = np.argsort(-dwar, kind="stable")
+    return undrafted[order], dwar[order]
+
+
+class DraftState:
+    """
+    Incremental state of a draft from one manager's point of view.
+
+    The players are a compact PlayerPool and the available players are held as
+    a boolean mask over it, so a pick is a single O(1) update. Each position
+    keeps its players ordered by ADP (for opponent picks) and by WAR (for the
+    positional values), and the positional value of every one of the managers
+    rounds is cached per position. A pick only invalidates the cached values of
+    the drafted player's position.
+
+    """
+
+    def __init__(self, players, draft_picks, position_counts, timer=NULL_TIMER):
+        """
+        Parameters
+        ----------
+        players : PlayerPool, or Dataframe of all players with Player, Pos, WAR,
+        FPTS, ADP Avg and ADP Std columns (e.g. from
+        Draft_Setup.initialize_player_data). Drafts that share a PlayerPool
+        share its columns.
+        draft_picks : List of the managers draft picks
+        position_counts : Array of every valid number of players per position
+        for the managers roster (e.g. from Draft_Setup.position_counts)
+        timer : PickTimer that records the stages of each recommendation
+
+        """
+
+        if not isinstance(players, PlayerPool):
+            players = PlayerPool.from_frame(players)
+        self.players = players
+        self.draft_picks = list(draft_picks)
+        self.position_counts = position_counts
+        self.timer = timer
+
+        self.names = players.names
+        self.position_codes = players.position_codes
+        self.war = players.war
+        self.adp_avg = players.adp_avg
+        self.adp_std = players.adp_std
+        self.player_lookup = players.lookup
+
+        self.available = np.ones(len(self.players), dtype=bool)
+        self.current_pick = 1
+        self.drafted_players = []
+        self.my_team = []
+        self.my_positions = []
+
+        self._adp_queues = {}
+        self._adp_heads = {}
+        self._war_orders = players.war_orders()
+        self._p_available = {}
+        for code, war_order in self._war_orders.items():
+            # Per-position queue of players ordered by ADP for opponent picks
+            players_at_position = np.sort(war_order)
+            self._adp_queues[code] = players_at_position[
+                np.argsort(self.adp_avg[players_at_position], kind="stable")
+            ]
+            self._adp_heads[code] = 0
+
+            # Probability of each player being available at each of the managers
+            # picks, in WAR order. Availability only depends on the pick number,
+            # so it is computed once for the whole draft.
+            self._p_available[code] = availability_matrix(
+                self.adp_avg[war_order], self.adp_std[war_order], self.draft_picks
+            )
+
+        self._position_values = np.zeros((len(self.draft_picks), len(POSITIONS)))
+        self._positions_present = np.zeros(len(POSITIONS), dtype=bool)
+        self._stale_positions = set(self._war_orders)
+
+        # Optional dictionary shared with a RecommendationSpeculator that caches
+        # position values by the players drafted at the position
+        self.position_value_cache = None
+
+    def is_my_pick(self):
+        return self.current_pick in self.draft_picks
+
+    def pick(self, player_index: int):
+        """
+        Draft a player at the current pick. If it's one of the managers picks the
+        player is added to their team.
+
+        """
+
+        if not self.available[player_index]:
+            raise ValueError(
+                "{player} has already been drafted".format(
+                    player=self.names[player_index]
+                )
+            )
+
+        self.available[player_index] = False
+        self._stale_positions.add(self.position_codes[player_index])
+        self.drafted_players.append(player_index)
+        if self.is_my_pick():
+            self.my_team.append(player_index)
+            self.my_positions.append(POSITIONS[self.position_codes[player_index]])
+        self.current_pick = self.current_pick + 1
+
+    def skip_pick(self):
+        """
+        Use up an opponents pick without drafting anyone, e.g. when a recorded
+        pick is a player that isn't in the projections. Skipped picks aren't
+        kept in drafted_players, so they aren't reproduced by restore.
+
+        """
+
+        if self.is_my_pick():
+            raise ValueError(
+                "Pick {pick} is one of the managers picks".format(pick=self.current_pick)
+            )
+        self.current_pick = self.current_pick + 1
+
+    def restore(self, drafted_players, position_values=None):
+        """
+        Reset the board to the moment after drafted_players were picked, e.g.
+        to undo a pick.
+
+        Parameters
+        ----------
+        drafted_players : List of the players drafted so far, in pick order
+        position_values : Optional dictionary of position code to the cached
+        (position_value, position_present) for this board. Positions that
+        aren't included are recomputed when next needed.
+
+        """
+
+        self.available = np.ones(len(self.names), dtype=bool)
+        self.available[list(drafted_players)] = False
+        self.drafted_players = list(drafted_players)
+        self.my_team = []
+        self.my_positions = []
+        for pick, player_index in enumerate(self.drafted_players, start=1):
+            if pick in self.draft_picks:
+                self.my_team.append(player_index)
+                self.my_positions.append(POSITIONS[self.position_codes[player_index]])
+        self.current_pick = len(self.drafted_players) + 1
+
+        # Undrafted players may now be ahead of the queue heads
+        self._adp_heads = dict.fromkeys(self._adp_queues, 0)
+
+        position_values = {} if position_values is None else position_values
+        for code, (position_value, position_present) in position_values.items():
+            self._position_values[:, code] = position_value
+            self._positions_present[code] = position_present
+        self._stale_positions = set(self._war_orders) - set(position_values)
+
+    def fresh_position_values(self):
+        """
+        Returns
+        -------
+        position_values : Dictionary of position code to (position_value,
+        position_present) for every position whose cached values are up to
+        date with the board
+
+        """
+
+        return {
+            code: (
+                self._position_values[:, code].copy(),
+                bool(self._positions_present[code]),
+            )
+            for code in self._war_orders
+            if code not in self._stale_positions
+        }
+
+    def next_adp_player(self):
+        """
+        Returns
+        -------
+        player_index : The undrafted player with the lowest ADP Avg, found from
+        the head of each positions ADP queue.
+
+        """
+
+        best_player = None
+        for code, queue in self._adp_queues.items():
+            head = self._adp_heads[code]
+            # Skip over players at the front of the queue that were already drafted
+            while head < len(queue) and not self.available[queue[head]]:
+                head = head + 1
+            self._adp_heads[code] = head
+            if head < len(queue) and (
+                best_player is None
+                or self.adp_avg[queue[head]] < self.adp_avg[best_player]
+            ):
+                best_player = queue[head]
+        return best_player
+
+    def position_value(self, code, available=None):
+        """
+        Parameters
+        ----------
+        code : Position code
+        available : Boolean mask of the available players, defaults to the
+        current board. Used to value hypothetical boards.
+
+        Returns
+        -------
+        position_value : Array of the dWAR for the position at each of the
+        managers picks
+        position_present : Whether the position has any available players
+
+        """
+
+        if available is None:
+            available = self.available
+        war_order = self._war_orders[code]
+        still_available = available[war_order]
+
+        # Values only depend on which players at the position are gone, so they
+        # can be shared between boards (see RecommendationSpeculator)
+        if self.position_value_cache is not None:
+            key = (code, frozenset(war_order[~still_available].tolist()))
+            cached = self.position_value_cache.get(key)
+            if cached is not None:
+                return cached
+
+        if not still_available.any():
+            result = (np.zeros(len(self.draft_picks)), False)
+        else:
+            p_best_available = best_available_matrix(
+                self._p_available[code][still_available], np.array([0])
+            )
+            result = (
+                (
+                    self.war[war_order[still_available], np.newaxis] * p_best_available
+                ).sum(axis=0),
+                True,
+            )
+
+        if self.position_value_cache is not None:
+            self.position_value_cache[key] = result
+        return result
+
+    def position_values(self):
+        """
+        Returns
+        -------
+        position_values : Array of shape (len(draft_picks), len(POSITIONS)) of
+        the dWAR for each position at each of the managers picks.
+        positions_present : Boolean array of the positions with undrafted players.
+
+        """
+
+        # Only recompute the positions that had a player drafted since last time
+        for code in self._stale_positions:
+            (
+                self._position_values[:, code],
+                self._positions_present[code],
+            ) = self.position_value(code)
+        self._stale_positions.clear()
+
+        return self._position_values, self._positions_present
+
+    def combined_position_value(self, available=None, my_positions=None, current_pick=None):
+        """
+        Parameters
+        ----------
+        available, my_positions, current_pick : Optional hypothetical board to
+        value instead of the current one
+
+        Returns
+        -------
+        combined_position_value : Dictionary of the best value of the managers
+        future rounds for each position that can be drafted at the current pick.
+
+        """
+
+        # Only the real board is instrumented, hypothetical boards are valued in
+        # the background and would mix into the current pick's timings
+        timer = self.timer if available is None else NULL_TIMER
+
+        if available is None:
+            with timer.stage("positional_valuation"):
+                position_values, positions_present = self.position_values()
+        else:
+            position_values = np.zeros((len(self.draft_picks), len(POSITIONS)))
+            positions_present = np.zeros(len(POSITIONS), dtype=bool)
+            for code in self._war_orders:
+                (
+                    position_values[:, code],
+                    positions_present[code],
+                ) = self.position_value(code, available)
+        if my_positions is None:
+            my_positions = self.my_positions
+        if current_pick is None:
+            current_pick = self.current_pick
+
+        future_rounds = [
+            round_index
+            for round_index, i in enumerate(self.draft_picks)
+            if i > current_pick
+        ]
+
+        drafted_counts = np.zeros(len(POSITIONS), dtype=np.int16)
+        for position in my_positions:
+            drafted_counts[POSITION_CODES[position]] += 1
+
+        # The surviving combinations are only counted for the timings. Their
+        # filtering is part of the DP and timed with it.
+        if timer.enabled:
+            with timer.stage("combination_counting"):
+                remaining_counts = self.position_counts - drafted_counts
+                surviving = (remaining_counts >= 0).all(axis=1)
+                timer.count(
+                    "surviving_combinations",
+                    count_arrangements(remaining_counts[surviving]),
+                )
+
+        with timer.stage("draft_value"):
+            return future_draft_value(
+                position_values[future_rounds],
+                positions_present,
+                self.position_counts,
+                drafted_counts,
+            )
+
+    def recommendations(self, n_players: int = None, combined_position_value=None):
+        """
+        Parameters
+        ----------
+        n_players : Number of players to return, defaults to all of them
+        combined_position_value : Precomputed result of combined_position_value
+        for the current board, e.g. from a RecommendationSpeculator
+
+        Returns
+        -------
+        recommendations : Dataframe of the undrafted players sorted by dWAR,
+        the players WAR plus the best value of the managers future rounds if
+        they are drafted now. Indexed by the players row in the player table.
+
+        """
+
+        if combined_position_value is None:
+            combined_position_value = self.combined_position_value()
+
+        with self.timer.stage("ranking"):
+            return self._rank(combined_position_value, n_players)
+
+    def _rank(self, combined_position_value, n_players):
+        undrafted = np.flatnonzero(self.available)
+        self.timer.count("undrafted_players", len(undrafted))
+        order, dwar = rank_by_dwar(
+            self.war, self.position_codes, undrafted, combined_position_value
+        )
+
+        # Only the displayed rows are built into a Dataframe
+        if n_players is not None:
+            order, dwar = order[:n_players], dwar[:n_players]
+        recommendations = self.players.to_frame(order)
+        recommendations["dWAR"] = dwar
+        return recommendations
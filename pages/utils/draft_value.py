@@ -0,0 +1,168 @@
+from functools import lru_cache
+
+import numpy as np
+
+from pages.utils.position_combinations import POSITIONS
+
+
+class CountStates:
+    """
+    Every number of players per position that can still be left to draft for a
+    roster, grouped by how many players are left.
+
+    A state with n players left fills the last n future rounds, so its best
+    value is the best over the positions it can draft next of that rounds value
+    plus the best value of the state left behind. The states and the moves
+    between them only depend on the roster, so they are built once and shared
+    by every pick (see count_states), and each pick only evaluates the DP over
+    them level by level with its own round values.
+
+    """
+
+    def __init__(self, count_vectors):
+        """
+        Parameters
+        ----------
+        count_vectors : Array of shape (n_vectors, len(POSITIONS)) of every valid
+        number of players per position for the full roster
+
+        """
+
+        count_vectors = np.asarray(count_vectors, dtype=np.int64).reshape(-1, len(POSITIONS))
+        self.shape = tuple(int(count) + 1 for count in count_vectors.max(axis=0, initial=0))
+
+        # A state is any count that some roster has at least as many of at every
+        # position, i.e. the rosters closed downwards along each position
+        is_state = np.zeros(self.shape, dtype=bool)
+        is_state[tuple(count_vectors.T)] = True
+        for axis in range(is_state.ndim):
+            is_state = np.flip(
+                np.logical_or.accumulate(np.flip(is_state, axis), axis=axis), axis
+            )
+
+        states = np.argwhere(is_state)
+        self.n_states = len(states)
+        # Dense lookup from the raveled counts to the states row
+        self.state_index = np.full(is_state.size, -1, dtype=np.int64)
+        self.state_index[np.ravel_multi_index(states.T, self.shape)] = np.arange(self.n_states)
+
+        # levels[n] is (rows of the states with n players left, moves) where each
+        # move is (position code, rows within the level that can draft it, rows
+        # of the states left behind)
+        n_left = states.sum(axis=1)
+        self.levels = [None]
+        for n in range(1, int(n_left.max(initial=0)) + 1):
+            rows = np.flatnonzero(n_left == n)
+            moves = []
+            for code in range(len(POSITIONS)):
+                can_draft = np.flatnonzero(states[rows, code] > 0)
+                if len(can_draft):
+                    placed = states[rows[can_draft]]
+                    placed[:, code] -= 1
+                    moves.append((code, can_draft, self.index(placed)))
+            self.levels.append((rows, moves))
+
+    def index(self, counts):
+        """
+        Returns
+        -------
+        rows : Array of the state rows of each count vector in counts
+        """
+
+        return self.state_index[np.ravel_multi_index(counts.T, self.shape)]
+
+    def best_values(self, round_values, n_future_rounds: int):
+        """
+        Parameters
+        ----------
+        round_values : Array of shape (future rounds, len(POSITIONS), ...)
+        n_future_rounds : Number of future rounds
+
+        Returns
+        -------
+        best_value : Array of shape (n_states, ...) of the best value of filling
+        the future rounds with each state. States with more players left than
+        future rounds are 0.
+
+        """
+
+        best_value = np.zeros((self.n_states,) + round_values.shape[2:])
+        for n in range(1, min(n_future_rounds, len(self.levels) - 1) + 1):
+            values = round_values[n_future_rounds - n]
+            rows, moves = self.levels[n]
+            level_value = np.full((len(rows),) + round_values.shape[2:], -np.inf)
+            for code, can_draft, placed in moves:
+                level_value[can_draft] = np.maximum(
+                    level_value[can_draft], values[code] + best_value[placed]
+                )
+            best_value[rows] = level_value
+        return best_value
+
+
+@lru_cache(maxsize=16)
+def _cached_count_states(counts_bytes: bytes):
+    return CountStates(np.frombuffer(counts_bytes, dtype=np.int16))
+
+
+def count_states(count_vectors):
+    """
+    Returns
+    -------
+    states : CountStates for the roster, built once per distinct count_vectors
+    """
+
+    return _cached_count_states(np.ascontiguousarray(count_vectors, dtype=np.int16).tobytes())
+
+
+def optimal_draft_value(round_values, count_vectors, drafted_counts):
+    """
+    Parameters
+    ----------
+    round_values : Array of shape (future rounds, len(POSITIONS), ...)
+    The value of drafting each position in every round after the current one.
+    Any trailing axes (e.g. scenarios) are carried through the optimization.
+    count_vectors : Array of shape (n_vectors, len(POSITIONS)) of every valid
+    number of players per position for the full roster. Passing the same
+    array at every pick reuses its CountStates.
+    drafted_counts : Array of the number of players per position the manager
+    has already drafted before the current round.
+
+    Returns
+    -------
+    combined_position_value : Dictionary
+    For each position that can be drafted in the current round, the best total
+    value of the future rounds given that position is taken now. This is the
+    same value as the best surviving draft combination for the position, found
+    by dynamic programming over the remaining positional counts instead of
+    enumerating the combinations.
+
+    """
+
+    round_values = np.asarray(round_values, dtype=np.float64)
+    n_future_rounds = len(round_values)
+    drafted_counts = np.asarray(drafted_counts, dtype=np.int16)
+    batch_shape = round_values.shape[2:]
+
+    # Only the rosters that include every player already drafted survive
+    count_vectors = np.asarray(count_vectors, dtype=np.int16)
+    remaining = count_vectors - drafted_counts
+    remaining = remaining[
+        (remaining >= 0).all(axis=1) & (remaining.sum(axis=1) == n_future_rounds + 1)
+    ]
+    if not len(remaining):
+        return {}
+
+    states = count_states(count_vectors)
+    best_value = states.best_values(round_values, n_future_rounds)
+
+    combined_position_value = {}
+    for code in range(len(POSITIONS)):
+        can_draft = remaining[:, code] > 0
+        if not can_draft.any():
+            continue
+        future_counts = remaining[can_draft]
+        future_counts[:, code] -= 1
+        value = best_value[states.index(future_counts)].max(axis=0)
+        combined_position_value[POSITIONS[code]] = value if batch_shape else float(value)
+
+    return combined_position_value
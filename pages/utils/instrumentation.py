@@ -0,0 +1,109 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Set to a file path to write a JSON line of timings and counters for every pick
+PROFILE_ENVIRONMENT_VARIABLE = "FF_DRAFT_PROFILE"
+
+
+class PickTimer:
+    """
+    Opt-in per-pick instrumentation.
+
+    Each record holds the wall time of every stage run while it was open (e.g.
+    cache_load, csv_load, war_scoring, positional_valuation, draft_value,
+    ranking) and counters such as the number of surviving combinations. Records
+    are kept in memory for an in-app panel and written as JSON lines to sink
+    when one is given.
+
+    """
+
+    enabled = True
+
+    def __init__(self, sink: str = None, max_records: int = 1000):
+        self.sink = sink
+        self.max_records = max_records
+        self.records = []
+        self._current = None
+
+    def start(self, event: str, **fields):
+        """
+        Open a new record, e.g. timer.start("pick", pick=22, mine=True)
+        """
+
+        self._current = {
+            "event": event,
+            "timestamp": time.time(),
+            **fields,
+            "stages": {},
+            "counters": {},
+        }
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._current is not None:
+                stages = self._current["stages"]
+                stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name: str, value):
+        if self._current is not None:
+            self._current["counters"][name] = int(value)
+
+    def finish(self):
+        """
+        Close the open record and write it to the sink
+        """
+
+        if self._current is None:
+            return
+        record = self._current
+        record["total_seconds"] = time.perf_counter() - self._started
+        self._current = None
+
+        self.records.append(record)
+        del self.records[: -self.max_records]
+        if self.sink is not None:
+            with open(self.sink, "a") as sink:
+                sink.write(json.dumps(record) + "\n")
+
+
+class NullTimer(PickTimer):
+    """
+    Instrumentation that records nothing, used when profiling is off
+    """
+
+    enabled = False
+
+    def start(self, event: str, **fields):
+        pass
+
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def count(self, name: str, value):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+def timer_from_environment():
+    """
+    Returns
+    -------
+    timer : PickTimer writing to the path in FF_DRAFT_PROFILE, or NULL_TIMER if
+    it isn't set
+    """
+
+    sink = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE)
+    return PickTimer(sink) if sink else NULL_TIMER
@@ -0,0 +1,151 @@
+import numpy as np
+
+from pages.utils.draft_state import DraftState, snake_draft_picks
+from pages.utils.draft_value import optimal_draft_value
+from pages.utils.instrumentation import NULL_TIMER
+from pages.utils.position_combinations import POSITION_CODES, POSITIONS
+
+
+class LeagueState:
+    """
+    Draft state and dWAR rankings for every team in a snake draft at once.
+
+    The board is a single DraftState whose picks are every pick of the draft,
+    so the availability of each player and the per-position best available
+    probabilities are computed once for all pick numbers and shared by the
+    teams. Each team then only looks up the rows for its own future picks and
+    runs the draft value DP for its roster.
+
+    """
+
+    def __init__(self, players, n_teams: int, n_rounds: int, position_counts, timer=NULL_TIMER):
+        """
+        Parameters
+        ----------
+        players : PlayerPool or Dataframe of all players (see DraftState)
+        n_teams : Number of teams in the league
+        n_rounds : Number of rounds in the draft
+        position_counts : Array of every valid number of players per position
+        for a roster, shared by every team (e.g. from Draft_Setup.position_counts)
+        timer : PickTimer that records the stages of each valuation
+
+        """
+
+        self.n_teams = n_teams
+        self.position_counts = position_counts
+        self.timer = timer
+        self.team_picks = [
+            snake_draft_picks(team + 1, n_teams, n_rounds) for team in range(n_teams)
+        ]
+        n_picks = n_teams * n_rounds
+        self.pick_owner = np.zeros(n_picks + 1, dtype=np.int16)
+        for team, draft_picks in enumerate(self.team_picks):
+            self.pick_owner[draft_picks] = team
+
+        # Row i of the boards position values is pick i + 1
+        self.board = DraftState(players, range(1, n_picks + 1), position_counts, timer)
+        self.team_counts = np.zeros((n_teams, len(POSITIONS)), dtype=np.int16)
+        self.team_players = [[] for _ in range(n_teams)]
+
+    @property
+    def players(self):
+        return self.board.players
+
+    @property
+    def current_pick(self):
+        return self.board.current_pick
+
+    def team_on_the_clock(self):
+        """
+        Returns
+        -------
+        team : Index of the team making the current pick
+        """
+
+        return int(self.pick_owner[self.current_pick])
+
+    def pick(self, player_index: int):
+        """
+        Draft a player for the team on the clock
+        """
+
+        team = self.team_on_the_clock()
+        self.board.pick(player_index)
+        self.team_counts[team, self.board.position_codes[player_index]] += 1
+        self.team_players[team].append(player_index)
+
+    def team_values(self, teams=None):
+        """
+        Parameters
+        ----------
+        teams : Teams to value, defaults to every team
+
+        Returns
+        -------
+        values : Array of shape (n_teams, len(POSITIONS)) of the best value of
+        each teams future rounds if they draft the position at their next pick.
+        Positions that don't fit a teams roster, teams without picks left and
+        teams that aren't valued are NaN.
+
+        """
+
+        teams = range(self.n_teams) if teams is None else teams
+        with self.timer.stage("positional_valuation"):
+            position_values, positions_present = self.board.position_values()
+
+        values = np.full((self.n_teams, len(POSITIONS)), np.nan)
+        with self.timer.stage("draft_value"):
+            for team in teams:
+                # Teams off the clock are valued at their own next pick
+                next_picks = [i for i in self.team_picks[team] if i >= self.current_pick]
+                if not next_picks:
+                    continue
+                future_rows = [i - 1 for i in next_picks[1:]]
+                round_values = position_values[future_rows] * positions_present
+
+                # Every team shares the same position counts and so their CountStates
+                combined_position_value = optimal_draft_value(
+                    round_values, self.position_counts, self.team_counts[team]
+                )
+                for position, value in combined_position_value.items():
+                    values[team, POSITION_CODES[position]] = value
+        return values
+
+    def dwar(self, teams=None):
+        """
+        Returns
+        -------
+        undrafted : Array of the undrafted players rows in the player table
+        dwar : Array of shape (n_teams, len(undrafted)) of every undrafted
+        players dWAR for each team
+
+        """
+
+        values = self.team_values(teams)
+        undrafted = np.flatnonzero(self.board.available)
+        dwar = (
+            self.board.war[undrafted]
+            + values[:, self.board.position_codes[undrafted]]
+        )
+        return undrafted, dwar
+
+    def recommendations(self, n_players: int = None, teams=None):
+        """
+        Returns
+        -------
+        recommendations : Dictionary of team to a Dataframe of the undrafted
+        players sorted by their dWAR for the team, in the same layout as
+        DraftState.recommendations
+
+        """
+
+        teams = range(self.n_teams) if teams is None else teams
+        undrafted, dwar = self.dwar(teams)
+        recommendations = {}
+        with self.timer.stage("ranking"):
+            for team in teams:
+                order = np.argsort(-dwar[team], kind="stable")[:n_players]
+                ranked = self.players.to_frame(undrafted[order])
+                ranked["dWAR"] = dwar[team, order]
+                recommendations[team] = ranked
+        return recommendations
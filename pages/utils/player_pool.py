@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+from pages.utils.position_combinations import POSITIONS, encode_positions
+
+# Text columns with fewer distinct values than this share of the rows are
+# stored as categoricals (e.g. Team), the rest stay as arrays of strings
+CATEGORICAL_SHARE = 0.5
+
+
+def _compact_column(values):
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        return values.astype(np.float32)
+    if values.dtype.kind in "biu":
+        return values
+    n_unique = len(pd.unique(values))
+    if n_unique < CATEGORICAL_SHARE * len(values):
+        return pd.Categorical(values)
+    return values.astype(object)
+
+
+def _display_column(values):
+    # float32 values print with noise in their last digits (e.g. 390.299988),
+    # so the displayed rows go back to float64 through their shortest repr
+    if values.dtype == np.float32:
+        return values.astype(str).astype(np.float64)
+    return values
+
+
+class PlayerPool:
+    """
+    Compact, column-oriented table of players used on the hot paths.
+
+    Positions are int8 codes (see POSITION_CODES), numeric columns are
+    float32 and repeated text such as Team is categorical. Every column is a
+    plain array so the draft can index, mask and sort the players without
+    copying a Dataframe. Dataframes are only built for the rows that are
+    displayed, with to_frame.
+
+    """
+
+    __slots__ = (
+        "names",
+        "position_codes",
+        "war",
+        "fpts",
+        "adp_avg",
+        "adp_std",
+        "columns",
+        "lookup",
+        "_war_orders",
+    )
+
+    def __init__(self, names, position_codes, war, fpts, adp_avg, adp_std, columns=None):
+        """
+        Parameters
+        ----------
+        names : Array of the player names
+        position_codes : Array of the position codes
+        war, fpts, adp_avg, adp_std : Arrays of each players WAR, projected
+        points and ADP distribution
+        columns : Dictionary of any other columns to display, in order
+
+        """
+
+        position_codes = np.asarray(position_codes)
+        # Casting NaN or out of range codes to int8 would quietly make them QBs
+        invalid = pd.isna(position_codes) | (position_codes < 0) | (
+            position_codes >= len(POSITIONS)
+        )
+        if invalid.any():
+            raise ValueError(
+                "Invalid position codes {codes}".format(
+                    codes=sorted(set(position_codes[invalid].tolist()), key=str)
+                )
+            )
+
+        self.names = np.asarray(names, dtype=object)
+        self.position_codes = position_codes.astype(np.int8)
+        self.war = np.asarray(war, dtype=np.float32)
+        self.fpts = np.asarray(fpts, dtype=np.float32)
+        self.adp_avg = np.asarray(adp_avg, dtype=np.float32)
+        self.adp_std = np.asarray(adp_std, dtype=np.float32)
+        self.columns = {} if columns is None else columns
+        self.lookup = {name: index for index, name in enumerate(self.names)}
+        self._war_orders = None
+
+    @classmethod
+    def from_frame(cls, players):
+        """
+        Parameters
+        ----------
+        players : Dataframe of all players with Player, Pos, FPTS, ADP Avg
+        and ADP Std columns (e.g. from Draft_Setup.initialize_player_data).
+        Projections without a WAR model scored yet have NaN WAR.
+
+        Returns
+        -------
+        pool : PlayerPool of the players, in the same row order
+        """
+
+        core = {
+            "Player": "names",
+            "Pos": "position_codes",
+            "WAR": "war",
+            "FPTS": "fpts",
+            "ADP Avg": "adp_avg",
+            "ADP Std": "adp_std",
+        }
+        # The core columns are held as attributes and marked with None to keep
+        # the column order for to_frame
+        columns = {
+            column: None if column in core else _compact_column(players[column].to_numpy())
+            for column in players.columns
+        }
+        # WAR is only known once a WAR model has scored the projections
+        war = np.full(len(players), np.nan)
+        if "WAR" in players:
+            war = players["WAR"].to_numpy()
+        return cls(
+            names=players["Player"].to_numpy(),
+            position_codes=encode_positions(players["Pos"]),
+            war=war,
+            fpts=players["FPTS"].to_numpy(),
+            adp_avg=players["ADP Avg"].to_numpy(),
+            adp_std=players["ADP Std"].to_numpy(),
+            columns=columns,
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        """
+        Approximate memory of the columns, not counting the player name strings
+        """
+
+        total = sum(
+            values.nbytes
+            for values in (
+                self.names,
+                self.position_codes,
+                self.war,
+                self.fpts,
+                self.adp_avg,
+                self.adp_std,
+            )
+        )
+        for values in self.columns.values():
+            if isinstance(values, pd.Categorical):
+                total += values.codes.nbytes + values.categories.to_numpy().nbytes
+            elif values is not None:
+                total += values.nbytes
+        return total
+
+    def war_orders(self):
+        """
+        Returns
+        -------
+        war_orders : Dictionary of position code to the rows of the players at
+        the position ordered by WAR descending. Computed once and shared by
+        every draft using the pool.
+        """
+
+        if self._war_orders is None:
+            self._war_orders = {}
+            for code in np.unique(self.position_codes):
+                players_at_position = np.flatnonzero(self.position_codes == code)
+                self._war_orders[code] = players_at_position[
+                    np.argsort(-self.war[players_at_position], kind="stable")
+                ]
+        return self._war_orders
+
+    def to_frame(self, rows=None):
+        """
+        Parameters
+        ----------
+        rows : Rows of the players to include, defaults to all of them
+
+        Returns
+        -------
+        players : Dataframe in the original column layout indexed by row
+        """
+
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        core = {
+            "Player": self.names[rows],
+            "Pos": np.asarray(POSITIONS, dtype=object)[self.position_codes[rows]],
+            "WAR": _display_column(self.war[rows]),
+            "FPTS": _display_column(self.fpts[rows]),
+            "ADP Avg": _display_column(self.adp_avg[rows]),
+            "ADP Std": _display_column(self.adp_std[rows]),
+        }
+        columns = self.columns or dict.fromkeys(core)
+        return pd.DataFrame(
+            {
+                column: core[column] if values is None else _display_column(values[rows])
+                for column, values in columns.items()
+            },
+            index=rows,
+        )
@@ -0,0 +1,217 @@
+import itertools
+import math
+import warnings
+
+import numpy as np
+
+# Every position is stored as a small integer code so draft combinations can be
+# held in a dense int8 matrix instead of a DataFrame of Python strings.
+POSITIONS = ("QB", "RB", "WR", "TE", "K", "DST")
+POSITION_CODES = {position: code for code, position in enumerate(POSITIONS)}
+
+# Flex types used by Draft_Setup in main.py mapped to their eligible positions
+FLEX_TYPES = {
+    "Standard": ["RB", "WR", "TE"],
+    "Super Flex": ["QB", "RB", "WR", "TE"],
+    "RB/WR": ["RB", "WR"],
+    "None": [],
+}
+
+# Bench spots can be filled by any of the skill positions
+BENCH_POSITIONS = ["QB", "RB", "WR", "TE"]
+
+
+def encode_positions(positions):
+    """
+    Parameters
+    ----------
+    positions : Array or Series of position names, e.g. the Pos column
+
+    Returns
+    -------
+    position_codes : int8 array of the POSITION_CODES for the positions
+
+    """
+
+    positions = np.asarray(positions, dtype=object)
+    unknown = sorted(
+        {str(position) for position in positions if position not in POSITION_CODES}
+    )
+    if unknown:
+        raise ValueError(
+            "Unknown positions {unknown}, expected one of {positions}".format(
+                unknown=unknown, positions=list(POSITIONS)
+            )
+        )
+    return np.array([POSITION_CODES[position] for position in positions], dtype=np.int8)
+
+
+def drop_unsupported_positions(players):
+    """
+    Parameters
+    ----------
+    players : Dataframe of players with a Pos column
+
+    Returns
+    -------
+    players : The players at one of POSITIONS. Players at other positions (e.g.
+    IDP) aren't valued by the draft and are dropped with a warning.
+
+    """
+
+    supported = players["Pos"].isin(list(POSITION_CODES))
+    if supported.all():
+        return players
+    warnings.warn(
+        "Ignoring {n} players at unsupported positions {positions}".format(
+            n=int((~supported).sum()),
+            positions=sorted(players.loc[~supported, "Pos"].astype(str).unique()),
+        )
+    )
+    return players[supported].reset_index(drop=True)
+
+
+def position_count_vectors(
+    n_starters: dict,  # e.g. {QB: 1, RB: 2, Flex: 1, Bench: 6.....}
+    flex_positions: list,
+):
+    """
+    Parameters
+    ----------
+    n_starters : Dictionary of the number of roster spots per position. The
+    "Flex" and "Bench" keys are slots that can be filled by any of the
+    flex_positions or BENCH_POSITIONS respectively.
+    flex_positions : List of positions eligible for the Flex slots.
+
+    Returns
+    -------
+    count_vectors : int16 array of shape (n_vectors, len(POSITIONS))
+    Every distinct number of players per position that fills the roster. Each
+    row is one way of assigning the Flex and Bench slots to real positions.
+
+    """
+
+    base_counts = np.zeros(len(POSITIONS), dtype=np.int16)
+    for position in POSITIONS:
+        base_counts[POSITION_CODES[position]] = n_starters.get(position, 0)
+
+    # Each group of wildcard slots is filled by a multiset of its eligible positions
+    wildcard_slots = [
+        (n_starters.get("Flex", 0), flex_positions or []),
+        (n_starters.get("Bench", 0), BENCH_POSITIONS),
+    ]
+
+    count_vectors = {tuple(base_counts)}
+    for n_slots, eligible in wildcard_slots:
+        if n_slots == 0:
+            continue
+        # Without any eligible positions the slots can't be filled, which matches
+        # the itertools.product over an empty list in the original implementation
+        fills = []
+        for filled in itertools.combinations_with_replacement(eligible, n_slots):
+            fill = np.zeros(len(POSITIONS), dtype=np.int16)
+            for position in filled:
+                fill[POSITION_CODES[position]] += 1
+            fills.append(fill)
+
+        # Different wildcard assignments can land on the same counts (e.g. Flex RB
+        # and Bench WR vs Flex WR and Bench RB), so the set removes duplicates
+        count_vectors = {
+            tuple(np.asarray(counts, dtype=np.int16) + fill)
+            for counts in count_vectors
+            for fill in fills
+        }
+
+    return np.array(sorted(count_vectors), dtype=np.int16).reshape(-1, len(POSITIONS))
+
+
+def count_arrangements(count_vectors):
+    """
+    Returns
+    -------
+    Number of draft combinations arrange_count_vectors would produce for the
+    count vectors, without enumerating them
+    """
+
+    total = 0
+    for counts in np.asarray(count_vectors):
+        arrangements = math.factorial(int(counts.sum()))
+        for count in counts:
+            arrangements //= math.factorial(int(count))
+        total += arrangements
+    return total
+
+
+def arrange_count_vectors(count_vectors):
+    """
+    Parameters
+    ----------
+    count_vectors : Array of shape (n_vectors, len(POSITIONS)) from
+    position_count_vectors.
+
+    Returns
+    -------
+    all_position_combinations : int8 array of shape (rounds, combos)
+    Every distinct ordering of the count vectors. Row r holds the position code
+    drafted in round r+1 for each combination.
+
+    """
+
+    count_vectors = np.asarray(count_vectors, dtype=np.int16)
+    n_rounds = int(count_vectors[0].sum()) if len(count_vectors) else 0
+
+    # Build the combinations one round at a time. Every partial combination
+    # carries the counts it still has to place, and is expanded by each position
+    # it has left. Distinct count vectors produce disjoint sets of arrangements
+    # so nothing needs to be deduplicated.
+    remaining = count_vectors.copy()
+    combinations = np.empty((len(count_vectors), 0), dtype=np.int8)
+    for _ in range(n_rounds):
+        next_remaining = []
+        next_combinations = []
+        for code in range(len(POSITIONS)):
+            rows = np.flatnonzero(remaining[:, code] > 0)
+            if len(rows) == 0:
+                continue
+            placed = remaining[rows]
+            placed[:, code] -= 1
+            next_remaining.append(placed)
+            next_combinations.append(
+                np.column_stack(
+                    (combinations[rows], np.full(len(rows), code, dtype=np.int8))
+                )
+            )
+        remaining = np.concatenate(next_remaining)
+        combinations = np.concatenate(next_combinations)
+
+    return np.ascontiguousarray(combinations.T)
+
+
+def generate_position_combinations(n_starters: dict, flex_positions: list):
+    """
+    Parameters
+    ----------
+    n_starters : Dictionary of the number of roster spots per position.
+    flex_positions : List of positions eligible for the Flex slots.
+
+    Returns
+    -------
+    all_position_combinations : int8 array of shape (rounds, combos)
+    All distinct orders the roster can be drafted in, using the codes in
+    POSITION_CODES.
+
+    """
+
+    return arrange_count_vectors(position_count_vectors(n_starters, flex_positions))
+
+
+def decode_position_combinations(position_combinations):
+    """
+    Returns
+    -------
+    Array of position names with the same shape as position_combinations.
+    Useful for displaying or debugging the compact matrix.
+
+    """
+
+    return np.asarray(POSITIONS)[position_combinations]
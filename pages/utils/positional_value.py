@@ -0,0 +1,113 @@
+import numpy as np
+
+from pages.utils.position_combinations import POSITIONS
+
+
+def availability_matrix(adp_avg, adp_std, picks):
+    """
+    Parameters
+    ----------
+    adp_avg : Array of each players average draft position
+    adp_std : Array of each players draft position standard deviation
+    picks : Array of the draft picks to evaluate
+
+    Returns
+    -------
+    p_available : Array of shape (players, picks)
+    Probability that each player is still available at each pick, assuming the
+    draft position of each player is normally distributed.
+
+    """
+
+    # scipy is the slowest import on the startup path, so it is only loaded
+    # once the first availability is needed
+    from scipy.special import ndtr
+
+    adp_avg = np.asarray(adp_avg, dtype=np.float64)
+    adp_std = np.asarray(adp_std, dtype=np.float64)
+    picks = np.asarray(picks, dtype=np.float64)
+
+    # 1 - cdf(pick) evaluated for every player and pick in a single broadcast
+    z = (picks[np.newaxis, :] - adp_avg[:, np.newaxis]) / adp_std[:, np.newaxis]
+    return ndtr(-z)
+
+
+def best_available_matrix(p_available, group_starts):
+    """
+    Parameters
+    ----------
+    p_available : Array of shape (players, picks) sorted by position and then by
+    WAR descending within each position.
+    group_starts : Index of the first player of each position in p_available.
+
+    Returns
+    -------
+    p_best_available : Array of shape (players, picks)
+    Probability that each player is the best available player at their
+    position. This is the product of the p_Not Available of every better player
+    at the position multiplied by the player's own p_Available.
+
+    """
+
+    p_not_available = 1 - p_available
+    p_best_available = np.empty_like(p_available)
+    group_ends = np.append(group_starts[1:], len(p_available))
+    for start, end in zip(group_starts, group_ends):
+        # The cumulative product is shifted down one player since the player in
+        # question must be available. The best player at the position only needs
+        # to be available.
+        p_best_available[start] = p_available[start]
+        p_best_available[start + 1 : end] = (
+            np.cumprod(p_not_available[start : end - 1], axis=0)
+            * p_available[start + 1 : end]
+        )
+
+    return p_best_available
+
+
+def positional_values(war, position_codes, adp_avg, adp_std, picks):
+    """
+    Parameters
+    ----------
+    war : Array of each players wins above replacement
+    position_codes : Array of each players position code (see POSITION_CODES)
+    adp_avg : Array of each players average draft position
+    adp_std : Array of each players draft position standard deviation
+    picks : Array of the future draft picks to evaluate
+
+    Returns
+    -------
+    position_values : Array of shape (picks, len(POSITIONS))
+    The probabilistic wins above replacement (dWAR) for each position at each
+    pick. Positions without any players have a value of zero.
+    positions_present : Boolean array of the positions that have players.
+
+    """
+
+    war = np.asarray(war, dtype=np.float64)
+    position_codes = np.asarray(position_codes)
+    picks = np.atleast_1d(picks)
+
+    position_values = np.zeros((len(picks), len(POSITIONS)))
+    positions_present = np.zeros(len(POSITIONS), dtype=bool)
+    if len(war) == 0 or len(picks) == 0:
+        return position_values, positions_present
+
+    # Sort the players by position and then WAR descending in order to classify
+    # the order of "best" players at each position
+    order = np.lexsort((-war, position_codes))
+    sorted_codes = position_codes[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+
+    p_available = availability_matrix(
+        np.asarray(adp_avg)[order], np.asarray(adp_std)[order], picks
+    )
+    p_best_available = best_available_matrix(p_available, group_starts)
+
+    # dWAR = dynamic Wins Above Replacement, summed for each position
+    dwar = war[order, np.newaxis] * p_best_available
+    group_codes = sorted_codes[group_starts]
+    position_values[:, group_codes] = np.add.reduceat(dwar, group_starts, axis=0).T
+    positions_present[group_codes] = True
+
+    return position_values, positions_present
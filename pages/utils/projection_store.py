@@ -0,0 +1,343 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+STORE_DIRECTORY = "./data/store"
+
+# Projection sources that ship with the repository, e.g. data/2021/season_projections.csv
+DEFAULT_SOURCE = "default"
+
+
+def read_projection_file(file):
+    """
+    Parameters
+    ----------
+    file : Path or uploaded file (e.g. from st.file_uploader) of a csv or xlsx
+    projection file
+
+    Returns
+    -------
+    projections : Dataframe of the file contents
+    """
+
+    name = getattr(file, "name", file)
+    if str(name).lower().endswith(".xlsx"):
+        return pd.read_excel(file)
+    return pd.read_csv(file)
+
+
+class ProjectionTable:
+    """
+    Columnar, append-only projections for one source and year.
+
+    Every update is written as a new segment directory with one .npy file per
+    column. Columns are only read when asked for, and are memory-mapped. When a
+    player appears in more than one segment the latest segment wins, so
+    in-season updates are appended instead of rewriting the table. The player
+    and position indexes map straight to rows of the resolved table.
+
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "schema.json")) as schema_file:
+            self.schema = json.load(schema_file)
+        self._columns = {}
+        self._resolve()
+
+    @property
+    def column_names(self):
+        return list(self.schema["columns"])
+
+    def _segments(self):
+        return sorted(
+            entry.name
+            for entry in os.scandir(self.directory)
+            if entry.is_dir() and entry.name.startswith("segment-")
+        )
+
+    def _load_segment_column(self, segment: str, column: str):
+        return np.load(
+            os.path.join(self.directory, segment, "{column}.npy".format(column=column)),
+            mmap_mode="r",
+        )
+
+    def _resolve(self):
+        """
+        Find the latest row of every player across the segments and build the
+        player and position indexes
+        """
+
+        self.segments = self._segments()
+        names = np.concatenate(
+            [self._load_segment_column(segment, "Player") for segment in self.segments]
+        )
+
+        # The last occurrence of each player is the one that counts, and players
+        # keep the place they were first added in
+        _, first_rows = np.unique(names, return_index=True)
+        _, first_in_reversed = np.unique(names[::-1], return_index=True)
+        latest_rows = len(names) - 1 - first_in_reversed
+        self._rows = latest_rows[np.argsort(first_rows, kind="stable")]
+        self._columns = {}
+
+        self.player_index = {name: row for row, name in enumerate(names[self._rows])}
+        positions = self.column("Pos")
+        self.position_index = {
+            position: np.flatnonzero(positions == position)
+            for position in np.unique(positions)
+        }
+
+    def column(self, name: str):
+        """
+        Returns
+        -------
+        values : Array of the column for every player in the resolved table
+        """
+
+        if name not in self._columns:
+            values = np.concatenate(
+                [self._load_segment_column(segment, name) for segment in self.segments]
+            )
+            self._columns[name] = values[self._rows]
+        return self._columns[name]
+
+    def to_frame(self, columns=None):
+        """
+        Parameters
+        ----------
+        columns : Columns to load, defaults to every column
+
+        Returns
+        -------
+        projections : Dataframe with only the requested columns
+        """
+
+        columns = self.column_names if columns is None else columns
+        return pd.DataFrame(
+            {
+                column: (
+                    self.column(column).astype(object)
+                    if self.column(column).dtype.kind == "U"
+                    else self.column(column)
+                )
+                for column in columns
+            }
+        )
+
+    def player(self, name: str, columns=None):
+        """
+        Returns
+        -------
+        Dictionary of the players projections, or None if they aren't in the table
+        """
+
+        row = self.player_index.get(name)
+        if row is None:
+            return None
+        columns = self.column_names if columns is None else columns
+        return {column: self.column(column)[row].item() for column in columns}
+
+    def players_at(self, position: str):
+        """
+        Returns
+        -------
+        Array of the names of every player at the position
+        """
+
+        rows = self.position_index.get(position, np.array([], dtype=np.int64))
+        return self.column("Player")[rows]
+
+    def append(self, projections):
+        """
+        Append new or updated player projections as a new segment. Columns left
+        out of the update keep the players current values, so new players need
+        every column.
+        """
+
+        missing = [column for column in self.column_names if column not in projections]
+        if missing and "Player" not in missing:
+            rows = [self.player_index.get(name) for name in projections["Player"]]
+            new_players = [
+                name for name, row in zip(projections["Player"], rows) if row is None
+            ]
+            if new_players:
+                raise ValueError(
+                    "New players {players} are missing the columns {missing}".format(
+                        players=new_players, missing=missing
+                    )
+                )
+            projections = projections.assign(
+                **{column: self.column(column)[rows] for column in missing}
+            )
+
+        write_segment(self.directory, projections, self.schema)
+        self._resolve()
+
+    def compact(self):
+        """
+        Rewrite the table as a single segment holding only the latest rows
+        """
+
+        resolved = self.to_frame()
+        old_segments = self.segments
+        write_segment(self.directory, resolved, self.schema)
+        for segment in old_segments:
+            segment_path = os.path.join(self.directory, segment)
+            for file in os.scandir(segment_path):
+                os.remove(file.path)
+            os.rmdir(segment_path)
+        self._resolve()
+
+
+def _column_array(values, dtype: str):
+    if dtype == "str":
+        return np.asarray(values, dtype=str)
+    return np.asarray(values, dtype=dtype)
+
+
+def _reserve_segment(directory: str):
+    """
+    Returns
+    -------
+    reservation : Name of the file that reserves the next segment number. It is
+    created with O_EXCL, so concurrent writers never get the same number.
+    """
+
+    while True:
+        # Segments are numbered in order so later updates sort after earlier ones
+        numbers = [
+            int(entry.name.rsplit("-", 1)[1])
+            for entry in os.scandir(directory)
+            if entry.name.startswith(("segment-", ".reserved-segment-"))
+        ]
+        reservation = ".reserved-segment-{number:06d}".format(
+            number=max(numbers, default=-1) + 1
+        )
+        try:
+            os.close(
+                os.open(
+                    os.path.join(directory, reservation),
+                    os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+                )
+            )
+            return reservation
+        except FileExistsError:
+            continue
+
+
+def write_segment(directory: str, projections, schema: dict):
+    """
+    Write projections as the next segment of the table in directory
+    """
+
+    # A segment replaces every column of its players, so it needs all of them
+    # (see ProjectionTable.append for partial updates)
+    missing = [column for column in schema["columns"] if column not in projections]
+    extra = [column for column in projections.columns if column not in schema["columns"]]
+    if missing or extra:
+        raise ValueError(
+            "Projections don't match the table columns, missing {missing}, "
+            "unexpected {extra}".format(missing=missing, extra=extra)
+        )
+
+    # Write to a staging directory and rename it so readers never see half a segment
+    staging = tempfile.mkdtemp(dir=directory, prefix=".staging-")
+    for column, dtype in schema["columns"].items():
+        np.save(
+            os.path.join(staging, "{column}.npy".format(column=column)),
+            _column_array(projections[column].to_numpy(), dtype),
+            allow_pickle=False,
+        )
+
+    reservation = _reserve_segment(directory)
+    os.rename(staging, os.path.join(directory, reservation[len(".reserved-") :]))
+    os.remove(os.path.join(directory, reservation))
+
+
+class ProjectionStore:
+    """
+    Projection tables for every source and year, under STORE_DIRECTORY as
+    {source}/{year}/. Opened tables are kept so switching years is cheap.
+    """
+
+    def __init__(self, directory: str = STORE_DIRECTORY):
+        self.directory = directory
+        self._tables = {}
+
+    def _table_directory(self, source: str, year: int):
+        return os.path.join(self.directory, source, str(year))
+
+    def has_table(self, source: str, year: int):
+        return os.path.exists(
+            os.path.join(self._table_directory(source, year), "schema.json")
+        )
+
+    def ingest(self, file, source: str, year: int):
+        """
+        Load a csv or xlsx projection file (or a Dataframe) into the store. If the
+        table already exists the projections are appended as an update.
+
+        Returns
+        -------
+        table : ProjectionTable for the source and year
+        """
+
+        projections = file if isinstance(file, pd.DataFrame) else read_projection_file(file)
+        directory = self._table_directory(source, year)
+
+        if self.has_table(source, year):
+            table = self.table(source, year)
+            table.append(projections)
+            return table
+
+        os.makedirs(directory, exist_ok=True)
+        schema = {
+            "columns": {
+                column: (
+                    projections[column].to_numpy().dtype.str
+                    if projections[column].dtype.kind in "biuf"
+                    else "str"
+                )
+                for column in projections.columns
+            }
+        }
+        write_segment(directory, projections, schema)
+        # Replaced atomically so a concurrent first ingest never reads half a schema
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, prefix=".schema-", delete=False
+        ) as schema_file:
+            json.dump(schema, schema_file)
+        os.replace(schema_file.name, os.path.join(directory, "schema.json"))
+
+        self._tables.pop((source, year), None)
+        return self.table(source, year)
+
+    def table(self, source: str, year: int):
+        """
+        Returns
+        -------
+        table : ProjectionTable for the source and year. The default source is
+        ingested from data/{year}/season_projections.csv the first time.
+        """
+
+        if (source, year) not in self._tables:
+            if not self.has_table(source, year):
+                if source != DEFAULT_SOURCE:
+                    raise FileNotFoundError(
+                        "No {source} projections for {year}".format(
+                            source=source, year=year
+                        )
+                    )
+                return self.ingest(
+                    "./data/{year}/season_projections.csv".format(year=year),
+                    source,
+                    year,
+                )
+            self._tables[(source, year)] = ProjectionTable(
+                self._table_directory(source, year)
+            )
+        return self._tables[(source, year)]
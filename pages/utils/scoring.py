@@ -0,0 +1,154 @@
+import numpy as np
+
+# Stat-line projection columns and their default points per unit
+SCORING_CATEGORIES = {
+    "Pass Yds": 0.04,
+    "Pass TD": 4.0,
+    "Pass INT": -2.0,
+    "Pass Cmp": 0.0,
+    "Rush Yds": 0.10,
+    "Rush TD": 6.0,
+    "Rush Att": 0.0,
+    "Rec": 1.0,
+    "Rec Yds": 0.10,
+    "Rec TD": 6.0,
+}
+
+# The standard formats only differ in their points per reception
+SCORING_FORMATS = {
+    "PPR": {"Rec": 1.0},
+    "Half-PPR": {"Rec": 0.5},
+    "Standard": {"Rec": 0.0},
+}
+
+
+def scoring_weights(weights: dict = None, categories=None):
+    """
+    Parameters
+    ----------
+    weights : Dictionary of points per unit for any of the categories, the
+    rest keep their defaults from SCORING_CATEGORIES
+    categories : Categories to return weights for, defaults to all of them
+
+    Returns
+    -------
+    Array of the points per unit for each category
+    """
+
+    categories = list(SCORING_CATEGORIES) if categories is None else categories
+    weights = {} if weights is None else weights
+    return np.array(
+        [weights.get(category, SCORING_CATEGORIES[category]) for category in categories]
+    )
+
+
+def scoring_format(weights: dict = None):
+    """
+    Returns
+    -------
+    The SCORING_FORMATS name closest to the weights points per reception, used
+    to pick the WAR model
+    """
+
+    reception_points = scoring_weights(weights, ["Rec"])[0]
+    return min(
+        SCORING_FORMATS,
+        key=lambda scoring: abs(SCORING_FORMATS[scoring]["Rec"] - reception_points),
+    )
+
+
+def has_stat_lines(projections):
+    """
+    Returns
+    -------
+    Whether the projections include any stat-line columns to score
+    """
+
+    return any(category in projections for category in SCORING_CATEGORIES)
+
+
+class ScoringEngine:
+    """
+    Recomputes fantasy points, WAR and rankings from stat-line projections.
+
+    The stat lines are held as a (players x categories) matrix so the full
+    FPTS projection is one matrix-vector product. When scoring weights change
+    only the changed categories are multiplied in, WAR is shifted by the change
+    in points and the previous ranking is re-sorted, which is nearly in order
+    already.
+
+    """
+
+    def __init__(self, projections, weights: dict = None, war_coefficients=None):
+        """
+        Parameters
+        ----------
+        projections : Dataframe of players with a Pos column and any of the
+        SCORING_CATEGORIES stat columns
+        weights : Dictionary of points per unit, see scoring_weights
+        war_coefficients : Optional Dataframe from load_war_coefficients used to
+        derive WAR from the points
+
+        """
+
+        self.categories = [
+            category for category in SCORING_CATEGORIES if category in projections
+        ]
+        # Column-major so the stats for a single category are contiguous
+        self.stats = np.asfortranarray(
+            projections[self.categories].fillna(0).to_numpy(dtype=np.float64)
+        )
+        self.weights = scoring_weights(weights, self.categories)
+        self.fpts = self.stats @ self.weights
+
+        self.war = None
+        if war_coefficients is not None:
+            self.war_intercept = (
+                projections["Pos"].map(war_coefficients["intercept"]).to_numpy(dtype=np.float64)
+            )
+            self.war_slope = (
+                projections["Pos"].map(war_coefficients["slope"]).to_numpy(dtype=np.float64)
+            )
+            self.war = self.war_intercept + self.war_slope * self.fpts
+
+        self.order = np.argsort(-self._ranking_values(), kind="stable")
+
+    def _ranking_values(self):
+        values = self.fpts if self.war is None else self.war
+        return np.nan_to_num(values, nan=-np.inf)
+
+    def set_weights(self, weights: dict):
+        """
+        Parameters
+        ----------
+        weights : Dictionary of points per unit for any of the categories
+
+        Returns
+        -------
+        changed : Whether any weight changed and the projections were updated
+        """
+
+        new_weights = scoring_weights(weights, self.categories)
+        changed = np.flatnonzero(new_weights != self.weights)
+        if len(changed) == 0:
+            return False
+
+        fpts_change = self.stats[:, changed] @ (new_weights - self.weights)[changed]
+        self.weights = new_weights
+        self.fpts += fpts_change
+        if self.war is not None:
+            self.war += self.war_slope * fpts_change
+
+        # Re-sort the previous ranking, which a weight change only partly disturbs
+        values = self._ranking_values()
+        self.order = self.order[np.argsort(-values[self.order], kind="stable")]
+        return True
+
+    def rankings(self, n_players: int = None):
+        """
+        Returns
+        -------
+        Array of player rows ordered by WAR (or FPTS without WAR models)
+        """
+
+        return self.order if n_players is None else self.order[:n_players]
@@ -0,0 +1,234 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.draft_state import snake_draft_picks
+from pages.utils.position_combinations import POSITION_CODES, POSITIONS
+
+# Number of games the season FPTS projections cover
+SEASON_GAMES = 17
+
+# Weekly scores are normally distributed around FPTS / SEASON_GAMES with a
+# standard deviation of this share of the mean
+WEEKLY_CV = {"QB": 0.35, "RB": 0.5, "WR": 0.55, "TE": 0.6, "K": 0.4, "DST": 0.6}
+
+# Lineup, schedule and player distributions shared by every chunk in a worker
+_season = {}
+
+
+def _init_worker(season):
+    _season.clear()
+    _season.update(season)
+
+
+def round_robin_schedule(n_teams: int, n_weeks: int):
+    """
+    Returns
+    -------
+    schedule : int array of shape (n_weeks, n_teams) of each teams opponent
+    every week, using the circle method. With an odd number of teams one team
+    has a bye (-1) each week.
+
+    """
+
+    n_slots = n_teams + n_teams % 2
+    rotation = list(range(n_slots))
+    rounds = []
+    for _ in range(n_slots - 1):
+        opponents = np.full(n_slots, -1)
+        for i in range(n_slots // 2):
+            home, away = rotation[i], rotation[n_slots - 1 - i]
+            opponents[home], opponents[away] = away, home
+        rounds.append(opponents)
+        # Keep the first team fixed and rotate the rest
+        rotation = [rotation[0], rotation[-1]] + rotation[1:-1]
+
+    schedule = np.array([rounds[week % len(rounds)] for week in range(n_weeks)])
+    schedule = schedule[:, :n_teams]
+    # The extra slot for an odd number of teams is the bye
+    schedule[schedule >= n_teams] = -1
+    return schedule
+
+
+def team_rosters(drafted, n_teams: int):
+    """
+    Returns
+    -------
+    rosters : List of each teams drafted rows, assigning the drafted players
+    to teams in snake draft order
+
+    """
+
+    n_rounds = -(-len(drafted) // n_teams)
+    rosters = []
+    for slot in range(1, n_teams + 1):
+        picks = snake_draft_picks(slot, n_teams, n_rounds)
+        rosters.append([drafted[pick - 1] for pick in picks if pick <= len(drafted)])
+    return rosters
+
+
+def starting_lineup(fpts, position_codes, n_starters: dict, flex_positions: list):
+    """
+    Parameters
+    ----------
+    fpts : Array of the projected points of the players on the roster
+    position_codes : Array of their position codes
+    n_starters : Dictionary of the number of starters per position and Flex
+    flex_positions : List of positions eligible for the Flex slots
+
+    Returns
+    -------
+    starters : Array of the roster indices of the starting lineup, the best
+    projected players at each position followed by the best remaining players
+    at the flex positions
+
+    """
+
+    order = np.argsort(-np.asarray(fpts), kind="stable")
+    position_codes = np.asarray(position_codes)[order]
+    starters = []
+    for position in POSITIONS:
+        at_position = order[position_codes == POSITION_CODES[position]]
+        starters.extend(at_position[: n_starters.get(position, 0)])
+
+    flex_codes = [POSITION_CODES[position] for position in flex_positions or []]
+    bench = [
+        player
+        for player, code in zip(order, position_codes)
+        if code in flex_codes and player not in starters
+    ]
+    starters.extend(bench[: n_starters.get("Flex", 0)])
+    return np.array(starters, dtype=np.int64)
+
+
+def _simulate_chunk(n_sims: int, seed):
+    """
+    Play out n_sims seasons at once.
+
+    Returns
+    -------
+    wins, points : Arrays of shape (n_sims, n_teams) of each teams wins and
+    regular season points
+    made_playoffs : Boolean array of shape (n_sims, n_teams)
+
+    """
+
+    mean = _season["mean"]
+    std = _season["std"]
+    schedule = _season["schedule"]
+    n_weeks, n_teams = schedule.shape
+    rng = np.random.default_rng(seed)
+
+    # Weekly scores of every starter in every simulation, empty lineup slots
+    # have a mean and deviation of zero
+    scores = rng.standard_normal((n_sims, n_weeks) + mean.shape)
+    scores = np.maximum(mean + std * scores, 0)
+    team_scores = scores.sum(axis=3)
+
+    has_game = schedule >= 0
+    opponents = np.where(has_game, schedule, np.arange(n_teams))
+    opponent_scores = team_scores[:, np.arange(n_weeks)[:, np.newaxis], opponents]
+    results = (team_scores > opponent_scores) + 0.5 * (team_scores == opponent_scores)
+    wins = (results * has_game).sum(axis=1)
+    points = team_scores.sum(axis=1)
+
+    # Standings by wins with points as the tiebreaker
+    standings = np.lexsort((-points, -wins))
+    made_playoffs = np.zeros((n_sims, n_teams), dtype=bool)
+    np.put_along_axis(
+        made_playoffs, standings[:, : _season["n_playoff_teams"]], True, axis=1
+    )
+    return wins, points, made_playoffs
+
+
+def simulate_season(
+    rosters,
+    players,
+    n_starters: dict,
+    flex_positions: list,
+    n_simulations: int = 10000,
+    n_weeks: int = 14,
+    n_playoff_teams: int = 4,
+    chunk_size: int = 2000,
+    n_workers: int = None,
+    seed: int = None,
+):
+    """
+    Parameters
+    ----------
+    rosters : List of each teams drafted players rows in players
+    players : PlayerPool of every player
+    n_starters : Dictionary of the number of starters per position and Flex
+    flex_positions : List of positions eligible for the Flex slots
+    n_simulations : Number of seasons to simulate
+    n_weeks : Number of regular season weeks
+    n_playoff_teams : Number of teams that make the playoffs
+    chunk_size : Number of seasons simulated together in one vectorized batch
+    n_workers : Number of processes, defaults to every core
+    seed : Seed for reproducible simulations
+
+    Returns
+    -------
+    summary : Dataframe with one row per team of their playoff odds, wins and
+    season points distribution
+    points : Array of shape (n_simulations, n_teams) of every teams regular
+    season points in each simulation
+
+    """
+
+    n_teams = len(rosters)
+    lineups = []
+    for roster in rosters:
+        roster = np.asarray(roster, dtype=np.int64)
+        starters = starting_lineup(
+            players.fpts[roster], players.position_codes[roster], n_starters, flex_positions
+        )
+        lineups.append(roster[starters])
+
+    # Weekly score distribution of every starter, padded to the largest lineup
+    n_slots = max((len(lineup) for lineup in lineups), default=0)
+    cv = np.array([WEEKLY_CV[position] for position in POSITIONS])
+    mean = np.zeros((n_teams, n_slots))
+    std = np.zeros((n_teams, n_slots))
+    for team, lineup in enumerate(lineups):
+        mean[team, : len(lineup)] = players.fpts[lineup] / SEASON_GAMES
+        std[team, : len(lineup)] = (
+            mean[team, : len(lineup)] * cv[players.position_codes[lineup]]
+        )
+
+    season = {
+        "mean": mean,
+        "std": std,
+        "schedule": round_robin_schedule(n_teams, n_weeks),
+        "n_playoff_teams": n_playoff_teams,
+    }
+
+    chunks = [
+        min(chunk_size, n_simulations - start) for start in range(0, n_simulations, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    with ProcessPoolExecutor(
+        max_workers=min(n_workers or os.cpu_count(), len(chunks)),
+        initializer=_init_worker,
+        initargs=(season,),
+    ) as executor:
+        results = list(executor.map(_simulate_chunk, chunks, seeds))
+
+    wins = np.concatenate([chunk_wins for chunk_wins, _, _ in results])
+    points = np.concatenate([chunk_points for _, chunk_points, _ in results])
+    made_playoffs = np.concatenate([chunk_playoffs for _, _, chunk_playoffs in results])
+
+    summary = pd.DataFrame(
+        {
+            "Team": np.arange(1, n_teams + 1),
+            "Projected Points": mean.sum(axis=1) * n_weeks,
+            "Playoff Odds": made_playoffs.mean(axis=0),
+            "Wins": wins.mean(axis=0),
+            "Points P10": np.percentile(points, 10, axis=0),
+            "Points P50": np.percentile(points, 50, axis=0),
+            "Points P90": np.percentile(points, 90, axis=0),
+        }
+    )
+    return summary, points
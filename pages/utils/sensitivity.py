@@ -0,0 +1,212 @@
+import numpy as np
+
+from pages.utils.draft_value import optimal_draft_value
+from pages.utils.position_combinations import POSITION_CODES, POSITIONS
+
+# Number of top recommendations a player has to be in for a scenario to count
+# towards their robustness
+DEFAULT_TOP_K = 5
+
+
+class ProjectionScenarios:
+    """
+    Perturbed copies of the player inputs, one row per scenario.
+
+    Every array has shape (n_scenarios, n_players) or broadcasts to it, so each
+    stage of the valuation carries a scenario axis instead of looping.
+
+    """
+
+    def __init__(self, war, adp_avg, adp_std):
+        self.war = np.atleast_2d(np.asarray(war, dtype=np.float64))
+        self.adp_avg = np.atleast_2d(np.asarray(adp_avg, dtype=np.float64))
+        self.adp_std = np.atleast_2d(np.asarray(adp_std, dtype=np.float64))
+        self.n_scenarios = max(len(self.war), len(self.adp_avg), len(self.adp_std))
+
+
+def _war_slopes(players):
+    """
+    Returns
+    -------
+    slopes : Array of the WAR gained per projected point for each player. WAR
+    is linear in FPTS at each position, so the slope is recovered from the pool.
+    """
+
+    slopes = np.zeros(len(players))
+    fpts = players.fpts.astype(np.float64)
+    war = players.war.astype(np.float64)
+    for code in np.unique(players.position_codes):
+        at_position = (players.position_codes == code) & np.isfinite(war)
+        if at_position.sum() > 1 and np.ptp(fpts[at_position]) > 0:
+            slopes[players.position_codes == code] = np.polyfit(
+                fpts[at_position], war[at_position], 1
+            )[0]
+    return slopes
+
+
+def perturbed_scenarios(
+    players,
+    n_scenarios: int = 200,
+    fpts_cv: float = 0.1,
+    adp_std_scale=(0.75, 1.5),
+    fpts_sources=None,
+    seed: int = None,
+):
+    """
+    Parameters
+    ----------
+    players : PlayerPool of every player
+    n_scenarios : Number of scenarios to draw
+    fpts_cv : Standard deviation of the projection error as a share of FPTS
+    adp_std_scale : Range the ADP Std of each scenario is scaled within
+    fpts_sources : Optional array of shape (n_sources, n_players) of FPTS from
+    other projection sources. Each scenario then bootstraps every players
+    projection from the sources instead of adding noise.
+    seed : Seed for reproducible scenarios
+
+    Returns
+    -------
+    scenarios : ProjectionScenarios with WAR moved by the change in FPTS
+
+    """
+
+    rng = np.random.default_rng(seed)
+    fpts = players.fpts.astype(np.float64)
+    if fpts_sources is not None:
+        fpts_sources = np.asarray(fpts_sources, dtype=np.float64)
+        sources = rng.integers(len(fpts_sources), size=(n_scenarios, len(players)))
+        scenario_fpts = fpts_sources[sources, np.arange(len(players))]
+    else:
+        noise = rng.standard_normal((n_scenarios, len(players)))
+        scenario_fpts = fpts * (1 + fpts_cv * noise)
+
+    war = players.war + _war_slopes(players) * (scenario_fpts - fpts)
+    scale = rng.uniform(*adp_std_scale, size=(n_scenarios, 1))
+    return ProjectionScenarios(
+        war, players.adp_avg[np.newaxis], scale * players.adp_std[np.newaxis]
+    )
+
+
+def scenario_position_values(war, adp_avg, adp_std, position_codes, picks):
+    """
+    Parameters
+    ----------
+    war, adp_avg, adp_std : Arrays of shape (n_scenarios, players) of the
+    undrafted players
+    position_codes : Array of each players position code
+    picks : Array of the future draft picks to evaluate
+
+    Returns
+    -------
+    position_values : Array of shape (picks, len(POSITIONS), n_scenarios) of
+    the dWAR of each position at each pick in every scenario
+    positions_present : Boolean array of the positions that have players
+
+    """
+
+    from scipy.special import ndtr
+
+    picks = np.asarray(picks, dtype=np.float64)
+    n_scenarios = len(war)
+
+    position_values = np.zeros((len(picks), len(POSITIONS), n_scenarios))
+    positions_present = np.zeros(len(POSITIONS), dtype=bool)
+    if len(picks) == 0:
+        return position_values, positions_present
+
+    for code in np.unique(position_codes):
+        at_position = np.flatnonzero(position_codes == code)
+        positions_present[code] = True
+
+        # The best available order depends on each scenarios WAR, so every
+        # scenario sorts its own players
+        order = np.argsort(-war[:, at_position], axis=1, kind="stable")
+        sorted_war = np.take_along_axis(war[:, at_position], order, axis=1)
+        sorted_avg = np.take_along_axis(adp_avg[:, at_position], order, axis=1)
+        sorted_std = np.take_along_axis(adp_std[:, at_position], order, axis=1)
+
+        # (scenarios, players, picks) availability and best available products
+        z = (picks - sorted_avg[:, :, np.newaxis]) / sorted_std[:, :, np.newaxis]
+        p_available = ndtr(-z)
+        p_best_available = p_available.copy()
+        p_best_available[:, 1:] *= np.cumprod(1 - p_available[:, :-1], axis=1)
+
+        position_values[:, code] = np.einsum("sp,spr->rs", sorted_war, p_best_available)
+    return position_values, positions_present
+
+
+def scenario_dwar(state, scenarios):
+    """
+    Parameters
+    ----------
+    state : DraftState of the current board
+    scenarios : ProjectionScenarios for the players in state
+
+    Returns
+    -------
+    undrafted : Array of the undrafted players rows
+    dwar : Array of shape (n_scenarios, len(undrafted)) of each players dWAR
+    in every scenario. Positions that don't fit the roster are NaN.
+
+    """
+
+    undrafted = np.flatnonzero(state.available)
+    position_codes = state.position_codes[undrafted]
+    shape = (scenarios.n_scenarios, len(state.war))
+    war, adp_avg, adp_std = (
+        np.broadcast_to(values, shape)[:, undrafted]
+        for values in (scenarios.war, scenarios.adp_avg, scenarios.adp_std)
+    )
+
+    future_picks = [i for i in state.draft_picks if i > state.current_pick]
+    position_values, positions_present = scenario_position_values(
+        war, adp_avg, adp_std, position_codes, future_picks
+    )
+    round_values = position_values * positions_present[:, np.newaxis]
+
+    drafted_counts = np.zeros(len(POSITIONS), dtype=np.int16)
+    for position in state.my_positions:
+        drafted_counts[POSITION_CODES[position]] += 1
+
+    # The scenarios are carried through the DP as its batch axis
+    combined_position_value = optimal_draft_value(
+        round_values, state.position_counts, drafted_counts
+    )
+    value_by_code = np.full((scenarios.n_scenarios, len(POSITIONS)), np.nan)
+    for position, value in combined_position_value.items():
+        value_by_code[:, POSITION_CODES[position]] = value
+    return undrafted, war + value_by_code[:, position_codes]
+
+
+def robustness(state, scenarios, top_k: int = DEFAULT_TOP_K):
+    """
+    Parameters
+    ----------
+    state : DraftState of the current board
+    scenarios : ProjectionScenarios for the players in state
+    top_k : Number of top recommendations that count as recommended
+
+    Returns
+    -------
+    robustness : Dataframe indexed by player row, like
+    DraftState.recommendations, with the share of scenarios each player is in
+    the top_k (Robustness) or the top pick (Top Pick Share), and the mean and
+    standard deviation of their dWAR across the scenarios
+
+    """
+
+    undrafted, dwar = scenario_dwar(state, scenarios)
+    ranked = np.nan_to_num(dwar, nan=-np.inf)
+    top = np.argsort(-ranked, axis=1, kind="stable")[:, :top_k]
+
+    in_top_k = np.zeros(len(undrafted))
+    np.add.at(in_top_k, top.ravel(), 1)
+    top_pick = np.bincount(top[:, 0], minlength=len(undrafted))
+
+    frame = state.players.to_frame(undrafted)[["Player", "Pos"]]
+    frame["Robustness"] = in_top_k / scenarios.n_scenarios
+    frame["Top Pick Share"] = top_pick / scenarios.n_scenarios
+    # Positions that don't fit the roster are NaN in every scenario
+    frame["dWAR Mean"] = dwar.mean(axis=0)
+    frame["dWAR Std"] = dwar.std(axis=0)
+    return frame.sort_values("Robustness", ascending=False, kind="stable")
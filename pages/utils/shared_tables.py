@@ -0,0 +1,111 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pages.utils.artifact_cache import frame_to_arrays
+from pages.utils.position_combinations import drop_unsupported_positions, encode_positions
+
+
+class SharedPlayerTable:
+    """
+    Read-only player columns held in shared memory.
+
+    The process that creates the table copies each column into its own shared
+    memory block once. Worker processes attach to the blocks by name with
+    SharedPlayerTable.attach(table.descriptor()), so every process reads the
+    same pages instead of holding a private copy of the projections. All of
+    the arrays are marked read-only.
+
+    """
+
+    def __init__(self, blocks: dict, shapes: dict, owner: bool):
+        self._blocks = blocks
+        self._owner = owner
+        self.columns = {}
+        for column, (dtype, shape) in shapes.items():
+            values = np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[column].buf)
+            values.flags.writeable = False
+            self.columns[column] = values
+
+    @classmethod
+    def create(cls, players):
+        """
+        Parameters
+        ----------
+        players : Dataframe of all players with Player, Pos, WAR, ADP Avg and
+        ADP Std columns (e.g. from Draft_Setup.initialize_player_data)
+
+        Returns
+        -------
+        table : SharedPlayerTable that owns the shared memory. Call close() when
+        done with it to release the memory.
+        """
+
+        players = drop_unsupported_positions(players.reset_index(drop=True))
+        arrays = frame_to_arrays(players)
+        arrays["Pos Code"] = encode_positions(players["Pos"])
+
+        blocks = {}
+        shapes = {}
+        for column, values in arrays.items():
+            # Shared memory blocks can't be empty
+            blocks[column] = shared_memory.SharedMemory(
+                create=True, size=max(values.nbytes, 1)
+            )
+            np.ndarray(values.shape, dtype=values.dtype, buffer=blocks[column].buf)[:] = values
+            shapes[column] = (values.dtype.str, values.shape)
+        return cls(blocks, shapes, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor: dict):
+        """
+        Parameters
+        ----------
+        descriptor : Dictionary from SharedPlayerTable.descriptor()
+
+        Returns
+        -------
+        table : SharedPlayerTable reading the creators shared memory
+        """
+
+        blocks = {}
+        shapes = {}
+        for column, (name, dtype, shape) in descriptor.items():
+            blocks[column] = shared_memory.SharedMemory(name=name)
+            shapes[column] = (dtype, tuple(shape))
+        return cls(blocks, shapes, owner=False)
+
+    def descriptor(self):
+        """
+        Returns
+        -------
+        descriptor : Picklable dictionary of column to (block name, dtype, shape)
+        """
+
+        return {
+            column: (self._blocks[column].name, values.dtype.str, values.shape)
+            for column, values in self.columns.items()
+        }
+
+    def __len__(self):
+        return len(self.columns["Player"])
+
+    def __getitem__(self, column: str):
+        return self.columns[column]
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    def close(self):
+        """
+        Detach from the shared memory. The creator also frees it, after which
+        attached tables can no longer be read.
+        """
+
+        self.columns = {}
+        for block in self._blocks.values():
+            block.close()
+            if self._owner:
+                block.unlink()
+        self._blocks = {}
@@ -0,0 +1,252 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.draft_state import snake_draft_picks
+from pages.utils.draft_value import optimal_draft_value
+from pages.utils.player_pool import PlayerPool
+from pages.utils.position_combinations import POSITION_CODES, POSITIONS
+from pages.utils.positional_value import availability_matrix
+
+# How the simulated manager chooses their players:
+#   dWAR: the recommendation engine used by start_draft
+#   WAR: the best WAR available at a position that still fits the roster
+#   ADP: the lowest ADP Avg available at a position that still fits the roster
+STRATEGIES = ("dWAR", "WAR", "ADP")
+
+# Player data shared by every simulation in a worker process
+_players = {}
+
+
+def _init_worker(players):
+    _players.clear()
+    _players.update(players)
+
+
+def _feasible_positions(roster_counts, position_counts):
+    """
+    Parameters
+    ----------
+    roster_counts : Array of shape (sims, len(POSITIONS)) of the players per
+    position drafted so far in each simulation
+    position_counts : Array of every valid number of players per position
+
+    Returns
+    -------
+    feasible : Boolean array of shape (sims, len(POSITIONS)) of the positions
+    that can still be drafted without breaking every valid roster
+
+    """
+
+    slack = position_counts[np.newaxis, :, :] - roster_counts[:, np.newaxis, :]
+    fits = (slack >= 0).all(axis=2)
+    return (fits[:, :, np.newaxis] & (slack >= 1)).any(axis=1)
+
+
+def _dwar_values(available, roster_counts, round_index, draft_picks, position_counts):
+    """
+    Returns
+    -------
+    player_values : Array of shape (sims, players) of each players dWAR in every
+    simulation. Players at positions that don't fit the roster are NaN.
+
+    """
+
+    war = _players["war"]
+    n_sims = len(available)
+    future_picks = draft_picks[round_index + 1 :]
+    round_values = np.zeros((len(future_picks), len(POSITIONS), n_sims))
+
+    # Per-position best available products for every simulation at once. Drafted
+    # players have p_Available = 0 (p_Not Available = 1) so they drop out of both
+    # the cumulative product and the dWAR sum.
+    for code, war_order in _players["war_orders"].items():
+        if len(future_picks) == 0:
+            break
+        p_available = availability_matrix(
+            _players["adp_avg"][war_order], _players["adp_std"][war_order], future_picks
+        )
+        p_available = np.where(
+            available[:, war_order, np.newaxis], p_available[np.newaxis], 0.0
+        )
+        p_not_available = np.cumprod(1 - p_available, axis=1)
+        p_best_available = p_available.copy()
+        p_best_available[:, 1:] *= p_not_available[:, :-1]
+        round_values[:, code] = np.einsum("p,spr->rs", war[war_order], p_best_available)
+
+    # Simulations with the same roster so far share the same DP structure, so
+    # each group is optimized with the simulations as a batch axis
+    position_value = np.full((n_sims, len(POSITIONS)), np.nan)
+    groups, group_ids = np.unique(roster_counts, axis=0, return_inverse=True)
+    for group_index, drafted_counts in enumerate(groups):
+        sims = np.flatnonzero(group_ids.ravel() == group_index)
+        combined_position_value = optimal_draft_value(
+            round_values[:, :, sims], position_counts, drafted_counts
+        )
+        for position, value in combined_position_value.items():
+            position_value[sims, POSITION_CODES[position]] = value
+
+    return war[np.newaxis, :] + position_value[:, _players["position_codes"]]
+
+
+def _simulate_chunk(slot, strategy, n_teams, n_sims, adp_std_scale, seed):
+    """
+    Play out n_sims complete drafts with the manager picking at draft slot
+    `slot`. Opponents take the undrafted player with the lowest sampled ADP.
+
+    Returns
+    -------
+    team_war, team_fpts : Arrays of the managers final team WAR and FPTS
+
+    """
+
+    position_codes = _players["position_codes"]
+    position_counts = _players["position_counts"]
+    n_players = len(position_codes)
+    n_rounds = int(position_counts[0].sum())
+    draft_picks = snake_draft_picks(slot, n_teams, n_rounds)
+    rng = np.random.default_rng(seed)
+
+    # Each simulation samples every players draft position from their ADP
+    # distribution. Opponents walk down that order skipping drafted players.
+    sampled_adp = _players["adp_avg"] + adp_std_scale * _players[
+        "adp_std"
+    ] * rng.standard_normal((n_sims, n_players))
+    opponent_order = np.argsort(sampled_adp, axis=1)
+    opponent_heads = np.zeros(n_sims, dtype=np.int64)
+
+    sims = np.arange(n_sims)
+    available = np.ones((n_sims, n_players), dtype=bool)
+    roster_counts = np.zeros((n_sims, len(POSITIONS)), dtype=np.int16)
+    team_war = np.zeros(n_sims)
+    team_fpts = np.zeros(n_sims)
+
+    for pick in range(1, draft_picks[-1] + 1):
+        if pick in draft_picks:
+            round_index = draft_picks.index(pick)
+            if strategy == "dWAR":
+                player_values = _dwar_values(
+                    available, roster_counts, round_index, draft_picks, position_counts
+                )
+            else:
+                if strategy == "WAR":
+                    player_values = np.broadcast_to(_players["war"], available.shape)
+                else:
+                    player_values = np.broadcast_to(-_players["adp_avg"], available.shape)
+                feasible = _feasible_positions(roster_counts, position_counts)
+                player_values = np.where(
+                    feasible[:, position_codes], player_values, np.nan
+                )
+            player_values = np.where(available, player_values, -np.inf)
+            player_values = np.nan_to_num(player_values, nan=-np.inf)
+            selected = player_values.argmax(axis=1)
+
+            roster_counts[sims, position_codes[selected]] += 1
+            team_war += _players["war"][selected]
+            team_fpts += _players["fpts"][selected]
+        else:
+            # Advance each opponent queue past players drafted by the manager
+            while True:
+                selected = opponent_order[sims, opponent_heads]
+                drafted = ~available[sims, selected]
+                if not drafted.any():
+                    break
+                opponent_heads[drafted] += 1
+            opponent_heads += 1
+
+        available[sims, selected] = False
+
+    return team_war, team_fpts
+
+
+def simulate_drafts(
+    Draft,
+    n_teams: int,
+    n_simulations: int,
+    strategies=STRATEGIES,
+    slots=None,
+    adp_std_scale: float = 1.0,
+    chunk_size: int = 1000,
+    n_workers: int = None,
+    seed: int = None,
+):
+    """
+    Parameters
+    ----------
+    Draft : Draft_Setup with the roster settings and projection year
+    n_teams : Number of teams in the league
+    n_simulations : Number of drafts to simulate for each slot and strategy
+    strategies : Strategies from STRATEGIES to evaluate
+    slots : Draft slots to evaluate, defaults to every slot
+    adp_std_scale : Multiplier on ADP Std when sampling opponent picks
+    chunk_size : Number of drafts simulated together in one vectorized batch
+    n_workers : Number of processes, defaults to every core
+    seed : Seed for reproducible simulations
+
+    Returns
+    -------
+    results : Dataframe with one row per simulated draft with the Slot,
+    Strategy and the managers final team WAR and FPTS
+
+    """
+
+    # Only the compact columns the simulations need are sent to the workers
+    pool = PlayerPool.from_frame(Draft.initialize_player_data())
+    players = {
+        "position_codes": pool.position_codes,
+        "war": pool.war,
+        "fpts": pool.fpts,
+        "adp_avg": pool.adp_avg,
+        "adp_std": pool.adp_std,
+        "position_counts": Draft.position_counts(),
+        "war_orders": pool.war_orders(),
+    }
+
+    if slots is None:
+        slots = range(1, n_teams + 1)
+
+    # Split every slot and strategy into chunks of simulations
+    tasks = []
+    for slot in slots:
+        for strategy in strategies:
+            for start in range(0, n_simulations, chunk_size):
+                tasks.append((slot, strategy, min(chunk_size, n_simulations - start)))
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(players,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _simulate_chunk, slot, strategy, n_teams, n_sims, adp_std_scale, task_seed
+            )
+            for (slot, strategy, n_sims), task_seed in zip(tasks, seeds)
+        ]
+        results = []
+        for (slot, strategy, n_sims), future in zip(tasks, futures):
+            team_war, team_fpts = future.result()
+            results.append(
+                pd.DataFrame(
+                    {"Slot": slot, "Strategy": strategy, "WAR": team_war, "FPTS": team_fpts}
+                )
+            )
+
+    return pd.concat(results, ignore_index=True)
+
+
+def summarize_simulations(results):
+    """
+    Returns
+    -------
+    summary : Dataframe of the distribution of the final team WAR and FPTS for
+    each draft slot and strategy
+
+    """
+
+    return results.groupby(["Slot", "Strategy"])[["WAR", "FPTS"]].describe(
+        percentiles=[0.1, 0.5, 0.9]
+    )
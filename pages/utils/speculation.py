@@ -0,0 +1,235 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pages.utils.positional_value import availability_matrix
+
+
+class BoundedCache:
+    """
+    Thread-safe dictionary that drops the least recently added entries past
+    max_entries. It is written by the speculation thread and read by the
+    draft, so lookups go through get() to check and read in one step.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def likely_boards(adp_avg, adp_std, available, current_pick: int, next_pick: int, n_boards: int):
+    """
+    Parameters
+    ----------
+    adp_avg, adp_std : Arrays of each players ADP distribution
+    available : Boolean mask of the players available now
+    current_pick : The next pick to be made
+    next_pick : The managers next pick
+    n_boards : Number of boards to return
+
+    Returns
+    -------
+    boards : List of arrays of the players drafted before next_pick, most likely
+    first. The most likely board takes the players with the highest
+    probability of being gone by next_pick. The others swap one player on the
+    edge of that board for one just outside of it, ranked by how much less
+    likely the swap makes the board.
+
+    """
+
+    n_picks = next_pick - current_pick
+    candidates = np.flatnonzero(available)
+    if n_picks <= 0 or len(candidates) <= n_picks:
+        return [candidates[:max(n_picks, 0)]]
+
+    p_gone = 1 - availability_matrix(
+        adp_avg[candidates], adp_std[candidates], [next_pick]
+    ).ravel()
+    p_gone = np.clip(p_gone, 1e-12, 1 - 1e-12)
+    order = np.argsort(-p_gone, kind="stable")
+    candidates = candidates[order]
+    log_odds = np.log(p_gone[order]) - np.log1p(-p_gone[order])
+
+    # Swapping drafted player i for undrafted player j changes the log
+    # likelihood of the board by log_odds[j] - log_odds[i]
+    edge = n_boards
+    drafted_edge = np.arange(max(n_picks - edge, 0), n_picks)
+    undrafted_edge = np.arange(n_picks, min(n_picks + edge, len(candidates)))
+    swaps = [
+        (log_odds[j] - log_odds[i], i, j) for i in drafted_edge for j in undrafted_edge
+    ]
+    swaps.sort(key=lambda swap: -swap[0])
+
+    base_board = candidates[:n_picks]
+    boards = [base_board]
+    for _, i, j in swaps[: n_boards - 1]:
+        board = base_board.copy()
+        board[i] = candidates[j]
+        boards.append(board)
+    return boards
+
+
+class RecommendationSpeculator:
+    """
+    Precomputes the managers next recommendation in the background.
+
+    Call start() after every pick. A worker thread values the most likely
+    boards at the managers next pick and stores the combined position values
+    by board. When the managers pick comes, recommendations() returns straight
+    from the cache if the real board was one of those explored, waiting for the
+    worker if it hasn't reached the board yet. hits and misses count how often
+    the real board was covered. On a miss the
+    per-position values computed in the background (shared through
+    DraftState.position_value_cache) still make the recomputation cheaper.
+
+    """
+
+    def __init__(self, state, n_boards: int = 16, max_entries: int = 4096):
+        self.state = state
+        self.n_boards = n_boards
+        self.board_cache = BoundedCache(max_entries)
+        self.state.position_value_cache = BoundedCache(max_entries)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._stop = threading.Event()
+        self._future = None
+        # Keys of the boards the running exploration will value, and the one
+        # the draft is waiting on
+        self._planned = frozenset()
+        self._wanted = None
+        self.hits = 0
+        self.misses = 0
+
+    def _board_key(self, available, current_pick):
+        return (current_pick, frozenset(np.flatnonzero(~available).tolist()))
+
+    def next_pick(self):
+        future_picks = [i for i in self.state.draft_picks if i >= self.state.current_pick]
+        return future_picks[0] if future_picks else None
+
+    def _boards(self, available, current_pick: int, next_pick: int):
+        """
+        Returns
+        -------
+        boards : List of the hypothetical availability masks to value, the
+        board left by opponents following ADP exactly first
+        """
+
+        n_picks = next_pick - current_pick
+        candidates = np.flatnonzero(available)
+        adp_board = candidates[np.argsort(self.state.adp_avg[candidates], kind="stable")]
+        boards = [adp_board[: max(n_picks, 0)]] + likely_boards(
+            self.state.adp_avg,
+            self.state.adp_std,
+            available,
+            current_pick,
+            next_pick,
+            self.n_boards,
+        )
+
+        masks = {}
+        for board in boards:
+            hypothetical = available.copy()
+            hypothetical[board] = False
+            masks.setdefault(self._board_key(hypothetical, next_pick), hypothetical)
+        return masks
+
+    def start(self):
+        """
+        Start exploring the boards for the managers next pick from the current
+        board. Any exploration still running from an earlier board is stopped.
+        """
+
+        self.stop()
+        next_pick = self.next_pick()
+        if next_pick is None:
+            return
+
+        boards = self._boards(self.state.available, self.state.current_pick, next_pick)
+        self._planned = frozenset(boards)
+        self._stop = threading.Event()
+        self._future = self._executor.submit(
+            self._speculate,
+            boards,
+            next_pick,
+            list(self.state.my_positions),
+            self._stop,
+        )
+
+    def stop(self, wait_for=None):
+        """
+        Stop the running exploration and wait for the worker to finish. If
+        wait_for is the key of a board the exploration hasn't valued yet, it
+        is left to run until that board is in the cache.
+        """
+
+        if self._future is None:
+            return
+        if wait_for is None or wait_for not in self._planned:
+            self._stop.set()
+        else:
+            self._wanted = wait_for
+            # The board may have been valued before the worker saw it was wanted
+            if wait_for in self.board_cache:
+                self._stop.set()
+        self._future.result()
+        self._future = None
+        self._planned = frozenset()
+        self._wanted = None
+
+    def _speculate(self, boards, next_pick, my_positions, stop):
+        for key, hypothetical in boards.items():
+            if stop.is_set():
+                return
+            if key not in self.board_cache:
+                self.board_cache[key] = self.state.combined_position_value(
+                    hypothetical, my_positions, next_pick
+                )
+            if key == self._wanted:
+                return
+
+    def recommendations(self, n_players: int = None):
+        """
+        Returns
+        -------
+        recommendations : Same as DraftState.recommendations for the current
+        board, using the background results when they cover it. If the
+        exploration is still running and will reach the current board, it is
+        waited for rather than redone.
+
+        """
+
+        key = self._board_key(self.state.available, self.state.current_pick)
+        self.stop(wait_for=key)
+        combined_position_value = self.board_cache.get(key)
+        if combined_position_value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return self.state.recommendations(
+            n_players, combined_position_value=combined_position_value
+        )
+
+    def close(self):
+        self.stop()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,150 @@
+import json
+import os
+
+import pandas as pd
+
+# Per-position WAR coefficient tables, one CSV per scoring format (e.g. PPR.csv)
+# and, once fitted with war_fitting, per scoring format and league size
+# (e.g. PPR-12T.csv)
+WAR_MODEL_DIRECTORY = "./war_models"
+
+# Written by war_fitting next to the fitted tables. Fitted tables from a
+# different WAR_MODEL_VERSION aren't used.
+WAR_MANIFEST_FILE = "manifest.json"
+WAR_MODEL_VERSION = 1
+
+
+def load_war_manifest(directory: str = WAR_MODEL_DIRECTORY):
+    """
+    Returns
+    -------
+    manifest : Dictionary describing the fitted WAR models in directory, or
+    None if there aren't any for the current WAR_MODEL_VERSION
+    """
+
+    path = os.path.join(directory, WAR_MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("version") != WAR_MODEL_VERSION:
+        return None
+    return manifest
+
+
+def fitted_war_coefficients_path(
+    scoring: str, n_teams: int, directory: str = WAR_MODEL_DIRECTORY
+):
+    return "{directory}/{scoring}-{n_teams}T.csv".format(
+        directory=directory, scoring=scoring, n_teams=n_teams
+    )
+
+
+def war_coefficients_path(
+    scoring: str = "PPR", directory: str = WAR_MODEL_DIRECTORY, n_teams: int = None
+):
+    """
+    Returns
+    -------
+    path : Coefficient table for the scoring format. With n_teams, the table
+    fitted for the closest league size is used when the format has been fitted,
+    otherwise {directory}/{scoring}.csv.
+    """
+
+    manifest = load_war_manifest(directory) if n_teams is not None else None
+    if manifest is not None and scoring in manifest["formats"]:
+        # Sizes where no position could be fitted have no table
+        league_sizes = [
+            size
+            for size in manifest["league_sizes"]
+            if os.path.exists(fitted_war_coefficients_path(scoring, size, directory))
+        ]
+        if league_sizes:
+            closest = min(league_sizes, key=lambda size: (abs(size - n_teams), size))
+            return fitted_war_coefficients_path(scoring, closest, directory)
+    return "{directory}/{scoring}.csv".format(directory=directory, scoring=scoring)
+
+
+def load_war_coefficients(
+    scoring: str = "PPR", directory: str = WAR_MODEL_DIRECTORY, n_teams: int = None
+):
+    """
+    Parameters
+    ----------
+    scoring : Scoring format of the WAR models (PPR, Half-PPR, Standard)
+    directory : Directory containing the coefficient tables
+    n_teams : Optional league size to use the fitted models for, see
+    war_coefficients_path
+
+    Returns
+    -------
+    coefficients : Dataframe indexed by position with the columns:
+        intercept: WAR of a player projected for zero fantasy points
+        slope: WAR gained per projected fantasy point
+
+    """
+
+    return pd.read_csv(war_coefficients_path(scoring, directory, n_teams), index_col="Pos")
+
+
+def apply_war_coefficients(projections, coefficients, points_column: str = "FPTS"):
+    """
+    Parameters
+    ----------
+    projections : Dataframe of players with a Pos column and projected points
+    coefficients : Dataframe from load_war_coefficients
+    points_column : Column of projected fantasy points to score
+
+    Returns
+    -------
+    WAR : Series of each players projected wins above replacement. Players at a
+    position without a model are NaN.
+
+    """
+
+    # Look up every players coefficients by position at once, then score the
+    # whole table in a single vectorized operation
+    intercept = projections["Pos"].map(coefficients["intercept"])
+    slope = projections["Pos"].map(coefficients["slope"])
+    return intercept + slope * projections[points_column]
+
+
+def convert_war_pickle(pickle_path: str, csv_path: str):
+    """
+    One-time conversion of a pickled dictionary of per-position sklearn
+    LinearRegression models (e.g. war_linear_models/PPR.pickle) into a
+    coefficient table that can be loaded without sklearn.
+
+    Parameters
+    ----------
+    pickle_path : Path to the pickled models
+    csv_path : Path of the coefficient table to write
+
+    Returns
+    -------
+    coefficients : Dataframe that was written to csv_path
+
+    """
+
+    # Unpickling the models needs sklearn, which is only required for the conversion
+    import pickle
+
+    with open(pickle_path, "rb") as WAR_file:
+        WAR_linear_models = pickle.load(WAR_file)
+
+    coefficients = pd.DataFrame(
+        {
+            "intercept": {
+                position: float(model.intercept_)
+                for position, model in WAR_linear_models.items()
+            },
+            "slope": {
+                position: float(model.coef_.ravel()[0])
+                for position, model in WAR_linear_models.items()
+            },
+        }
+    )
+    coefficients.index.name = "Pos"
+    coefficients.to_csv(csv_path)
+
+    return coefficients
@@ -0,0 +1,318 @@
+"""
+Fit the per-position WAR models from historical season stat lines.
+
+Run from the repository root:
+
+    python -m pages.utils.war_fitting --years 2019 2020 2021
+
+Every (scoring format, league size, position) group is fitted in one run and
+written to war_models as {scoring}-{n_teams}T.csv, with a manifest recording
+the WAR_MODEL_VERSION and the data the models were fitted on.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.artifact_cache import file_hash
+from pages.utils.position_combinations import FLEX_TYPES, POSITION_CODES, POSITIONS
+from pages.utils.scoring import SCORING_FORMATS, ScoringEngine
+from pages.utils.season import SEASON_GAMES, WEEKLY_CV
+from pages.utils.war import (
+    WAR_MANIFEST_FILE,
+    WAR_MODEL_DIRECTORY,
+    WAR_MODEL_VERSION,
+    fitted_war_coefficients_path,
+)
+
+# Season totals per player with Player, Pos, Games and the SCORING_CATEGORIES
+# stat columns. Positions without stat lines (K, DST) have their FPTS instead.
+HISTORY_FILE = "{directory}/{year}/season_stats.csv"
+
+LEAGUE_SIZES = (8, 10, 12, 14, 16)
+
+# Starting lineup every league size is fitted for
+FIT_LINEUP = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "K": 1, "DST": 1}
+FIT_FLEX = 1
+FIT_FLEX_POSITIONS = FLEX_TYPES["Standard"]
+
+# Historical stat lines and points shared by every league size in a worker
+_history = {}
+
+
+def _init_worker(history):
+    _history.clear()
+    _history.update(history)
+
+
+def load_history(years, directory: str = "./data"):
+    """
+    Returns
+    -------
+    history : Dataframe of every players season stat lines for the years, with
+    a Year column
+    """
+
+    seasons = []
+    for year in years:
+        season = pd.read_csv(HISTORY_FILE.format(directory=directory, year=year))
+        season["Year"] = year
+        seasons.append(season)
+    return pd.concat(seasons, ignore_index=True)
+
+
+def format_points(history, formats):
+    """
+    Returns
+    -------
+    points : Array of shape (len(formats), players) of every players season
+    points in each scoring format. Players without stat lines keep their FPTS.
+    """
+
+    # One engine rescores every format, only the changed categories are redone
+    engine = ScoringEngine(history)
+    fixed = history["FPTS"].notna().to_numpy() if "FPTS" in history else None
+    points = np.empty((len(formats), len(history)))
+    for i, scoring in enumerate(formats):
+        engine.set_weights(SCORING_FORMATS[scoring])
+        points[i] = engine.fpts
+        if fixed is not None:
+            points[i, fixed] = history["FPTS"].to_numpy(dtype=np.float64)[fixed]
+    return points
+
+
+def grouped_linear_fit(groups, x, y, n_groups: int):
+    """
+    Least squares fit of y = intercept + slope * x within every group at once.
+
+    Returns
+    -------
+    intercept, slope, r2 : Arrays of length n_groups. Groups with fewer than two
+    distinct x values are NaN.
+    n : Number of observations in each group
+    """
+
+    n = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    sum_x = np.bincount(groups, x, n_groups)
+    sum_y = np.bincount(groups, y, n_groups)
+    sum_xx = np.bincount(groups, x * x, n_groups)
+    sum_xy = np.bincount(groups, x * y, n_groups)
+    sum_yy = np.bincount(groups, y * y, n_groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_x = n * sum_xx - sum_x ** 2
+        var_y = n * sum_yy - sum_y ** 2
+        cov_xy = n * sum_xy - sum_x * sum_y
+        slope = np.where(var_x > 0, cov_xy / var_x, np.nan)
+        intercept = (sum_y - slope * sum_x) / n
+        r2 = np.where(var_y > 0, cov_xy ** 2 / (var_x * var_y), 1.0)
+    return intercept, slope, np.where(np.isnan(slope), np.nan, r2), n.astype(int)
+
+
+def season_war(points, games, position_codes, n_teams: int):
+    """
+    Parameters
+    ----------
+    points, games, position_codes : Arrays of every players season points,
+    games played and position code in a single season
+    n_teams : Number of teams in the league
+
+    Returns
+    -------
+    war : Array of each players wins above replacement. Each week a player
+    plays, their win probability in place of an average starter is compared
+    to a replacement level player's against an average team. Weekly scores
+    vary by WEEKLY_CV, and missed games are filled at replacement level.
+    fitted : Boolean array of the players close enough to the starters to fit
+    the models on
+
+    """
+
+    from scipy.special import ndtr
+
+    ppg = np.divide(points, games, out=np.zeros(len(points)), where=games > 0)
+    ranked = {
+        code: np.flatnonzero(position_codes == code)[
+            np.argsort(-points[position_codes == code], kind="stable")
+        ]
+        for code in range(len(POSITIONS))
+    }
+
+    # Starters at each position, then the best of the rest fill the flex spots
+    n_starters = {
+        POSITION_CODES[position]: n_teams * count for position, count in FIT_LINEUP.items()
+    }
+    flex_codes = [POSITION_CODES[position] for position in FIT_FLEX_POSITIONS]
+    bench = np.concatenate([ranked[code][n_starters[code] :] for code in flex_codes])
+    flex = bench[np.argsort(-points[bench], kind="stable")][: n_teams * FIT_FLEX]
+    for code in flex_codes:
+        n_starters[code] += int((position_codes[flex] == code).sum())
+
+    starter_ppg = np.zeros(len(POSITIONS))
+    replacement_ppg = np.zeros(len(POSITIONS))
+    cv = np.array([WEEKLY_CV[position] for position in POSITIONS])
+    team_variance = 0.0
+    for code, order in ranked.items():
+        starters = order[: n_starters[code]]
+        replacements = order[n_starters[code] : n_starters[code] + n_teams]
+        if len(starters):
+            starter_ppg[code] = ppg[starters].mean()
+        if len(replacements):
+            replacement_ppg[code] = ppg[replacements].mean()
+        team_variance += len(starters) / n_teams * (cv[code] * starter_ppg[code]) ** 2
+
+    # Scoring margin against an average team with the player in place of an
+    # average starter at their position
+    player_cv = cv[position_codes]
+    starter = starter_ppg[position_codes]
+    replacement = replacement_ppg[position_codes]
+    margin_variance = 2 * team_variance - (player_cv * starter) ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win = ndtr((ppg - starter) / np.sqrt(margin_variance + (player_cv * ppg) ** 2))
+        replacement_win = ndtr(
+            (replacement - starter) / np.sqrt(margin_variance + (player_cv * replacement) ** 2)
+        )
+    war = np.minimum(games, SEASON_GAMES) * (win - replacement_win)
+
+    fitted = np.zeros(len(points), dtype=bool)
+    for code, order in ranked.items():
+        if n_starters[code]:
+            fitted[order[: n_starters[code] + 2 * n_teams]] = True
+    return np.nan_to_num(war), fitted
+
+
+def _fit_league_size(n_teams: int):
+    points = _history["points"]
+    games = _history["games"]
+    position_codes = _history["position_codes"]
+    years = _history["years"]
+
+    # Every format and season is scored, then all of the (format, position)
+    # groups are fitted together
+    groups, x, y = [], [], []
+    for i in range(len(points)):
+        for year in np.unique(years):
+            rows = np.flatnonzero(years == year)
+            war, fitted = season_war(
+                points[i, rows], games[rows], position_codes[rows], n_teams
+            )
+            rows = rows[fitted]
+            groups.append(i * len(POSITIONS) + position_codes[rows])
+            x.append(points[i, rows])
+            y.append(war[fitted])
+
+    n_groups = len(points) * len(POSITIONS)
+    intercept, slope, r2, n = grouped_linear_fit(
+        np.concatenate(groups), np.concatenate(x), np.concatenate(y), n_groups
+    )
+    return pd.DataFrame(
+        {
+            "format": np.repeat(np.arange(len(points)), len(POSITIONS)),
+            "n_teams": n_teams,
+            "Pos": np.tile(POSITIONS, len(points)),
+            "intercept": intercept,
+            "slope": slope,
+            "n_players": n,
+            "r2": r2,
+        }
+    )
+
+
+def fit_war_models(
+    years,
+    league_sizes=LEAGUE_SIZES,
+    formats=None,
+    data_directory: str = "./data",
+    directory: str = WAR_MODEL_DIRECTORY,
+    n_workers: int = None,
+):
+    """
+    Parameters
+    ----------
+    years : Historical seasons to fit on, read from HISTORY_FILE
+    league_sizes : Numbers of teams to fit models for
+    formats : Scoring formats from SCORING_FORMATS, defaults to all of them
+    data_directory : Directory with a folder of data per year
+    directory : Directory to write the coefficient tables and manifest to
+    n_workers : Number of processes, defaults to every core
+
+    Returns
+    -------
+    coefficients : Dataframe with the intercept, slope, number of players and
+    r2 of every (scoring, n_teams, Pos) model that was written
+
+    """
+
+    formats = list(SCORING_FORMATS) if formats is None else list(formats)
+    history = load_history(years, data_directory)
+    positions = history["Pos"].map(POSITION_CODES)
+    known = positions.notna().to_numpy()
+    history = history[known].reset_index(drop=True)
+
+    # Only the compact arrays the fits need are sent to the workers
+    shared = {
+        "points": format_points(history, formats),
+        "games": history["Games"].fillna(0).to_numpy(dtype=np.float64),
+        "position_codes": positions[known].to_numpy(dtype=np.int8),
+        "years": history["Year"].to_numpy(),
+    }
+    with ProcessPoolExecutor(
+        max_workers=min(n_workers or os.cpu_count(), len(league_sizes)),
+        initializer=_init_worker,
+        initargs=(shared,),
+    ) as executor:
+        fits = list(executor.map(_fit_league_size, league_sizes))
+
+    coefficients = pd.concat(fits, ignore_index=True)
+    coefficients.insert(0, "scoring", np.asarray(formats)[coefficients.pop("format")])
+    coefficients = coefficients[coefficients["slope"].notna()]
+
+    os.makedirs(directory, exist_ok=True)
+    for (scoring, n_teams), models in coefficients.groupby(["scoring", "n_teams"]):
+        models.drop(columns=["scoring", "n_teams"]).to_csv(
+            fitted_war_coefficients_path(scoring, n_teams, directory), index=False
+        )
+
+    manifest = {
+        "version": WAR_MODEL_VERSION,
+        "formats": formats,
+        "league_sizes": sorted(int(n_teams) for n_teams in league_sizes),
+        "lineup": dict(FIT_LINEUP, Flex=FIT_FLEX),
+        "data": {
+            str(year): file_hash(HISTORY_FILE.format(directory=data_directory, year=year))
+            for year in years
+        },
+    }
+    with open(os.path.join(directory, WAR_MANIFEST_FILE), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    return coefficients.reset_index(drop=True)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, nargs="+", required=True)
+    parser.add_argument("--league-sizes", type=int, nargs="+", default=list(LEAGUE_SIZES))
+    parser.add_argument("--formats", nargs="+", choices=list(SCORING_FORMATS))
+    parser.add_argument("--data-directory", default="./data")
+    parser.add_argument("--directory", default=WAR_MODEL_DIRECTORY)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    coefficients = fit_war_models(
+        args.years,
+        args.league_sizes,
+        args.formats,
+        args.data_directory,
+        args.directory,
+        args.workers,
+    )
+    print(coefficients.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,236 @@
+"""
+Replay recorded drafts without any input and emit the dWAR recommendations at
+each of the managers picks.
+
+A pick log is a csv or jsonl file with one row per pick and the columns:
+    draft_id : Identifier of the draft (a log can hold many drafts)
+    pick     : Overall pick number, starting at 1
+    player   : Name of the player taken, matching the projection file
+
+Example, backtesting the manager at the third pick of every draft:
+
+    python replay.py logs/*.csv --teams 12 --first-pick 3 --output recs.jsonl
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from main import Draft_Setup
+from pages.utils.draft_state import DraftState, snake_draft_picks
+from pages.utils.player_pool import PlayerPool
+
+# Players and roster settings shared by every draft replayed in a worker process
+_league = {}
+
+
+def read_pick_log(path: str):
+    """
+    Returns
+    -------
+    pick_log : Dataframe of draft_id, pick and player sorted by draft and pick
+    """
+
+    if path.endswith(".jsonl"):
+        pick_log = pd.read_json(path, lines=True)
+    else:
+        pick_log = pd.read_csv(path)
+    pick_log["draft_id"] = pick_log["draft_id"].astype(str)
+    return pick_log.sort_values(["draft_id", "pick"], kind="stable")
+
+
+def _json_value(dwar):
+    # Positions that don't fit the roster are NaN, which isn't valid JSON
+    return round(float(dwar), 4) if math.isfinite(dwar) else None
+
+
+def replay_draft(
+    all_players, position_counts, draft_picks, picks, n_recommendations: int = 10
+):
+    """
+    Parameters
+    ----------
+    all_players : PlayerPool or Dataframe from Draft_Setup.initialize_player_data
+    position_counts : Array from Draft_Setup.position_counts
+    draft_picks : List of the managers draft picks
+    picks : List of (pick, player) in draft order
+    n_recommendations : Number of recommended players to emit at each pick
+
+    Returns
+    -------
+    recommendations : List of dictionaries, one for each of the managers picks,
+    with the recommended players and the player that was actually taken. A
+    dWAR of None is a position that no longer fits the roster.
+
+    Raises
+    ------
+    ValueError : If one of the managers picks is a player that isn't in the
+    projections or was already drafted
+
+    """
+
+    state = DraftState(all_players, draft_picks, position_counts)
+    results = []
+    for pick, player in picks:
+        if pick > max(draft_picks):
+            break
+
+        # Picks missing from the log are treated as opponents taking the best ADP
+        while state.current_pick < pick:
+            state.pick(state.next_adp_player())
+
+        player_index = state.player_lookup.get(player)
+        if state.is_my_pick():
+            # The managers roster and every later recommendation depend on the pick
+            if player_index is None:
+                raise ValueError(
+                    "Pick {pick}: {player} is not in the projections".format(
+                        pick=pick, player=player
+                    )
+                )
+            if not state.available[player_index]:
+                raise ValueError(
+                    "Pick {pick}: {player} was already drafted".format(
+                        pick=pick, player=player
+                    )
+                )
+
+            ranked = state.recommendations()
+            top = ranked.head(n_recommendations)
+            results.append(
+                {
+                    "pick": int(pick),
+                    "round": draft_picks.index(pick) + 1,
+                    "player": player,
+                    "recommended": [
+                        {"player": name, "pos": position, "dWAR": _json_value(dwar)}
+                        for name, position, dwar in zip(
+                            top["Player"], top["Pos"], top["dWAR"]
+                        )
+                    ],
+                    # Where the manager's actual pick ranked
+                    "player_rank": int(ranked.index.get_loc(player_index)) + 1,
+                }
+            )
+
+        if player_index is not None and state.available[player_index]:
+            state.pick(player_index)
+        else:
+            # Unknown or duplicate opponent picks still use up the pick
+            state.skip_pick()
+
+    return results
+
+
+def _init_worker(settings: dict, n_teams: int, first_pick: int, n_recommendations: int):
+    n_rounds = sum(
+        settings[key] for key in ("n_QB", "n_RB", "n_WR", "n_TE", "n_FLEX", "n_BENCH")
+    )
+    Draft = Draft_Setup(
+        draft_picks=snake_draft_picks(first_pick, n_teams, n_rounds), **settings
+    )
+    _league.update(
+        all_players=PlayerPool.from_frame(Draft.initialize_player_data()),
+        position_counts=Draft.position_counts(),
+        draft_picks=Draft.draft_picks,
+        n_recommendations=n_recommendations,
+    )
+
+
+def _replay_log(path: str):
+    lines = []
+    for draft_id, draft in read_pick_log(path).groupby("draft_id", sort=False):
+        try:
+            results = replay_draft(
+                _league["all_players"],
+                _league["position_counts"],
+                _league["draft_picks"],
+                list(zip(draft["pick"], draft["player"])),
+                _league["n_recommendations"],
+            )
+        except ValueError as error:
+            raise ValueError(
+                "{path} draft {draft_id}: {error}".format(
+                    path=path, draft_id=draft_id, error=error
+                )
+            ) from error
+        for result in results:
+            lines.append(
+                json.dumps({"log": path, "draft_id": draft_id, **result}, allow_nan=False)
+            )
+    return lines
+
+
+def replay_logs(
+    paths,
+    settings: dict,
+    n_teams: int,
+    first_pick: int,
+    n_recommendations: int = 10,
+    n_workers: int = None,
+):
+    """
+    Replay every pick log across a process pool.
+
+    Yields
+    ------
+    JSON lines of the recommendations at each of the managers picks, in the
+    order of paths
+    """
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(settings, n_teams, first_pick, n_recommendations),
+    ) as executor:
+        for lines in executor.map(_replay_log, paths):
+            yield from lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("logs", nargs="+", help="csv or jsonl pick logs")
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--first-pick", type=int, required=True)
+    parser.add_argument("--year", type=int, default=2021)
+    parser.add_argument("--qb", type=int, default=1)
+    parser.add_argument("--rb", type=int, default=2)
+    parser.add_argument("--wr", type=int, default=2)
+    parser.add_argument("--te", type=int, default=1)
+    parser.add_argument("--flex", type=int, default=1)
+    parser.add_argument("--bench", type=int, default=0)
+    parser.add_argument(
+        "--flex-type",
+        default="Standard",
+        choices=["Standard", "Super Flex", "RB/WR", "None"],
+    )
+    parser.add_argument("--recommendations", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="jsonl output path, defaults to stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    settings = {
+        "n_QB": args.qb,
+        "n_RB": args.rb,
+        "n_WR": args.wr,
+        "n_TE": args.te,
+        "n_FLEX": args.flex,
+        "n_BENCH": args.bench,
+        "flex_type": args.flex_type,
+        "year": args.year,
+    }
+    output = open(args.output, "w") if args.output else sys.stdout
+    for line in replay_logs(
+        args.logs, settings, args.teams, args.first_pick, args.recommendations, args.workers
+    ):
+        output.write(line + "\n")
+    if args.output:
+        output.close()
@@ -0,0 +1,349 @@
+"""
+Serve draft recommendations for many concurrent drafts from one process.
+
+The player table is loaded once into shared memory and read by a pool of
+worker processes that value the boards. The server holds the state of every
+draft and speaks newline-delimited JSON over TCP, one request per line:
+
+    {"op": "create", "draft_id": "a", "first_pick": 3, "n_teams": 12,
+     "roster": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "Flex": 1, "Bench": 0},
+     "flex_type": "Standard"}
+    {"op": "pick", "draft_id": "a", "player": "Christian McCaffrey"}
+    {"op": "recommend", "draft_id": "a", "n": 10}
+    {"op": "close", "draft_id": "a"}
+
+Every response is one line with "ok" set, and "error" when it isn't. Drafts
+can instead pass their "draft_picks" directly. Example:
+
+    python server.py --year 2021 --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from main import Draft_Setup
+from pages.utils.draft_state import future_draft_value, rank_by_dwar, snake_draft_picks
+from pages.utils.position_combinations import FLEX_TYPES, POSITIONS, position_count_vectors
+from pages.utils.positional_value import positional_values
+from pages.utils.shared_tables import SharedPlayerTable
+
+DEFAULT_PORT = 8765
+
+# Longest request line the server accepts
+MAX_REQUEST_BYTES = 1024 ** 2
+
+# Player table attached to by each worker process
+_table = {}
+
+
+def _init_worker(descriptor: dict):
+    _table["players"] = SharedPlayerTable.attach(descriptor)
+
+
+def _recommend(
+    available_bits, draft_picks, current_pick, drafted_counts, position_counts, n_players
+):
+    """
+    Value a board in a worker process with the same future_draft_value and
+    rank_by_dwar as DraftState.recommendations.
+
+    Parameters
+    ----------
+    available_bits : np.packbits of the boolean mask of undrafted players
+    draft_picks : List of the managers draft picks
+    current_pick : The pick being made
+    drafted_counts : Array of the number of players per position the manager
+    has drafted
+    position_counts : Array of every valid number of players per position
+    n_players : Number of recommendations to return
+
+    Returns
+    -------
+    rows : List of the recommended players rows in the player table
+    dwar : List of their dWAR
+
+    """
+
+    players = _table["players"]
+    war = players["WAR"]
+    position_codes = players["Pos Code"]
+    available = np.unpackbits(available_bits, count=len(players)).astype(bool)
+    undrafted = np.flatnonzero(available)
+
+    future_picks = [i for i in draft_picks if i > current_pick]
+    position_values, positions_present = positional_values(
+        war[undrafted],
+        position_codes[undrafted],
+        players["ADP Avg"][undrafted],
+        players["ADP Std"][undrafted],
+        future_picks,
+    )
+    combined_position_value = future_draft_value(
+        position_values, positions_present, position_counts, drafted_counts
+    )
+    order, dwar = rank_by_dwar(war, position_codes, undrafted, combined_position_value)
+    return order[:n_players].tolist(), dwar[:n_players].tolist()
+
+
+class DraftSession:
+    """
+    State of one draft on the server, from the managers point of view.
+    """
+
+    def __init__(self, n_players: int, draft_picks, position_counts):
+        self.draft_picks = list(draft_picks)
+        self.position_counts = position_counts
+        self.available = np.ones(n_players, dtype=bool)
+        self.current_pick = 1
+        self.drafted_counts = np.zeros(len(POSITIONS), dtype=np.int16)
+
+    def is_my_pick(self):
+        return self.current_pick in self.draft_picks
+
+    def pick(self, player_index: int, position_code: int):
+        if not self.available[player_index]:
+            raise ValueError("Player has already been drafted")
+        self.available[player_index] = False
+        if self.is_my_pick():
+            self.drafted_counts[position_code] += 1
+        self.current_pick = self.current_pick + 1
+
+
+class DraftServer:
+    """
+    Holds every draft and hands the valuation of each board to a process pool.
+
+    Picks only flip a bit in the drafts availability mask and are handled on
+    the event loop. Recommendations snapshot the mask and are computed by the
+    workers, so slow valuations never hold up other drafts.
+
+    """
+
+    def __init__(self, players, n_workers: int = None):
+        """
+        Parameters
+        ----------
+        players : Dataframe of all players (e.g. from
+        Draft_Setup.initialize_player_data)
+        n_workers : Number of worker processes, defaults to the CPU count
+
+        """
+
+        self.players = SharedPlayerTable.create(players)
+        self.player_lookup = {name: index for index, name in enumerate(self.players["Player"])}
+        self.executor = ProcessPoolExecutor(
+            max_workers=n_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(self.players.descriptor(),),
+        )
+        self.drafts = {}
+        # Leagues with the same roster settings share their position counts
+        self._position_counts = {}
+        self._server = None
+        # Open connections and the tasks handling them, closed with the server
+        self._connections = {}
+
+    def position_counts(self, roster: dict, flex_type: str):
+        key = (tuple(sorted(roster.items())), flex_type)
+        if key not in self._position_counts:
+            self._position_counts[key] = position_count_vectors(roster, FLEX_TYPES[flex_type])
+        return self._position_counts[key]
+
+    def create(self, request):
+        flex_type = request.get("flex_type", "Standard")
+        if flex_type not in FLEX_TYPES:
+            raise ValueError("Unknown flex type {flex_type}".format(flex_type=flex_type))
+        if "draft_picks" in request:
+            draft_picks = request["draft_picks"]
+        else:
+            draft_picks = snake_draft_picks(
+                request["first_pick"], request["n_teams"], sum(request["roster"].values())
+            )
+        self.drafts[request["draft_id"]] = DraftSession(
+            len(self.players),
+            draft_picks,
+            self.position_counts(request["roster"], flex_type),
+        )
+        return {"draft_picks": draft_picks}
+
+    def pick(self, request):
+        draft = self.drafts[request["draft_id"]]
+        if request["player"] not in self.player_lookup:
+            raise ValueError("Unknown player {player}".format(player=request["player"]))
+        player_index = self.player_lookup[request["player"]]
+        draft.pick(player_index, self.players["Pos Code"][player_index])
+        return {"pick": draft.current_pick}
+
+    async def recommend(self, request):
+        draft = self.drafts[request["draft_id"]]
+        current_pick = draft.current_pick
+        # dWAR is the value of the managers own pick, other picks have none
+        if not draft.is_my_pick():
+            raise ValueError(
+                "Pick {pick} isn't one of the managers picks".format(pick=current_pick)
+            )
+        rows, dwar = await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            _recommend,
+            np.packbits(draft.available),
+            draft.draft_picks,
+            current_pick,
+            draft.drafted_counts.copy(),
+            draft.position_counts,
+            request.get("n", 10),
+        )
+        return {
+            "pick": current_pick,
+            "recommendations": [
+                {
+                    "player": str(self.players["Player"][row]),
+                    "pos": str(self.players["Pos"][row]),
+                    # Positions that no longer fit the roster have no value
+                    "dWAR": None if np.isnan(value) else round(value, 4),
+                }
+                for row, value in zip(rows, dwar)
+            ],
+        }
+
+    def close_draft(self, request):
+        self.drafts.pop(request["draft_id"], None)
+        return {}
+
+    async def handle(self, request):
+        """
+        Returns
+        -------
+        response : Dictionary for the request, with ok set to whether it succeeded
+        """
+
+        handlers = {"create": self.create, "pick": self.pick, "close": self.close_draft}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Request must be a JSON object"}
+        try:
+            if request.get("op") == "recommend":
+                response = await self.recommend(request)
+            elif request.get("op") in handlers:
+                response = handlers[request["op"]](request)
+            else:
+                raise ValueError("Unknown op {op}".format(op=request.get("op")))
+        except KeyError as error:
+            return {"ok": False, "error": "Missing {key}".format(key=error)}
+        except (ValueError, TypeError, AttributeError) as error:
+            # Malformed fields (e.g. a list where a name belongs) fail the request,
+            # not the connection
+            return {"ok": False, "error": str(error)}
+        return {"ok": True, **response}
+
+    async def _handle_connection(self, reader, writer):
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    response = {"ok": False, "error": "Invalid JSON"}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        """
+        Start listening, port 0 picks a free port.
+
+        Returns
+        -------
+        port : The port the server is listening on
+        """
+
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, limit=MAX_REQUEST_BYTES
+        )
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Closing the transports ends each connection at its next read
+            connections = list(self._connections.items())
+            for writer, _ in connections:
+                writer.close()
+            await asyncio.gather(*[task for _, task in connections], return_exceptions=True)
+            await self._server.wait_closed()
+        # Waiting for the workers blocks, so it's done off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        self.players.close()
+
+
+class DraftClient:
+    """
+    Client for a DraftServer, one request at a time over a single connection.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_REQUEST_BYTES)
+        return cls(reader, writer)
+
+    async def request(self, op: str, **fields):
+        self.writer.write(json.dumps({"op": op, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def load_players(year: int):
+    """
+    Returns
+    -------
+    players : Scored projections for the year, the roster settings don't matter
+    """
+
+    return Draft_Setup(1, 2, 2, 1, 1, "Standard", [], year).initialize_player_data()
+
+
+async def _serve(args):
+    server = DraftServer(load_players(args.year), args.workers)
+    port = await server.start(args.host, args.port)
+    print(
+        "Serving {n} players on {host}:{port}".format(
+            n=len(server.players), host=args.host, port=port
+        )
+    )
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--year", type=int, default=2021)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    asyncio.run(_serve(parser.parse_args()))
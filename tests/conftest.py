@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture
+def repo_root(monkeypatch):
+    # Default data paths (e.g. ./data/{year}) are relative to the repository root
+    monkeypatch.chdir(REPO_ROOT)
+    return REPO_ROOT
+
+
+@pytest.fixture
+def synthetic_draft(tmp_path, monkeypatch):
+    """
+    Draft_Setup for a 12 team, 10 round synthetic league written under tmp_path
+    """
+
+    import main
+    from benchmarks.synthetic import synthetic_league
+
+    settings = synthetic_league(str(tmp_path), 12, 10, "Standard", 400)
+    monkeypatch.chdir(tmp_path)
+    return main.Draft_Setup(**settings)
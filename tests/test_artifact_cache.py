@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+from pages.utils.artifact_cache import ArtifactCache
+
+
+def memory_mapped(values):
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = values.base
+    return False
+
+
+def test_cached_projections_keep_numeric_columns_mapped(synthetic_draft):
+    cold = synthetic_draft.initialize_player_data()
+    warm = synthetic_draft.initialize_player_data()
+
+    for column in ("FPTS", "ADP Avg", "ADP Std", "WAR"):
+        values = warm[column].to_numpy()
+        assert memory_mapped(values)
+        assert not values.flags.writeable
+        assert np.array_equal(values, cold[column].to_numpy())
+    assert list(warm["Player"]) == list(cold["Player"])
+
+
+def test_evicts_least_recently_used_at_the_size_limit(tmp_path):
+    arrays = {"values": np.arange(1000, dtype=np.float64)}
+    probe = ArtifactCache(str(tmp_path / "probe"))
+    probe.store("probe", arrays)
+    artifact_size = probe.size()
+
+    # Room for two artifacts but not three
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=2 * artifact_size)
+    for age, key in enumerate(["a", "b"]):
+        cache.store(key, arrays)
+        # Explicit times so the order doesn't depend on the filesystem clock
+        os.utime(os.path.join(cache.directory, key), (age, age))
+
+    # Loading a marks it as recently used, so b is the one evicted
+    assert cache.load("a") is not None
+    cache.store("c", arrays)
+
+    assert cache.load("b") is None
+    assert np.array_equal(cache.load("a")["values"], arrays["values"])
+    assert np.array_equal(cache.load("c")["values"], arrays["values"])
+    assert cache.size() <= cache.max_bytes
+
+
+def test_artifact_bigger_than_the_cache_is_still_returned(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=100)
+    values = np.arange(1000)
+
+    arrays = cache.get_or_compute("big", lambda: {"values": values})
+
+    assert np.array_equal(arrays["values"], values)
+    assert cache.load("big") is None
+    assert cache.size() == 0
@@ -0,0 +1,14 @@
+from benchmarks.bench_pipeline import FULL_GRID, full_grid_leagues
+from benchmarks.synthetic import synthetic_league
+
+
+def test_full_grid_only_has_leagues_that_fit_their_lineup(tmp_path):
+    leagues = full_grid_leagues()
+    assert (8, 7, "Standard", 200) in leagues
+    assert (8, 7, "Super Flex", 200) not in leagues
+    assert {n_rounds for _, n_rounds, _, _ in leagues} == set(FULL_GRID["n_rounds"])
+
+    # Every remaining roster can be synthesized
+    for n_rounds, flex_type in {(league[1], league[2]) for league in leagues}:
+        settings = synthetic_league(str(tmp_path), 8, n_rounds, flex_type, 50)
+        assert len(settings["draft_picks"]) == n_rounds
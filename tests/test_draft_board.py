@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from pages.utils.draft_board import DraftBoard
+from pages.utils.scoring import ScoringEngine
+
+
+def stat_line_projections():
+    return pd.DataFrame(
+        {
+            "Player": ["Passer", "Runner", "Catcher", "Tight End"],
+            "Pos": ["QB", "RB", "WR", "TE"],
+            "Pass Yds": [4000.0, 0.0, 0.0, 0.0],
+            "Pass TD": [25.0, 0.0, 0.0, 0.0],
+            "Rush Yds": [200.0, 1200.0, 50.0, 0.0],
+            "Rush TD": [2.0, 10.0, 0.0, 0.0],
+            "Rec": [0.0, 40.0, 110.0, 90.0],
+            "Rec Yds": [0.0, 300.0, 1300.0, 1000.0],
+            "Rec TD": [0.0, 2.0, 8.0, 7.0],
+        }
+    )
+
+
+def test_board_follows_the_rescored_rankings():
+    projections = stat_line_projections()
+    engine = ScoringEngine(projections, {"Rec": 1.0})
+    projections["FPTS"] = engine.fpts
+
+    board = DraftBoard(projections, order=engine.rankings())
+    assert list(board.visible_rows()) == list(np.argsort(-engine.fpts, kind="stable"))
+    assert board.players["Player"].iat[board.visible_rows()[0]] == "Catcher"
+
+    # Without points per reception the receivers fall behind the passer
+    assert engine.set_weights({"Rec": 0.0})
+    projections["FPTS"] = engine.fpts
+    board = DraftBoard(projections, order=engine.rankings())
+    assert list(board.visible_rows()) == list(np.argsort(-engine.fpts, kind="stable"))
+    assert board.players["Player"].iat[board.visible_rows()[0]] == "Passer"
+    assert list(board.visible_rows("WR")) == [2]
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+import main
+from pages.utils.draft_history import DraftHistory
+from pages.utils.draft_state import DraftState
+
+
+def replayed(players, draft_picks, position_counts, drafted_players):
+    # Fresh DraftState that reached the same board pick by pick
+    state = DraftState(players, draft_picks, position_counts)
+    for player_index in drafted_players:
+        state.pick(player_index)
+    return state
+
+
+def assert_same_board(state, expected):
+    assert state.drafted_players == expected.drafted_players
+    assert state.my_team == expected.my_team
+    assert state.my_positions == expected.my_positions
+    assert state.current_pick == expected.current_pick
+    assert np.array_equal(state.available, expected.available)
+    if state.current_pick <= max(state.draft_picks):
+        recommendations = state.recommendations(20)
+        reference = expected.recommendations(20)
+        assert list(recommendations.index) == list(reference.index)
+        assert np.allclose(recommendations["dWAR"], reference["dWAR"], equal_nan=True)
+
+
+@pytest.mark.parametrize("speculate", [False, True])
+def test_start_draft_undo_matches_a_fresh_replay(synthetic_draft, speculate):
+    choices = []
+
+    def choose_player(recommendations):
+        choices.append(recommendations)
+        # Undo at the first pick (nothing to undo) and again at round three,
+        # which goes back to round two
+        if len(choices) in (1, 4):
+            return main.UNDO
+        # Take a different player after the undo so the rewound picks matter
+        return recommendations.index[1 if len(choices) == 5 else 0]
+
+    state = main.start_draft(synthetic_draft, choose_player, speculate=speculate)
+
+    n_rounds = len(synthetic_draft.draft_picks)
+    assert len(choices) == n_rounds + 3
+    assert len(state.my_team) == n_rounds
+    # The redone pick saw the same board as the undone one
+    assert list(choices[4].index) == list(choices[2].index)
+    assert np.allclose(choices[4]["dWAR"], choices[2]["dWAR"], equal_nan=True)
+    assert state.my_team[1] == choices[4].index[1]
+
+    expected = replayed(
+        synthetic_draft.initialize_player_data(),
+        synthetic_draft.draft_picks,
+        synthetic_draft.position_counts(),
+        state.drafted_players,
+    )
+    assert_same_board(state, expected)
+
+
+def draft_with_history(synthetic_draft, n_picks):
+    players = synthetic_draft.initialize_player_data()
+    position_counts = synthetic_draft.position_counts()
+    state = DraftState(players, synthetic_draft.draft_picks, position_counts)
+    history = DraftHistory(state)
+    while state.current_pick <= n_picks:
+        if state.is_my_pick():
+            history.pick(history.recommendations().index[0])
+        else:
+            history.pick(state.next_adp_player())
+    return players, position_counts, state, history
+
+
+def test_rewind_and_undo(synthetic_draft):
+    players, position_counts, state, history = draft_with_history(synthetic_draft, 30)
+    drafted = list(state.drafted_players)
+    draft_picks = synthetic_draft.draft_picks
+
+    history.rewind(23)
+    assert_same_board(state, replayed(players, draft_picks, position_counts, drafted[:23]))
+
+    # Picking again from the rewound board starts a new line of picks
+    player = history.recommendations().index[2]
+    history.pick(player)
+    assert_same_board(
+        state, replayed(players, draft_picks, position_counts, drafted[:23] + [player])
+    )
+
+    history.undo()
+    assert_same_board(state, replayed(players, draft_picks, position_counts, drafted[:23]))
+
+    with pytest.raises(ValueError):
+        history.rewind(30)
+
+
+def test_edit_replays_the_later_picks(synthetic_draft):
+    players, position_counts, state, history = draft_with_history(synthetic_draft, 30)
+    drafted = list(state.drafted_players)
+    draft_picks = synthetic_draft.draft_picks
+
+    # Swap the manager's first pick for a player nobody took
+    undrafted = int(np.flatnonzero(state.available)[0])
+    assert history.edit(1, undrafted) == []
+    assert_same_board(
+        state, replayed(players, draft_picks, position_counts, [undrafted] + drafted[1:])
+    )
+
+    # Taking a player that was drafted later stops the replay at that pick
+    later_pick = 10
+    dropped = history.edit(2, drafted[later_pick - 1])
+    assert dropped == drafted[later_pick - 1 :]
+    expected = [undrafted, drafted[later_pick - 1]] + drafted[2 : later_pick - 1]
+    assert_same_board(state, replayed(players, draft_picks, position_counts, expected))
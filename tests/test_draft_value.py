@@ -0,0 +1,70 @@
+import numpy as np
+
+from pages.utils.draft_value import count_states, optimal_draft_value
+from pages.utils.position_combinations import (
+    FLEX_TYPES,
+    POSITIONS,
+    generate_position_combinations,
+    position_count_vectors,
+)
+
+N_STARTERS = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "Flex": 2, "Bench": 1}
+
+
+def enumerated_value(round_values, combinations, current_round, drafted_counts):
+    # Best total of the future rounds over every combination that starts with
+    # the drafted positions, by the position taken in the current round
+    counts = np.stack(
+        [(combinations[:current_round] == code).sum(axis=0) for code in range(len(POSITIONS))],
+        axis=1,
+    )
+    surviving = (counts == drafted_counts).all(axis=1)
+    total = np.zeros(surviving.sum())
+    for round_index in range(len(round_values)):
+        total += round_values[round_index][
+            combinations[current_round + 1 + round_index, surviving]
+        ]
+    current_positions = combinations[current_round, surviving]
+    return {
+        POSITIONS[code]: total[current_positions == code].max()
+        for code in np.unique(current_positions)
+    }
+
+
+def test_matches_the_best_combination_at_every_pick():
+    flex_positions = FLEX_TYPES["Super Flex"]
+    combinations = generate_position_combinations(N_STARTERS, flex_positions)
+    position_counts = position_count_vectors(N_STARTERS, flex_positions)
+    n_rounds = combinations.shape[0]
+    rng = np.random.default_rng(0)
+
+    # One manager's draft, with new round values at every pick
+    drafted_counts = np.zeros(len(POSITIONS), dtype=np.int16)
+    for current_round, code in enumerate(combinations[:, 12345]):
+        round_values = rng.random((n_rounds - current_round - 1, len(POSITIONS)))
+        expected = enumerated_value(round_values, combinations, current_round, drafted_counts)
+        combined_position_value = optimal_draft_value(
+            round_values, position_counts, drafted_counts
+        )
+        assert combined_position_value.keys() == expected.keys()
+        for position, value in expected.items():
+            assert np.isclose(combined_position_value[position], value)
+        drafted_counts[code] += 1
+
+    # The states are built once for the roster and reused by every pick
+    assert count_states(position_counts) is count_states(position_counts.copy())
+
+
+def test_batch_axis_matches_each_scenario():
+    position_counts = position_count_vectors(N_STARTERS, FLEX_TYPES["Standard"])
+    drafted_counts = np.array([0, 1, 1, 0, 0, 0], dtype=np.int16)
+    round_values = np.random.default_rng(1).random((6, len(POSITIONS), 4))
+
+    batched = optimal_draft_value(round_values, position_counts, drafted_counts)
+    for scenario in range(4):
+        single = optimal_draft_value(
+            round_values[..., scenario], position_counts, drafted_counts
+        )
+        assert single.keys() == batched.keys()
+        for position, value in single.items():
+            assert batched[position][scenario] == value
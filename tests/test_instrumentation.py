@@ -0,0 +1,38 @@
+from pages.utils.draft_state import DraftState
+from pages.utils.instrumentation import PickTimer
+
+
+def test_setup_stages_with_a_cold_and_warm_cache(synthetic_draft):
+    timer = PickTimer()
+    for _ in range(2):
+        timer.start("setup")
+        synthetic_draft.initialize_player_data(timer)
+        timer.finish()
+
+    cold, warm = (record["stages"] for record in timer.records)
+    assert {"cache_load", "csv_load", "war_scoring"} <= set(cold)
+    # A warm cache skips scoring but its load is still timed
+    assert set(warm) == {"cache_load"}
+    assert warm["cache_load"] > 0
+
+
+def test_pick_stages(synthetic_draft):
+    timer = PickTimer()
+    state = DraftState(
+        synthetic_draft.initialize_player_data(),
+        synthetic_draft.draft_picks,
+        synthetic_draft.position_counts(),
+        timer,
+    )
+    timer.start("pick", pick=1, mine=True)
+    state.recommendations(10)
+    timer.finish()
+
+    record = timer.records[0]
+    assert set(record["stages"]) == {
+        "positional_valuation",
+        "combination_counting",
+        "draft_value",
+        "ranking",
+    }
+    assert record["counters"]["surviving_combinations"] > 0
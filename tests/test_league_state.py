@@ -0,0 +1,32 @@
+import numpy as np
+
+from pages.utils.draft_state import DraftState
+from pages.utils.league_state import LeagueState
+from pages.utils.position_combinations import POSITION_CODES, POSITIONS
+
+
+def test_off_clock_teams_are_valued_at_their_next_pick(synthetic_draft):
+    players = synthetic_draft.initialize_player_data()
+    position_counts = synthetic_draft.position_counts()
+    league = LeagueState(players, 12, 10, position_counts)
+
+    for _ in range(5):
+        values = league.team_values()
+        undrafted, dwar = league.dwar()
+        # Every team can still fill its roster, on the clock or not
+        assert np.isfinite(values).any(axis=1).all()
+        assert np.isfinite(dwar).any(axis=1).all()
+
+        for team in range(12):
+            next_pick = min(i for i in league.team_picks[team] if i >= league.current_pick)
+            state = DraftState(players, league.team_picks[team], position_counts)
+            my_positions = [
+                POSITIONS[state.position_codes[i]] for i in league.team_players[team]
+            ]
+            expected = state.combined_position_value(
+                league.board.available, my_positions, next_pick
+            )
+            for position, value in expected.items():
+                assert np.isclose(values[team, POSITION_CODES[position]], value)
+
+        league.pick(league.board.next_adp_player())
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from pages.utils.player_pool import PlayerPool
+from pages.utils.position_combinations import encode_positions
+from pages.utils.shared_tables import SharedPlayerTable
+
+
+def players_frame(positions):
+    n_players = len(positions)
+    return pd.DataFrame(
+        {
+            "Player": ["Player {i}".format(i=i) for i in range(n_players)],
+            "Pos": positions,
+            "WAR": np.linspace(2, 0, n_players),
+            "FPTS": np.linspace(300, 100, n_players),
+            "ADP Avg": np.arange(1.0, n_players + 1),
+            "ADP Std": np.full(n_players, 3.0),
+        }
+    )
+
+
+def test_encode_positions():
+    assert encode_positions(["QB", "DST", "RB"]).tolist() == [0, 5, 1]
+
+
+def test_unknown_positions_are_rejected():
+    players = players_frame(["QB", "LB", "RB", "FB", "WR"])
+    with pytest.raises(ValueError, match=r"\['FB', 'LB'\]"):
+        PlayerPool.from_frame(players)
+
+
+def test_idp_players_are_ignored(synthetic_draft):
+    projection_file = "data/{year}/season_projections.csv".format(year=synthetic_draft.year)
+    projections = pd.read_csv(projection_file)
+    idp = players_frame(["LB", "DL"]).drop(columns="WAR").assign(Team="KC")
+    pd.concat([idp, projections]).to_csv(projection_file, index=False)
+
+    with pytest.warns(UserWarning, match=r"2 players at unsupported positions \['DL', 'LB'\]"):
+        all_players = synthetic_draft.initialize_player_data()
+    assert len(all_players) == len(projections)
+    assert np.isfinite(all_players["WAR"]).all()
+
+    players = players_frame(["QB", "LB", "RB", "WR"])
+    with pytest.warns(UserWarning):
+        table = SharedPlayerTable.create(players)
+    try:
+        assert list(table["Pos"]) == ["QB", "RB", "WR"]
+    finally:
+        table.close()
+
+    position_value_by_round = main.positional_value_by_round(1, [5, 12], players)
+    assert set(position_value_by_round[1]) == {"QB", "RB", "WR"}
+
+
+def test_invalid_position_codes_are_rejected():
+    with pytest.raises(ValueError):
+        PlayerPool(["A", "B"], [0.0, np.nan], [1, 1], [1, 1], [1, 2], [1, 1])
+    with pytest.raises(ValueError):
+        PlayerPool(["A", "B"], [0, 6], [1, 1], [1, 1], [1, 2], [1, 1])
+
+
+def test_round_trip_and_war_orders():
+    players = players_frame(["WR", "QB", "RB", "WR", "TE", "RB"])
+    players["Team"] = ["KC", "KC", "BUF", "BUF", "KC", "KC"]
+    players["WAR"] = [1.5, 2.0, 0.5, 1.75, 0.25, 0.75]
+
+    pool = PlayerPool.from_frame(players)
+    assert len(pool) == len(players)
+    assert pool.war.dtype == np.float32 and pool.position_codes.dtype == np.int8
+    assert isinstance(pool.columns["Team"], pd.Categorical)
+
+    frame = pool.to_frame()
+    assert list(frame.columns) == list(players.columns)
+    assert list(frame["Team"]) == list(players["Team"])
+    pd.testing.assert_frame_equal(
+        frame.drop(columns="Team"), players.drop(columns="Team"), check_dtype=False
+    )
+    assert list(pool.to_frame([3, 1]).index) == [3, 1]
+
+    war_orders = pool.war_orders()
+    assert war_orders[1].tolist() == [5, 2]
+    assert war_orders[2].tolist() == [3, 0]
+    assert pool.lookup["Player 4"] == 4
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+import main
+from pages.utils.position_combinations import POSITION_CODES, POSITIONS
+from pages.utils.positional_value import positional_values
+
+
+def small_pool(n_players=40, seed=0):
+    rng = np.random.default_rng(seed)
+    players = pd.DataFrame(
+        {
+            "Player": ["Player {i}".format(i=i) for i in range(n_players)],
+            "Pos": rng.choice(["QB", "RB", "WR", "TE"], n_players),
+            "WAR": rng.uniform(-0.5, 3.0, n_players),
+            "ADP Avg": rng.uniform(1, 120, n_players),
+            "ADP Std": rng.uniform(1, 15, n_players),
+        }
+    )
+    # The baseline walked the players in table order, best first
+    return players.sort_values("WAR", ascending=False, ignore_index=True)
+
+
+def baseline_values(players, pick):
+    # One player at a time, as the baseline grouped_probability computed it
+    values = {}
+    for position, group in players.groupby("Pos", sort=False):
+        p_none_better = 1.0
+        value = 0.0
+        for war, adp_avg, adp_std in zip(group["WAR"], group["ADP Avg"], group["ADP Std"]):
+            p_available = 1 - norm(adp_avg, adp_std).cdf(pick)
+            value += war * p_none_better * p_available
+            p_none_better *= norm(adp_avg, adp_std).cdf(pick)
+        values[position] = value
+    return values
+
+
+def test_batched_values_match_the_per_player_loop():
+    players = small_pool()
+    picks = [5, 20, 29, 44, 53, 68]
+
+    position_values, positions_present = positional_values(
+        players["WAR"].to_numpy(),
+        players["Pos"].map(POSITION_CODES).to_numpy(),
+        players["ADP Avg"].to_numpy(),
+        players["ADP Std"].to_numpy(),
+        picks,
+    )
+
+    assert set(np.asarray(POSITIONS)[positions_present]) == set(players["Pos"])
+    for row, pick in enumerate(picks):
+        for position, value in baseline_values(players, pick).items():
+            assert np.isclose(position_values[row, POSITION_CODES[position]], value)
+    # Positions without players add nothing
+    assert (position_values[:, ~positions_present] == 0).all()
+
+
+def test_positional_value_by_round_skips_past_rounds():
+    players = small_pool()
+    draft_picks = [5, 20, 29, 44]
+
+    position_value_by_round = main.positional_value_by_round(20, draft_picks, players)
+
+    assert list(position_value_by_round) == [3, 4]
+    for round_number, values in position_value_by_round.items():
+        expected = baseline_values(players, draft_picks[round_number - 1])
+        assert values.keys() == expected.keys()
+        for position, value in expected.items():
+            assert np.isclose(values[position], value)
@@ -0,0 +1,79 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages.utils.projection_store import ProjectionStore, write_segment
+
+
+def projections():
+    return pd.DataFrame(
+        {
+            "Player": ["Josh Allen", "Pat Mahomes", "Derrick Henry"],
+            "Pos": ["QB", "QB", "RB"],
+            "FPTS": [379.9, 378.1, 300.0],
+            "ADP Avg": [37.1, 24.0, 3.0],
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProjectionStore(str(tmp_path))
+    store.ingest(projections(), "test", 2021)
+    return store
+
+
+def test_partial_update_keeps_other_columns(store):
+    table = store.table("test", 2021)
+    table.append(pd.DataFrame({"Player": ["Pat Mahomes"], "FPTS": [390.0]}))
+
+    assert table.player("Pat Mahomes") == {
+        "Player": "Pat Mahomes",
+        "Pos": "QB",
+        "FPTS": 390.0,
+        "ADP Avg": 24.0,
+    }
+    # Updated players keep their place in the table
+    assert list(table.column("Player")) == ["Josh Allen", "Pat Mahomes", "Derrick Henry"]
+    assert list(table.players_at("QB")) == ["Josh Allen", "Pat Mahomes"]
+
+
+def test_partial_update_rejects_new_players(store):
+    table = store.table("test", 2021)
+    with pytest.raises(ValueError, match="Ja'Marr Chase"):
+        table.append(pd.DataFrame({"Player": ["Ja'Marr Chase"], "FPTS": [250.0]}))
+    assert len(table.player_index) == 3
+
+
+def test_segments_need_every_column(store):
+    table = store.table("test", 2021)
+    with pytest.raises(ValueError, match="missing"):
+        write_segment(table.directory, projections().drop(columns="ADP Avg"), table.schema)
+
+
+def test_concurrent_writers_get_distinct_segments(store):
+    table = store.table("test", 2021)
+    barrier = threading.Barrier(8)
+
+    def write(fpts):
+        update = projections()
+        update["FPTS"] = fpts
+        barrier.wait()
+        write_segment(table.directory, update, table.schema)
+
+    threads = [threading.Thread(target=write, args=(float(i),)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    segments = sorted(
+        entry for entry in os.listdir(table.directory) if entry.startswith("segment-")
+    )
+    assert segments == ["segment-{number:06d}".format(number=i) for i in range(9)]
+    assert not [entry for entry in os.listdir(table.directory) if entry.startswith(".")]
+    table._resolve()
+    assert np.isin(table.column("FPTS"), np.arange(8.0)).all()
@@ -0,0 +1,92 @@
+import json
+
+import pandas as pd
+import pytest
+
+import replay
+from pages.utils.draft_state import DraftState
+from pages.utils.player_pool import PlayerPool
+
+
+@pytest.fixture
+def league(synthetic_draft, monkeypatch):
+    players = PlayerPool.from_frame(synthetic_draft.initialize_player_data())
+    monkeypatch.setattr(
+        replay,
+        "_league",
+        dict(
+            all_players=players,
+            position_counts=synthetic_draft.position_counts(),
+            draft_picks=synthetic_draft.draft_picks,
+            n_recommendations=10,
+        ),
+    )
+    return players
+
+
+def write_log(path, players):
+    pd.DataFrame(
+        {"draft_id": 1, "pick": range(1, len(players) + 1), "player": players}
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+def test_replay_writes_valid_json(league, tmp_path):
+    # Every pick by ADP, so later rounds have positions that no longer fit
+    order = league.adp_avg.argsort(kind="stable")
+    path = write_log(tmp_path / "log.csv", list(league.names[order[:120]]))
+
+    lines = replay._replay_log(path)
+    assert len(lines) == 10
+    dwar = []
+    for line in lines:
+        result = json.loads(line, parse_constant=pytest.fail)
+        assert result["player_rank"] >= 1
+        dwar.extend(recommended["dWAR"] for recommended in result["recommended"])
+    # NaN values are written as null
+    assert None in dwar
+
+
+@pytest.mark.parametrize(
+    "player, problem", [("Nobody", "not in the projections"), ("Player 0", "already drafted")]
+)
+def test_bad_manager_pick_fails_the_replay(league, tmp_path, player, problem):
+    names = ["Player {i}".format(i=i) for i in range(24)]
+    names[0] = "Player 0"
+    # The synthetic manager picks first, and their second pick is 24
+    names[23] = player
+    path = write_log(tmp_path / "log.csv", names)
+
+    with pytest.raises(ValueError, match="draft 1: Pick 24: {player} .*{problem}".format(
+        player=player, problem=problem
+    )):
+        replay._replay_log(path)
+
+
+def test_unknown_and_duplicate_opponent_picks_use_up_the_pick(league, tmp_path):
+    names = ["Player {i}".format(i=i) for i in range(25)]
+    # Opponent picks of a player outside the projections and of one already taken
+    names[1] = "Nobody"
+    names[2] = "Player 0"
+    path = write_log(tmp_path / "log.csv", names)
+
+    results = [json.loads(line) for line in replay._replay_log(path)]
+    assert [result["pick"] for result in results] == [1, 24, 25]
+    # Neither skipped pick drafted anyone, so Player 1 and 2 are still on the
+    # board at the manager's second pick
+    recommended = {row["player"] for row in results[1]["recommended"]}
+    assert {"Player 1", "Player 2"} <= recommended
+    assert results[1]["player"] == "Player 23"
+
+
+def test_skip_pick_only_skips_opponent_picks(league, synthetic_draft):
+    state = DraftState(league, synthetic_draft.draft_picks, synthetic_draft.position_counts())
+    # The synthetic manager picks first
+    with pytest.raises(ValueError, match="Pick 1 is one of the managers picks"):
+        state.skip_pick()
+
+    state.pick(0)
+    state.skip_pick()
+    assert state.current_pick == 3
+    assert state.drafted_players == [0]
+    assert state.available.sum() == len(league) - 1
@@ -0,0 +1,37 @@
+import numpy as np
+
+from pages.utils.draft_board import DraftBoard
+from pages.utils.player_pool import PlayerPool
+from pages.utils.projection_store import DEFAULT_SOURCE, ProjectionStore
+from pages.utils.season import simulate_season, team_rosters
+
+
+def test_results_from_default_projections(repo_root, tmp_path):
+    # The default projections have no WAR until a WAR model scores them
+    predictions = ProjectionStore(str(tmp_path)).table(DEFAULT_SOURCE, 2021).to_frame()
+    assert "WAR" not in predictions
+
+    board = DraftBoard(predictions)
+    for row in board.order[:24]:
+        board.pick(board.players["Player"][row])
+
+    players = PlayerPool.from_frame(board.players)
+    assert np.isnan(players.war).all()
+
+    summary, points = simulate_season(
+        team_rosters(board.drafted, 4),
+        players,
+        {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "Flex": 0},
+        [],
+        n_simulations=200,
+        n_workers=1,
+        seed=0,
+    )
+    assert len(summary) == 4
+    assert points.shape == (200, 4)
+    assert np.isfinite(summary["Playoff Odds"]).all()
+
+
+def test_team_rosters_snake_order():
+    rosters = team_rosters(list(range(8)), 3)
+    assert rosters == [[0, 5, 6], [1, 4, 7], [2, 3]]
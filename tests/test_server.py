@@ -0,0 +1,75 @@
+import asyncio
+
+import numpy as np
+
+from pages.utils.draft_state import DraftState
+from pages.utils.position_combinations import FLEX_TYPES, position_count_vectors
+from server import DraftClient, DraftServer
+
+ROSTER = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "Flex": 1, "Bench": 0}
+
+
+async def _session(players):
+    server = DraftServer(players, n_workers=1)
+    port = await server.start(port=0)
+    client = await DraftClient.connect(port=port)
+    try:
+        created = await client.request(
+            "create", draft_id="a", first_pick=2, n_teams=12, roster=ROSTER
+        )
+        assert created["ok"]
+
+        # Malformed requests are answered with an error on the same connection
+        client.writer.write(b"[1, 2]\n")
+        await client.writer.drain()
+        errors = [await client.reader.readline()]
+        errors.append(await client.request("pick", draft_id="a", player=["a list"]))
+        errors.append(await client.request("pick", draft_id=["a"], player="x"))
+        errors.append(await client.request("create", draft_id="b", first_pick=1,
+                                           n_teams=12, roster=["QB"]))
+        errors.append(await client.request("create", draft_id="c", first_pick=1,
+                                           n_teams=12))
+        errors.append(await client.request("create", draft_id="d", first_pick=1,
+                                           n_teams=12, roster=ROSTER, flex_type="Mega"))
+        # Pick 1 belongs to another team
+        errors.append(await client.request("recommend", draft_id="a"))
+
+        first_player = str(server.players["Player"][0])
+        picked = await client.request("pick", draft_id="a", player=first_player)
+        recommended = await client.request("recommend", draft_id="a", n=5)
+        return errors, created, picked, recommended
+    finally:
+        await client.close()
+        await server.close()
+
+
+def test_malformed_requests_keep_the_connection(synthetic_draft):
+    players = synthetic_draft.initialize_player_data()
+    errors, created, picked, recommended = asyncio.run(_session(players))
+
+    assert errors[0] == b'{"ok": false, "error": "Request must be a JSON object"}\n'
+    for response in errors[1:]:
+        assert response["ok"] is False
+        assert response["error"]
+    assert errors[-2]["error"] == "Unknown flex type Mega"
+    assert "isn't one of the managers picks" in errors[-1]["error"]
+
+    assert picked == {"ok": True, "pick": 2}
+    assert recommended["ok"] and recommended["pick"] == 2
+    assert len(recommended["recommendations"]) == 5
+    assert all(row["dWAR"] is not None for row in recommended["recommendations"])
+
+    # The workers value the board the same as a DraftState
+    state = DraftState(
+        players,
+        created["draft_picks"],
+        position_count_vectors(ROSTER, FLEX_TYPES["Standard"]),
+    )
+    state.pick(0)
+    expected = state.recommendations(5)
+    assert [row["player"] for row in recommended["recommendations"]] == list(
+        expected["Player"]
+    )
+    assert np.allclose(
+        [row["dWAR"] for row in recommended["recommendations"]], expected["dWAR"], atol=1e-4
+    )
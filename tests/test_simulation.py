@@ -0,0 +1,53 @@
+import numpy as np
+
+import main
+from pages.utils.player_pool import PlayerPool
+from pages.utils.simulation import (
+    STRATEGIES,
+    _init_worker,
+    _simulate_chunk,
+    simulate_drafts,
+    summarize_simulations,
+)
+
+
+def test_deterministic_dwar_draft_matches_start_draft(synthetic_draft):
+    # Without ADP noise every simulation is the draft start_draft plays when the
+    # manager takes the top recommendation and opponents pick by ADP
+    state = main.start_draft(synthetic_draft, lambda recommendations: recommendations.index[0])
+
+    pool = PlayerPool.from_frame(synthetic_draft.initialize_player_data())
+    _init_worker(
+        {
+            "position_codes": pool.position_codes,
+            "war": pool.war,
+            "fpts": pool.fpts,
+            "adp_avg": pool.adp_avg,
+            "adp_std": pool.adp_std,
+            "position_counts": synthetic_draft.position_counts(),
+            "war_orders": pool.war_orders(),
+        }
+    )
+    team_war, team_fpts = _simulate_chunk(
+        synthetic_draft.draft_picks[0], "dWAR", 12, 3, adp_std_scale=0.0, seed=0
+    )
+
+    assert np.allclose(team_war, pool.war[state.my_team].sum())
+    assert np.allclose(team_fpts, pool.fpts[state.my_team].sum())
+
+
+def test_results_cover_every_slot_and_strategy(synthetic_draft):
+    kwargs = dict(n_simulations=5, slots=[1, 12], chunk_size=3, n_workers=1, seed=7)
+    results = simulate_drafts(synthetic_draft, 12, **kwargs)
+
+    assert len(results) == 2 * len(STRATEGIES) * 5
+    assert set(results["Slot"]) == {1, 12}
+    assert set(results["Strategy"]) == set(STRATEGIES)
+    assert results[["WAR", "FPTS"]].notna().all().all()
+
+    # The same seed gives the same drafts
+    assert results.equals(simulate_drafts(synthetic_draft, 12, **kwargs))
+
+    summary = summarize_simulations(results)
+    assert len(summary) == 2 * len(STRATEGIES)
+    assert (summary[("WAR", "count")] == 5).all()
@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+
+from pages.utils.draft_state import DraftState
+from pages.utils.speculation import BoundedCache, RecommendationSpeculator
+
+
+def test_background_results_are_used(synthetic_draft):
+    players = synthetic_draft.initialize_player_data()
+    position_counts = synthetic_draft.position_counts()
+    draft_picks = synthetic_draft.draft_picks
+    state = DraftState(players, draft_picks, position_counts)
+    reference = DraftState(players, draft_picks, position_counts)
+    speculator = RecommendationSpeculator(state)
+
+    try:
+        while state.current_pick <= max(draft_picks):
+            if state.is_my_pick():
+                recommendations = speculator.recommendations(10)
+                expected = reference.recommendations(10)
+                assert list(recommendations.index) == list(expected.index)
+                assert np.allclose(recommendations["dWAR"], expected["dWAR"], equal_nan=True)
+                player = recommendations.index[0]
+                state.pick(player)
+                reference.pick(player)
+                # Explore the next pick's boards while the opponents pick
+                speculator.start()
+            else:
+                player = state.next_adp_player()
+                state.pick(player)
+                reference.pick(player)
+    finally:
+        speculator.close()
+
+    # Only the first pick comes before any exploration
+    assert speculator.misses == 1
+    assert speculator.hits == len(draft_picks) - 1
+
+
+def test_bounded_cache_is_thread_safe():
+    cache = BoundedCache(8)
+    errors = []
+
+    def write():
+        for i in range(20000):
+            cache[i % 64] = i
+
+    def read():
+        try:
+            for i in range(20000):
+                value = cache.get(i % 64)
+                assert value is None or value % 64 == i % 64
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=write), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache) == 8
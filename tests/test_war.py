@@ -0,0 +1,154 @@
+import json
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.war import (
+    WAR_MANIFEST_FILE,
+    WAR_MODEL_VERSION,
+    apply_war_coefficients,
+    convert_war_pickle,
+    fitted_war_coefficients_path,
+    load_war_coefficients,
+    load_war_manifest,
+    war_coefficients_path,
+)
+from pages.utils.war_fitting import fit_war_models, grouped_linear_fit
+
+
+def write_manifest(directory, league_sizes, version=WAR_MODEL_VERSION):
+    manifest = {"version": version, "formats": ["PPR"], "league_sizes": league_sizes}
+    (directory / WAR_MANIFEST_FILE).write_text(json.dumps(manifest))
+
+
+def test_war_coefficients_path_picks_the_closest_fitted_table(tmp_path):
+    directory = str(tmp_path)
+    default = "{directory}/PPR.csv".format(directory=directory)
+    assert war_coefficients_path("PPR", directory, n_teams=12) == default
+
+    write_manifest(tmp_path, [8, 10, 12, 16])
+    for n_teams in (8, 10, 16):
+        (tmp_path / "PPR-{n_teams}T.csv".format(n_teams=n_teams)).write_text("Pos\n")
+
+    assert war_coefficients_path("PPR", directory, n_teams=10) == fitted_war_coefficients_path(
+        "PPR", 10, directory
+    )
+    # 12 teams is in the manifest but its table is missing
+    assert war_coefficients_path("PPR", directory, n_teams=12) == fitted_war_coefficients_path(
+        "PPR", 10, directory
+    )
+    assert war_coefficients_path("PPR", directory, n_teams=15) == fitted_war_coefficients_path(
+        "PPR", 16, directory
+    )
+    # Formats that weren't fitted and calls without a league size use the default
+    assert war_coefficients_path("Standard", directory, n_teams=10) == (
+        "{directory}/Standard.csv".format(directory=directory)
+    )
+    assert war_coefficients_path("PPR", directory) == default
+
+
+def test_war_coefficients_path_falls_back_without_fitted_tables(tmp_path):
+    directory = str(tmp_path)
+    default = "{directory}/PPR.csv".format(directory=directory)
+
+    write_manifest(tmp_path, [10, 12])
+    assert war_coefficients_path("PPR", directory, n_teams=12) == default
+
+    (tmp_path / "PPR-12T.csv").write_text("Pos\n")
+    write_manifest(tmp_path, [10, 12], version=WAR_MODEL_VERSION - 1)
+    assert war_coefficients_path("PPR", directory, n_teams=12) == default
+
+
+def synthetic_history(n_per_position=60, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for position, stat, per_unit in (
+        ("QB", "Pass Yds", 0.04),
+        ("RB", "Rush Yds", 0.1),
+        ("WR", "Rec Yds", 0.1),
+        ("TE", "Rec Yds", 0.1),
+    ):
+        points = np.sort(rng.uniform(20, 350, n_per_position))[::-1]
+        for i, value in enumerate(points):
+            row = {"Player": "{position} {i}".format(position=position, i=i), "Pos": position}
+            row[stat] = value / per_unit
+            row["Rec"] = 20.0 if position in ("RB", "WR", "TE") else 0.0
+            row["Games"] = 17 if i % 5 else 12
+            rows.append(row)
+    for position in ("K", "DST"):
+        for i, value in enumerate(np.sort(rng.uniform(60, 160, 30))[::-1]):
+            rows.append(
+                {"Player": "{position} {i}".format(position=position, i=i), "Pos": position,
+                 "FPTS": value, "Games": 17}
+            )
+    return pd.DataFrame(rows)
+
+
+def test_grouped_linear_fit_recovers_known_lines():
+    rng = np.random.default_rng(0)
+    groups = np.repeat([0, 1, 3], 50)
+    x = rng.uniform(0, 300, len(groups))
+    y = np.array([-2.0, 1.0, 0.0, 0.5])[groups] + np.array([0.01, 0.03, 0.0, 0.02])[groups] * x
+    # Group 2 has no players and group 3 a single distinct x, neither can be fitted
+    x[groups == 3] = 100.0
+
+    intercept, slope, r2, n = grouped_linear_fit(groups, x, y, 4)
+    assert np.allclose(intercept[:2], [-2.0, 1.0])
+    assert np.allclose(slope[:2], [0.01, 0.03])
+    assert np.allclose(r2[:2], 1.0)
+    assert np.isnan(slope[2:]).all() and np.isnan(r2[2:]).all()
+    assert n.tolist() == [50, 50, 0, 50]
+
+
+def test_fit_war_models_writes_tables_the_loader_uses(tmp_path):
+    data_directory = tmp_path / "data"
+    (data_directory / "2020").mkdir(parents=True)
+    synthetic_history().to_csv(data_directory / "2020" / "season_stats.csv", index=False)
+    directory = str(tmp_path / "war_models")
+
+    coefficients = fit_war_models(
+        [2020], (8, 10), ["PPR", "Standard"], str(data_directory), directory, n_workers=1
+    )
+
+    assert set(coefficients["scoring"]) == {"PPR", "Standard"}
+    assert set(coefficients["n_teams"]) == {8, 10}
+    # More points are always worth more wins at every position
+    assert (coefficients["slope"] > 0).all()
+    assert set(coefficients["Pos"]) == {"QB", "RB", "WR", "TE", "K", "DST"}
+
+    manifest = load_war_manifest(directory)
+    assert manifest["league_sizes"] == [8, 10]
+    loaded = load_war_coefficients("Standard", directory, n_teams=9)
+    expected = coefficients[
+        (coefficients["scoring"] == "Standard") & (coefficients["n_teams"] == 8)
+    ].set_index("Pos")
+    assert np.allclose(loaded.loc[expected.index, "slope"], expected["slope"])
+
+
+def test_war_scoring_matches_the_per_player_models(tmp_path):
+    # Stand-ins for the pickled sklearn LinearRegression models
+    models = {
+        "QB": SimpleNamespace(intercept_=-4.0, coef_=np.array([0.014])),
+        "RB": SimpleNamespace(intercept_=-2.0, coef_=np.array([0.016])),
+        "WR": SimpleNamespace(intercept_=-2.5, coef_=np.array([0.015])),
+    }
+    with open(tmp_path / "PPR.pickle", "wb") as pickle_file:
+        pickle.dump(models, pickle_file)
+    convert_war_pickle(str(tmp_path / "PPR.pickle"), str(tmp_path / "PPR.csv"))
+    coefficients = load_war_coefficients("PPR", str(tmp_path))
+
+    projections = pd.DataFrame(
+        {"Pos": ["QB", "WR", "RB", "TE", "WR"], "FPTS": [350.0, 210.5, 0.0, 150.0, 99.9]}
+    )
+    war = apply_war_coefficients(projections, coefficients)
+
+    # The baseline predicted one row at a time, positions without a model are NaN
+    for row, (position, points) in enumerate(zip(projections["Pos"], projections["FPTS"])):
+        if position not in models:
+            assert np.isnan(war[row])
+            continue
+        model = models[position]
+        expected = model.intercept_ + model.coef_[0] * points
+        assert np.isclose(war[row], expected)